@@ -0,0 +1,62 @@
+import pathlib
+import tempfile
+import unittest
+
+import numpy
+import xarray
+
+from yanv.backend.file import FileBackend
+from yanv.backend.file import should_load_lazily
+
+
+class FileBackendTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = pathlib.Path(self.directory.name) / "test.nc"
+
+        dataset = xarray.Dataset(
+            data_vars={
+                "streamflow": (("time", "feature_id"), numpy.random.default_rng(8).random((6, 50)))
+            },
+            coords={
+                "time": numpy.arange(6),
+                "feature_id": numpy.arange(50) * 3,
+            }
+        )
+        dataset.to_netcdf(self.path)
+
+        self.backend = FileBackend()
+
+    def tearDown(self) -> None:
+        self.backend.clean()
+        self.directory.cleanup()
+
+    def test_threshold(self):
+        self.assertTrue(should_load_lazily(100, threshold=100))
+        self.assertFalse(should_load_lazily(99, threshold=100))
+
+    def test_lazy_load(self):
+        data_id = self.backend.load(self.path, lazy=True)
+        dataset = self.backend.cache.get(data_id)
+
+        self.assertFalse(dataset["streamflow"].variable._in_memory)
+        self.assertEqual((2, 50), dataset["streamflow"].isel(time=slice(0, 2)).values.shape)
+
+        information = self.backend.cache.get_information(data_id)
+        self.assertEqual(6 * 50, information.get_variable("streamflow").count)
+
+    def test_full_load(self):
+        data_id = self.backend.load(self.path, lazy=False)
+        dataset = self.backend.cache.get(data_id)
+
+        self.assertTrue(dataset["streamflow"].variable._in_memory)
+
+    def test_reload_returns_same_id(self):
+        first_id = self.backend.load(self.path)
+        second_id = self.backend.load(self.path)
+
+        self.assertEqual(first_id, second_id)
+
+
+if __name__ == '__main__':
+    unittest.main()
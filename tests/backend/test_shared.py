@@ -0,0 +1,73 @@
+import os
+import pathlib
+import tempfile
+import unittest
+
+import numpy
+import xarray
+
+from yanv.backend.shared import DatasetRegistry
+from yanv.backend.shared import SharedBackend
+
+
+class SharedBackendTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = pathlib.Path(self.directory.name) / "test.nc"
+
+        xarray.Dataset(
+            data_vars={"streamflow": (("feature_id",), numpy.arange(50, dtype="float64"))},
+            coords={"feature_id": numpy.arange(50)},
+        ).to_netcdf(self.path)
+
+        self.registry = DatasetRegistry()
+
+    def tearDown(self) -> None:
+        self.registry.backend.clean()
+        self.directory.cleanup()
+
+    def test_connections_share_data(self):
+        first = SharedBackend(self.registry)
+        second = SharedBackend(self.registry)
+
+        first_id = first.load(self.path)
+
+        # The same file written differently is still the same file
+        second_id = second.load(os.path.join(self.directory.name, ".", "test.nc"))
+
+        self.assertEqual(first_id, second_id)
+        self.assertEqual(1, len(self.registry.backend.cache))
+        self.assertEqual(2, self.registry.count_holders(first_id))
+        self.assertIs(first.cache.get(first_id), second.cache.get(second_id))
+
+    def test_data_is_kept_until_nothing_holds_it(self):
+        first = SharedBackend(self.registry)
+        second = SharedBackend(self.registry)
+
+        data_id = first.load(self.path)
+        second.load(self.path)
+
+        first.clean()
+        self.assertIsNotNone(self.registry.backend.cache.get(data_id))
+        self.assertEqual(1, self.registry.count_holders(data_id))
+
+        # Letting go of data twice doesn't let go of it on behalf of anyone else
+        first.release(data_id)
+        self.assertIsNotNone(self.registry.backend.cache.get(data_id))
+
+        second.release(data_id)
+        self.assertIsNone(self.registry.backend.cache.get(data_id))
+        self.assertEqual(0, self.registry.count_holders(data_id))
+        self.assertEqual([], self.registry.get_held(second.holder))
+
+    def test_released_data_may_be_loaded_again(self):
+        backend = SharedBackend(self.registry)
+
+        data_id = backend.load(self.path)
+        backend.clean()
+
+        reloaded_id = backend.load(self.path)
+
+        self.assertIsNotNone(backend.cache.get(reloaded_id))
+        self.assertEqual([reloaded_id], self.registry.get_held(backend.holder))
+        self.assertNotEqual(data_id, reloaded_id)
@@ -0,0 +1,119 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy
+import pandas
+import xarray
+
+from yanv.cache import DiskSpillCache
+from yanv.cache import TieredFrameCache
+from yanv.utilities.netcdf import is_memory_mapped
+
+
+def build_dataset(value_count: int, offset: float = 0) -> xarray.Dataset:
+    return xarray.Dataset(
+        data_vars={
+            "values": (("time",), numpy.arange(value_count, dtype="float64") + offset, {"units": "m"})
+        },
+        coords={
+            "time": pandas.date_range("2020-01-01", periods=value_count, freq="h")
+        },
+        attrs={"title": "test"}
+    )
+
+
+class DiskSpillCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_round_trip_is_memory_mapped(self):
+        cache = DiskSpillCache(directory=self.directory, budget="1MB")
+        original = build_dataset(100)
+
+        key = cache.add(original)
+        restored = cache.get(key)
+
+        xarray.testing.assert_identical(original, restored)
+        self.assertTrue(is_memory_mapped(restored["values"].variable._data))
+        self.assertGreater(cache.size, 0)
+
+    def test_evict_over_budget(self):
+        # Each dataset is about 2KB on disk
+        cache = DiskSpillCache(directory=self.directory, budget=5000)
+
+        first_id = cache.add(build_dataset(100))
+        second_id = cache.add(build_dataset(100))
+        cache.get(first_id)
+        third_id = cache.add(build_dataset(100))
+
+        self.assertLessEqual(cache.size, cache.budget)
+        self.assertEqual({first_id, third_id}, set(cache.keys()))
+        self.assertFalse(os.path.exists(cache.directory / second_id))
+
+    def test_refuse_data_larger_than_budget(self):
+        cache = DiskSpillCache(directory=self.directory, budget=100)
+        self.assertFalse(cache.store("too-big", build_dataset(100)))
+        self.assertEqual(0, len(cache))
+
+
+class TieredFrameCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_evicted_data_is_spilled_and_restored(self):
+        # Each dataset is 1600 bytes in memory, so only one fits at a time
+        cache = TieredFrameCache(memory_budget=2000, spill_directory=self.directory, spill_budget="1MB")
+
+        first_id = cache.add(build_dataset(100))
+        second_id = cache.add(build_dataset(100, offset=1))
+
+        self.assertNotIn(first_id, cache._datasets)
+        self.assertIn(first_id, cache.disk)
+        self.assertEqual({first_id, second_id}, set(cache.keys()))
+
+        restored = cache.get(first_id)
+        xarray.testing.assert_identical(build_dataset(100), restored)
+
+        # Bringing the first dataset back pushes the second out to disk
+        self.assertIn(second_id, cache.disk)
+        xarray.testing.assert_identical(build_dataset(100, offset=1), cache.get(second_id))
+
+    def test_lazy_local_files_are_reopened(self):
+        path = os.path.join(self.directory, "data.nc")
+        build_dataset(100).to_netcdf(path)
+
+        cache = TieredFrameCache(memory_budget=2000, spill_directory=self.directory, spill_budget="1MB")
+        lazy_id = cache.add(xarray.open_dataset(path, cache=False))
+        cache.add(build_dataset(100, offset=1))
+        cache.add(build_dataset(100, offset=2))
+
+        self.assertNotIn(lazy_id, cache.disk)
+        xarray.testing.assert_identical(build_dataset(100), cache.get(lazy_id).load())
+
+    def test_spill(self):
+        cache = TieredFrameCache(spill_directory=self.directory, spill_budget="1MB")
+        key = cache.add(build_dataset(100))
+
+        self.assertTrue(cache.spill(key))
+        self.assertIn(key, cache.disk)
+        self.assertTrue(is_memory_mapped(cache.get(key)["values"].variable._data))
+
+        # Only the index of the time coordinate should still be held in memory
+        self.assertLess(cache.size, build_dataset(100).nbytes)
+
+    def test_remove_clears_every_tier(self):
+        cache = TieredFrameCache(memory_budget=2000, spill_directory=self.directory, spill_budget="1MB")
+        first_id = cache.add(build_dataset(100))
+        cache.add(build_dataset(100))
+
+        cache.remove(first_id)
+        self.assertNotIn(first_id, cache.keys())
+        self.assertIsNone(cache.get(first_id))
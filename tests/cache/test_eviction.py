@@ -0,0 +1,106 @@
+import unittest
+
+import numpy
+import xarray
+
+from yanv.cache import CacheCapacityError
+from yanv.cache import InMemoryFrameCache
+from yanv.cache.policy import GreedyDualSizePolicy
+from yanv.cache.policy import LeastRecentlyUsedPolicy
+
+
+def build_dataset(value_count: int) -> xarray.Dataset:
+    return xarray.Dataset(
+        data_vars={
+            "values": (("index",), numpy.zeros(value_count, dtype="float64"))
+        }
+    )
+
+
+class MemoryBudgetTestCase(unittest.TestCase):
+    def test_evict_until_within_budget(self):
+        # Each dataset is 1000 bytes of values
+        cache = InMemoryFrameCache(memory_budget=3500)
+
+        first_id = cache.add(build_dataset(125))
+        second_id = cache.add(build_dataset(125))
+        third_id = cache.add(build_dataset(125))
+
+        self.assertEqual(3, len(cache))
+
+        # Using the first dataset should make the second the least recently used
+        cache.get(first_id)
+        fourth_id = cache.add(build_dataset(250))
+
+        self.assertLessEqual(cache.size, cache.memory_budget)
+        self.assertEqual({first_id, fourth_id}, set(cache.keys()))
+        self.assertNotIn(second_id, cache.keys())
+        self.assertNotIn(third_id, cache.keys())
+
+    def test_reject_dataset_larger_than_budget(self):
+        cache = InMemoryFrameCache(memory_budget="1KB")
+
+        with self.assertRaises(CacheCapacityError):
+            cache.add(build_dataset(1000))
+
+        self.assertEqual(0, len(cache))
+
+    def test_budget_as_fraction_of_memory(self):
+        cache = InMemoryFrameCache(memory_budget="50%")
+        self.assertGreater(cache.memory_budget, 0)
+        self.assertEqual(cache.memory_budget, InMemoryFrameCache(memory_budget=0.5).memory_budget)
+
+
+
+class EvictionPolicyTestCase(unittest.TestCase):
+    def test_least_recently_used(self):
+        policy = LeastRecentlyUsedPolicy()
+
+        for key in "abcd":
+            policy.touch(key, size=10)
+
+        policy.touch("a", size=10)
+        policy.discard("c")
+
+        self.assertEqual(["b", "d", "a"], [policy.evict() for _ in range(3)])
+        self.assertIsNone(policy.evict())
+
+    def test_greedy_dual_size_prefers_evicting_large_entries(self):
+        policy = GreedyDualSizePolicy()
+
+        policy.touch("large", size=1000)
+        policy.touch("small", size=10)
+        policy.touch("medium", size=100)
+
+        self.assertEqual("large", policy.evict())
+        self.assertEqual("medium", policy.evict())
+
+    def test_greedy_dual_size_ages_out_unused_entries(self):
+        policy = GreedyDualSizePolicy()
+
+        policy.touch("old", size=10)
+        evictions: list[str] = []
+
+        # Larger entries are evicted first, but each eviction raises the priority of everything touched afterward,
+        #   so an untouched small entry eventually becomes the cheapest to lose
+        while "old" not in evictions and len(evictions) < 50:
+            policy.touch(f"large-{len(evictions)}", size=100)
+            evictions.append(policy.evict())
+
+        self.assertIn("old", evictions)
+        self.assertGreater(len(evictions), 5)
+
+    def test_cache_with_greedy_dual_size(self):
+        cache = InMemoryFrameCache(memory_budget=2500, eviction_policy="gds")
+
+        small_id = cache.add(build_dataset(25))
+        large_id = cache.add(build_dataset(200))
+        newest_id = cache.add(build_dataset(100))
+
+        self.assertIn(small_id, cache.keys())
+        self.assertNotIn(large_id, cache.keys())
+        self.assertIn(newest_id, cache.keys())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy
+import xarray
+
+from yanv.backend.file import FileBackend
+from yanv.cache import FileIdentity
+from yanv.cache import SidecarStore
+from yanv.handlers.websocket import get_variable_statistics
+from yanv.model.dataset import Dataset
+from yanv.utilities import statistics
+
+
+class SidecarStoreTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.store = SidecarStore(os.path.join(self.directory, "store", "sidecar.db"))
+        self.path = os.path.join(self.directory, "data.nc")
+        xarray.Dataset({"streamflow": (("feature_id",), numpy.arange(100, dtype="float64"))}).to_netcdf(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_round_trip(self):
+        identity = FileIdentity.from_path(self.path)
+
+        self.assertTrue(self.store.put(identity, "statistics", {"minimum": 0}, variable="streamflow"))
+
+        self.assertEqual({"minimum": 0}, self.store.get(identity, "statistics", variable="streamflow"))
+        self.assertIsNone(self.store.get(identity, "statistics"))
+        self.assertIsNone(self.store.get(identity, "statistics", variable="velocity"))
+
+    def test_changed_files_are_invalidated(self):
+        identity = FileIdentity.from_path(self.path)
+        self.store.put(identity, "summary", "old")
+
+        xarray.Dataset({"streamflow": (("feature_id",), numpy.arange(200, dtype="float64"))}).to_netcdf(self.path)
+        new_identity = FileIdentity.from_path(self.path)
+
+        self.assertNotEqual(identity, new_identity)
+        self.assertFalse(identity.is_current())
+        self.assertIsNone(self.store.get(new_identity, "summary"))
+        self.assertEqual(0, len(self.store))
+
+    def test_summaries_and_statistics_survive_restarts(self):
+        first_backend = FileBackend(store=self.store)
+        first_id = first_backend.load(self.path)
+        first_backend.cache.get_information(first_id)
+        first_statistics = get_variable_statistics(
+            first_backend.cache,
+            first_id,
+            first_backend.cache.get(first_id)["streamflow"],
+            store=self.store,
+        )
+
+        second_backend = FileBackend(store=SidecarStore(self.store.path))
+
+        with mock.patch.object(Dataset, "from_xarray", wraps=Dataset.from_xarray) as from_xarray:
+            second_id = second_backend.load(self.path)
+            summary = second_backend.cache.get_information(second_id)
+
+        self.assertEqual(0, from_xarray.call_count)
+        self.assertEqual(["streamflow"], summary.variable_names)
+
+        with mock.patch("yanv.handlers.websocket.summarize", wraps=statistics.summarize) as summarize:
+            second_statistics = get_variable_statistics(
+                second_backend.cache,
+                second_id,
+                second_backend.cache.get(second_id)["streamflow"],
+                store=second_backend.store,
+            )
+
+        self.assertEqual(0, summarize.call_count)
+        self.assertEqual(first_statistics.to_dict(), second_statistics.to_dict())
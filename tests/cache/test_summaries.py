@@ -0,0 +1,63 @@
+import json
+import unittest
+from unittest import mock
+
+import numpy
+import xarray
+
+from yanv.cache import InMemoryFrameCache
+from yanv.messages.responses.data import YanvDataResponse
+from yanv.model.dataset import Dataset
+
+
+def build_dataset() -> xarray.Dataset:
+    return xarray.Dataset(
+        data_vars={
+            "values": (("index",), numpy.arange(10, dtype="float64"), {"units": "m"})
+        },
+        coords={
+            "index": numpy.arange(10)
+        },
+        attrs={"title": "test"}
+    )
+
+
+class SummaryMemoizationTestCase(unittest.TestCase):
+    def test_summary_is_built_once(self):
+        cache = InMemoryFrameCache()
+        key = cache.add(build_dataset())
+
+        with mock.patch.object(Dataset, "from_xarray", wraps=Dataset.from_xarray) as from_xarray:
+            first = cache.get_information(key)
+            second = cache.get_information(key)
+            serialized = cache.get_serialized_information(key)
+
+        self.assertEqual(1, from_xarray.call_count)
+        self.assertIs(first, second)
+        self.assertEqual(first.model_dump(), json.loads(serialized))
+
+    def test_summary_is_forgotten_with_its_data(self):
+        cache = InMemoryFrameCache()
+        key = cache.add(build_dataset())
+        cache.get_serialized_information(key)
+
+        cache.remove(key)
+
+        self.assertIsNone(cache.recall(key, "summary"))
+        self.assertIsNone(cache.get_information(key))
+        self.assertIsNone(cache.get_serialized_information(key))
+
+    def test_serialized_response_matches(self):
+        cache = InMemoryFrameCache()
+        key = cache.add(build_dataset())
+
+        response = YanvDataResponse(
+            operation="load",
+            data_id=key,
+            data=cache.get_information(key),
+            message_id="message",
+        )
+        expected = json.loads(response.serialize())
+
+        response.use_serialized_data(cache.get_serialized_information(key))
+        self.assertEqual(expected, json.loads(response.serialize()))
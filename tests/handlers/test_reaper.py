@@ -0,0 +1,67 @@
+import os
+import time
+import shutil
+import tempfile
+import unittest
+
+import numpy
+import xarray
+
+from yanv.backend.file import FileBackend
+from yanv.handlers.reaper import IdleReaper
+from yanv.handlers.state import SocketState
+
+
+class IdleReaperTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "data.nc")
+        xarray.Dataset({"streamflow": (("feature_id",), numpy.arange(5000, dtype="float64"))}).to_netcdf(self.path)
+
+        self.reaper = IdleReaper(idle_timeout=10)
+
+    async def asyncTearDown(self) -> None:
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def build_state(self, idle_for: float) -> SocketState:
+        state = SocketState(backend=FileBackend())
+        state.backend.load(self.path, lazy=False)
+        state._last_active = time.monotonic() - idle_for
+        self.reaper.track(state)
+        return state
+
+    async def test_idle_connections_release_their_data(self):
+        idle_state = self.build_state(idle_for=60)
+        active_state = self.build_state(idle_for=0)
+
+        reclaimed = await self.reaper.reap()
+
+        self.assertGreaterEqual(reclaimed, 5000 * 8)
+        self.assertEqual([], idle_state.backend.get_loaded_ids())
+        self.assertEqual(1, len(active_state.backend.get_loaded_ids()))
+
+        # Nothing is left to reclaim from connections that were already released
+        self.assertEqual(0, await self.reaper.reap())
+
+    async def test_untracked_and_disabled(self):
+        state = self.build_state(idle_for=60)
+        self.reaper.untrack(state)
+
+        self.assertEqual([], self.reaper.get_idle())
+
+        disabled_reaper = IdleReaper(idle_timeout=0)
+        disabled_reaper.track(state)
+
+        self.assertEqual([], disabled_reaper.get_idle())
+
+    async def test_closing_releases_data(self):
+        async with SocketState(backend=FileBackend()) as state:
+            data_id = state.backend.load(self.path, lazy=False)
+
+        self.assertIsNone(state.backend.cache.get(data_id))
+        self.assertEqual(0, state.backend.cache.size)
+
+        async with SocketState(backend=FileBackend(), release_on_close=False) as kept_state:
+            kept_id = kept_state.backend.load(self.path, lazy=False)
+
+        self.assertIsNotNone(kept_state.backend.cache.get(kept_id))
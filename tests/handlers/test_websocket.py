@@ -0,0 +1,373 @@
+import os
+import time
+import shutil
+import asyncio
+import tempfile
+import threading
+import typing
+import unittest
+from unittest import mock
+
+import numpy
+import xarray
+from aiohttp import web
+from aiohttp.test_utils import TestClient
+from aiohttp.test_utils import TestServer
+
+from yanv.handlers import websocket
+from yanv.handlers import socket_handler
+from yanv.backend.shared import DATASET_REGISTRY_KEY
+from yanv.backend.shared import DatasetRegistry
+from yanv.handlers.session import SESSION_MANAGER_KEY
+from yanv.handlers.session import SessionManager
+from yanv.handlers.state import SocketState
+from yanv.messages.requests.data import DataDescriptionRequest
+from yanv.messages.responses import ErrorResponse
+
+
+def describe_slowly(request: DataDescriptionRequest, state: SocketState) -> ErrorResponse:
+    if request.variable == "slow":
+        time.sleep(0.5)
+
+    return ErrorResponse(message_id=request.message_id, error_message=request.variable)
+
+
+STOPPED_EARLY = threading.Event()
+
+
+def describe_until_cancelled(request: DataDescriptionRequest, state: SocketState) -> ErrorResponse:
+    token = state.get_cancellation_token(request.message_id)
+
+    for _ in range(100):
+        if token.cancelled:
+            STOPPED_EARLY.set()
+        token.raise_if_cancelled()
+        time.sleep(0.05)
+
+    return ErrorResponse(message_id=request.message_id, error_message=request.variable)
+
+
+def build_description_request(message_id: str, variable: str) -> dict:
+    return {
+        "operation": "data_description",
+        "message_id": message_id,
+        "data_id": "abcde",
+        "variable": variable,
+        "container_id": "container",
+    }
+
+
+class SocketHandlerTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        application = web.Application()
+        application.add_routes([web.get("/ws", handler=socket_handler)])
+
+        self.client = TestClient(TestServer(application))
+        await self.client.start_server()
+
+    async def asyncTearDown(self) -> None:
+        await self.client.close()
+
+    async def test_messages_are_answered_as_they_finish(self):
+        handlers = {DataDescriptionRequest: describe_slowly}
+
+        with mock.patch.dict(websocket.MESSAGE_HANDLERS, handlers):
+            connection = await self.client.ws_connect("/ws")
+            opened = await connection.receive_json()
+            self.assertEqual("connection_opened", opened["operation"])
+
+            await connection.send_json(build_description_request("first", "slow"))
+            await connection.send_json(build_description_request("second", "fast"))
+
+            first_response = await connection.receive_json(timeout=5)
+            second_response = await connection.receive_json(timeout=5)
+            await connection.close()
+
+        self.assertEqual("second", first_response["message_id"])
+        self.assertEqual("fast", first_response["error_message"])
+        self.assertEqual("first", second_response["message_id"])
+
+    async def test_cancel(self):
+        handlers = {DataDescriptionRequest: describe_until_cancelled}
+        STOPPED_EARLY.clear()
+
+        with mock.patch.dict(websocket.MESSAGE_HANDLERS, handlers):
+            connection = await self.client.ws_connect("/ws")
+            await connection.receive_json()
+
+            await connection.send_json(build_description_request("long", "slow"))
+
+            # Give the work time to start so that it has to notice the cancellation on its own
+            await asyncio.sleep(0.2)
+            await connection.send_json({"operation": "cancel", "message_id": "stop", "target_message_id": "long"})
+
+            response = await connection.receive_json(timeout=5)
+
+            await connection.send_json({"operation": "cancel", "message_id": "again", "target_message_id": "long"})
+            second_response = await connection.receive_json(timeout=5)
+            await connection.close()
+
+        self.assertEqual("cancelled", response["operation"])
+        self.assertEqual("stop", response["message_id"])
+        self.assertTrue(response["cancelled"])
+        self.assertFalse(second_response["cancelled"])
+        self.assertTrue(STOPPED_EARLY.wait(timeout=5))
+
+    async def test_invalid_message(self):
+        connection = await self.client.ws_connect("/ws")
+        await connection.receive_json()
+
+        await connection.send_str("{\"operation\": \"not a real operation\"}")
+        response = await connection.receive_json(timeout=5)
+        await connection.close()
+
+        self.assertEqual("error", response["operation"])
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+class PrecomputeStatisticsTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "data.nc")
+        xarray.Dataset(
+            {
+                "streamflow": (("time", "feature_id"), numpy.arange(200, dtype="float64").reshape(10, 20)),
+                "velocity": (("feature_id",), numpy.arange(20, dtype="float64")),
+                "name": ((), "test"),
+            },
+            coords={"feature_id": numpy.arange(20) * 2}
+        ).to_netcdf(self.path)
+
+        application = web.Application()
+        application.add_routes([web.get("/ws", handler=socket_handler)])
+
+        self.client = TestClient(TestServer(application))
+        await self.client.start_server()
+
+    async def asyncTearDown(self) -> None:
+        await self.client.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    async def test_statistics_are_pushed_after_loading(self):
+        connection = await self.client.ws_connect("/ws")
+        await connection.receive_json()
+
+        await connection.send_json(
+            {"operation": "load", "path": self.path, "message_id": "load", "precompute_statistics": True}
+        )
+
+        loaded = await connection.receive_json(timeout=5)
+        self.assertEqual("load", loaded["operation"])
+
+        pushed = [await connection.receive_json(timeout=5) for _ in range(3)]
+        await connection.close()
+
+        self.assertTrue(all(message["operation"] == "variable_statistics" for message in pushed))
+        self.assertTrue(all(message["data_id"] == loaded["data_id"] for message in pushed))
+
+        # The smallest variables are summarized first
+        self.assertEqual("streamflow", pushed[-1]["variable"])
+        self.assertEqual({"feature_id", "velocity"}, {message["variable"] for message in pushed[:2]})
+
+        self.assertEqual("0.00", pushed[-1]["statistics"]["minimum"])
+        self.assertEqual("199.00", pushed[-1]["statistics"]["maximum"])
+        self.assertEqual("99.50", pushed[-1]["statistics"]["median"])
+
+    async def test_statistics_are_not_pushed_unless_asked(self):
+        connection = await self.client.ws_connect("/ws")
+        await connection.receive_json()
+
+        await connection.send_json({"operation": "load", "path": self.path, "message_id": "load"})
+        await connection.receive_json(timeout=5)
+
+        with self.assertRaises(asyncio.TimeoutError):
+            await connection.receive_json(timeout=0.5)
+
+        await connection.close()
+
+
+class SharedDataTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "data.nc")
+        xarray.Dataset({"streamflow": (("feature_id",), numpy.arange(20, dtype="float64"))}).to_netcdf(self.path)
+
+        self.registry = DatasetRegistry()
+
+        application = web.Application()
+        application[DATASET_REGISTRY_KEY] = self.registry
+        application.add_routes([web.get("/ws", handler=socket_handler)])
+
+        self.client = TestClient(TestServer(application))
+        await self.client.start_server()
+
+    async def asyncTearDown(self) -> None:
+        await self.client.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    async def load(self, connection) -> str:
+        await connection.send_json({"operation": "load", "path": self.path, "message_id": "load"})
+        response = await connection.receive_json(timeout=5)
+        return response["data_id"]
+
+    async def test_connections_share_loaded_data(self):
+        first = await self.client.ws_connect("/ws")
+        await first.receive_json()
+        second = await self.client.ws_connect("/ws")
+        await second.receive_json()
+
+        first_id = await self.load(first)
+        second_id = await self.load(second)
+
+        self.assertEqual(first_id, second_id)
+        self.assertEqual(2, self.registry.count_holders(first_id))
+
+        await first.close()
+        for _ in range(50):
+            if self.registry.count_holders(first_id) < 2:
+                break
+            await asyncio.sleep(0.05)
+
+        self.assertEqual(1, self.registry.count_holders(first_id))
+        self.assertIsNotNone(self.registry.backend.cache.get(first_id))
+
+        await second.close()
+        for _ in range(50):
+            if self.registry.count_holders(first_id) == 0:
+                break
+            await asyncio.sleep(0.05)
+
+        self.assertEqual(0, self.registry.count_holders(first_id))
+        self.assertIsNone(self.registry.backend.cache.get(first_id))
+
+
+class SessionResumptionTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "data.nc")
+        xarray.Dataset({"streamflow": (("feature_id",), numpy.arange(20, dtype="float64"))}).to_netcdf(self.path)
+
+        self.registry = DatasetRegistry()
+
+    async def start(self, grace_period: float):
+        self.sessions = SessionManager(grace_period=grace_period)
+
+        application = web.Application()
+        application[DATASET_REGISTRY_KEY] = self.registry
+        application[SESSION_MANAGER_KEY] = self.sessions
+        application.add_routes([web.get("/ws", handler=socket_handler)])
+
+        self.client = TestClient(TestServer(application))
+        await self.client.start_server()
+
+    async def asyncTearDown(self) -> None:
+        await self.client.close()
+        self.sessions.expire_all()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    async def connect_and_load(self) -> typing.Tuple[str, str]:
+        connection = await self.client.ws_connect("/ws")
+        opened = await connection.receive_json(timeout=5)
+
+        self.assertFalse(opened["resumed"])
+        self.assertIsNotNone(opened["session_id"])
+
+        await connection.send_json({"operation": "load", "path": self.path, "message_id": "load"})
+        loaded = await connection.receive_json(timeout=5)
+        await connection.close()
+
+        return opened["session_id"], loaded["data_id"]
+
+    async def wait_for_release(self, data_id: str):
+        for _ in range(50):
+            if self.registry.count_holders(data_id) == 0:
+                return
+            await asyncio.sleep(0.05)
+
+    async def test_reconnecting_resumes_the_session(self):
+        await self.start(grace_period=30)
+        session_id, data_id = await self.connect_and_load()
+
+        connection = await self.client.ws_connect(f"/ws?session={session_id}")
+        opened = await connection.receive_json(timeout=5)
+        reloaded = await connection.receive_json(timeout=5)
+
+        self.assertTrue(opened["resumed"])
+        self.assertEqual(session_id, opened["session_id"])
+        self.assertEqual([data_id], opened["data_ids"])
+
+        self.assertEqual("load", reloaded["operation"])
+        self.assertEqual(data_id, reloaded["data_id"])
+        self.assertEqual(["streamflow"], [variable["name"] for variable in reloaded["data"]["variables"]])
+
+        # A session may only be used by one connection at a time
+        second_connection = await self.client.ws_connect(f"/ws?session={session_id}")
+        second_opened = await second_connection.receive_json(timeout=5)
+
+        self.assertFalse(second_opened["resumed"])
+        self.assertNotEqual(session_id, second_opened["session_id"])
+
+        await second_connection.close()
+        await connection.close()
+
+    async def test_data_is_released_after_the_grace_period(self):
+        await self.start(grace_period=0.2)
+        session_id, data_id = await self.connect_and_load()
+
+        await self.wait_for_release(data_id)
+
+        self.assertEqual(0, self.registry.count_holders(data_id))
+        self.assertIsNone(self.registry.backend.cache.get(data_id))
+        self.assertNotIn(session_id, self.sessions)
+
+        connection = await self.client.ws_connect(f"/ws?session={session_id}")
+        opened = await connection.receive_json(timeout=5)
+        await connection.close()
+
+        self.assertFalse(opened["resumed"])
+        self.assertEqual([], opened["data_ids"])
+
+
+class DownloadProgressTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        xarray.Dataset(
+            {"streamflow": (("feature_id",), numpy.arange(20, dtype="float64"))}
+        ).to_netcdf(os.path.join(self.directory, "data.nc"))
+
+        application = web.Application()
+        application.add_routes([web.get("/ws", handler=socket_handler), web.static("/files", self.directory)])
+
+        self.client = TestClient(TestServer(application))
+        await self.client.start_server()
+
+    async def asyncTearDown(self) -> None:
+        await self.client.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    async def test_progress_is_reported_while_downloading(self):
+        url = str(self.client.make_url("/files/data.nc"))
+
+        connection = await self.client.ws_connect("/ws")
+        await connection.receive_json()
+
+        with mock.patch("yanv.utilities.download.DOWNLOAD_DIRECTORY", self.directory):
+            await connection.send_json({"operation": "load", "path": url, "message_id": "load"})
+
+            messages = []
+            while not messages or messages[-1]["operation"] != "load":
+                messages.append(await connection.receive_json(timeout=5))
+
+        await connection.close()
+
+        progress = messages[:-1]
+        size = os.path.getsize(os.path.join(self.directory, "data.nc"))
+
+        self.assertTrue(progress)
+        self.assertTrue(all(message["operation"] == "download_progress" for message in progress))
+        self.assertTrue(all(message["message_id"] == "load" for message in progress))
+        self.assertEqual(size, progress[-1]["received"])
+        self.assertEqual(size, progress[-1]["total"])
@@ -0,0 +1,54 @@
+import unittest
+from unittest import mock
+
+import numpy
+import pandas
+import xarray
+
+from yanv.model.dataset import Dataset
+from yanv.model.dimension import Dimension
+
+
+def build_dataset(feature_ids: numpy.ndarray) -> xarray.Dataset:
+    return xarray.Dataset(
+        data_vars={
+            "streamflow": (("time", "feature_id"), numpy.zeros((4, len(feature_ids))))
+        },
+        coords={
+            "time": pandas.date_range("2020-01-01", periods=4, freq="h"),
+            "feature_id": feature_ids,
+        }
+    )
+
+
+class DimensionTestCase(unittest.TestCase):
+    def test_extrema_match_a_full_scan(self):
+        for feature_ids in (numpy.arange(10), numpy.arange(10)[::-1], numpy.array([5, 2, 9, 1])):
+            dataset = build_dataset(feature_ids)
+            dimensions = {dimension.name: dimension for dimension in Dimension.from_xarray(dataset)}
+
+            self.assertEqual(str(feature_ids.min()), dimensions["feature_id"].minimum)
+            self.assertEqual(str(feature_ids.max()), dimensions["feature_id"].maximum)
+            self.assertEqual(str(dataset.time.values.min()), dimensions["time"].minimum)
+            self.assertEqual(str(dataset.time.values.max()), dimensions["time"].maximum)
+
+    def test_extrema_from_header(self):
+        dataset = build_dataset(numpy.arange(10))
+        dataset["feature_id"].attrs["actual_range"] = numpy.array([-5, 50])
+
+        dimensions = {dimension.name: dimension for dimension in Dimension.from_xarray(dataset)}
+
+        self.assertEqual("-5", dimensions["feature_id"].minimum)
+        self.assertEqual("50", dimensions["feature_id"].maximum)
+
+    def test_dimensions_are_only_described_once(self):
+        dataset = build_dataset(numpy.arange(10))
+
+        with mock.patch.object(Dimension, "from_xarray", wraps=Dimension.from_xarray) as from_xarray:
+            summary = Dataset.from_xarray(dataset)
+
+        self.assertEqual(1, from_xarray.call_count)
+        self.assertEqual(
+            ["time", "feature_id"],
+            [dimension.name for dimension in summary.get_variable("streamflow").dimensions]
+        )
@@ -0,0 +1,6 @@
+"""
+@TODO: Put a module wide description here
+"""
+from __future__ import annotations
+
+import typing
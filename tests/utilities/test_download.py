@@ -0,0 +1,89 @@
+import os
+import asyncio
+import pathlib
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy
+import xarray
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from yanv.backend.file import FileBackend
+from yanv.utilities import download as download_module
+from yanv.utilities.cancellation import CancellationToken
+from yanv.utilities.cancellation import OperationCancelled
+from yanv.utilities.download import download
+
+
+class DownloadTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.download_directory = pathlib.Path(self.directory.name) / "downloads"
+        self.path = pathlib.Path(self.directory.name) / "data.nc"
+
+        xarray.Dataset(
+            {"streamflow": (("feature_id",), numpy.arange(20000, dtype="float64"))},
+            coords={"feature_id": numpy.arange(20000)},
+        ).to_netcdf(self.path)
+
+        application = web.Application()
+        application.add_routes([web.static("/files", self.directory.name)])
+
+        self.server = TestServer(application)
+        await self.server.start_server()
+
+    async def asyncTearDown(self) -> None:
+        await self.server.close()
+        self.directory.cleanup()
+
+    @property
+    def url(self) -> str:
+        return str(self.server.make_url("/files/data.nc"))
+
+    async def test_download(self):
+        reports = []
+
+        local_path = await asyncio.to_thread(
+            download,
+            self.url,
+            directory=self.download_directory,
+            progress=lambda received, total: reports.append((received, total)),
+            chunk_size=4096,
+        )
+
+        self.assertEqual(self.path.read_bytes(), local_path.read_bytes())
+        self.assertTrue(local_path.name.endswith("-data.nc"))
+
+        size = os.path.getsize(self.path)
+        self.assertEqual((size, size), reports[-1])
+        self.assertEqual(sorted(reports), reports)
+
+    async def test_cancelled_downloads_leave_nothing_behind(self):
+        token = CancellationToken()
+        token.cancel()
+
+        with self.assertRaises(OperationCancelled):
+            await asyncio.to_thread(download, self.url, directory=self.download_directory, cancellation_token=token)
+
+        self.assertEqual([], list(self.download_directory.iterdir()))
+
+    async def test_backend_reads_downloads_lazily(self):
+        backend = FileBackend()
+
+        with mock.patch.object(download_module, "DOWNLOAD_DIRECTORY", str(self.download_directory)):
+            data_id = await asyncio.to_thread(backend.load, self.url)
+
+        dataset = backend.cache.get(data_id)
+
+        self.assertFalse(dataset["streamflow"].variable._in_memory)
+        self.assertEqual(19999.0, float(dataset["streamflow"][-1]))
+        # The summary names where the data came from rather than the local copy
+        sources = backend.cache.get_information(data_id).sources
+        self.assertTrue(str(sources[0]).startswith("http"))
+        self.assertEqual(1, len(list(self.download_directory.iterdir())))
+
+        backend.clean()
+
+        self.assertEqual([], list(self.download_directory.iterdir()))
@@ -0,0 +1,52 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy
+import xarray
+
+from yanv.utilities.netcdf import get_random_values
+
+
+class RandomValuesTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_samples_skip_invalid_values(self):
+        values = numpy.arange(10000, dtype="float64").reshape(100, 100)
+        values[::2] = numpy.nan
+        variable = xarray.DataArray(values, dims=("time", "feature_id"), attrs={"valid_range": [0, 8000]})
+
+        samples = get_random_values(variable, size=50)
+
+        self.assertEqual(50, len(samples))
+        self.assertEqual(50, len(set(samples)))
+        self.assertFalse(numpy.isnan(samples).any())
+        self.assertTrue(all(0 <= sample <= 8000 for sample in samples))
+
+    def test_mostly_missing_values(self):
+        values = numpy.full(5000, numpy.nan)
+        values[[12, 4000]] = [1.0, 2.0]
+
+        samples = get_random_values(xarray.DataArray(values, dims=("index",)), size=5)
+
+        self.assertEqual([1.0, 2.0], sorted(samples))
+
+    def test_lazy_data_is_not_read_in_full(self):
+        path = os.path.join(self.directory, "data.nc")
+        xarray.Dataset(
+            {"streamflow": (("time", "feature_id"), numpy.random.default_rng(3).random((50, 200)))}
+        ).to_netcdf(path)
+
+        with xarray.open_dataset(path, cache=False) as dataset:
+            samples = get_random_values(dataset["streamflow"], size=10)
+
+            self.assertEqual(10, len(samples))
+            self.assertFalse(dataset["streamflow"].variable._in_memory)
+
+    def test_scalar(self):
+        self.assertEqual([3], get_random_values(xarray.DataArray(3), size=5))
@@ -0,0 +1,64 @@
+import unittest
+
+import numpy
+import xarray
+
+from yanv.utilities.sketches import KLLSketch
+from yanv.utilities.statistics import summarize
+
+
+def get_rank(sorted_values: numpy.ndarray, value: float) -> float:
+    return numpy.searchsorted(sorted_values, value) / sorted_values.size
+
+
+class KLLSketchTestCase(unittest.TestCase):
+    def setUp(self):
+        self.values = numpy.random.default_rng(7).lognormal(size=500000)
+        self.sorted_values = numpy.sort(self.values)
+
+    def test_estimates_are_within_error(self):
+        sketch = KLLSketch(error=0.01, seed=3)
+
+        for chunk in numpy.array_split(self.values, 17):
+            sketch.update(chunk)
+
+        self.assertEqual(self.values.size, sketch.count)
+        self.assertFalse(sketch.is_exact)
+        self.assertLess(sketch.retained, 2000)
+
+        for fraction in (0.01, 0.25, 0.5, 0.75, 0.99):
+            self.assertAlmostEqual(fraction, get_rank(self.sorted_values, sketch.quantile(fraction)), delta=0.01)
+
+    def test_merged_sketches_are_within_error(self):
+        sketches = [
+            KLLSketch(error=0.01, seed=index).update(chunk)
+            for index, chunk in enumerate(numpy.array_split(self.values, 4))
+        ]
+        merged = sketches[0]
+
+        for sketch in sketches[1:]:
+            merged.merge(sketch)
+
+        self.assertEqual(self.values.size, merged.count)
+        self.assertAlmostEqual(0.5, get_rank(self.sorted_values, merged.quantile(0.5)), delta=0.01)
+
+    def test_exact(self):
+        sketch = KLLSketch(exact=True).update(self.values[:1000])
+
+        self.assertTrue(sketch.is_exact)
+        self.assertEqual(numpy.median(self.values[:1000]), sketch.quantile(0.5))
+        self.assertEqual(numpy.percentile(self.values[:1000], 90), sketch.quantile(0.9))
+
+    def test_quantiles_from_summary(self):
+        values = numpy.arange(101, dtype="float64")
+        values[0] = numpy.nan
+
+        formatted = summarize(
+            xarray.Variable(("index",), values),
+            sketch=KLLSketch(exact=True),
+            chunk_size=10
+        ).to_dict(percentiles=[25])
+
+        self.assertEqual("50.50", formatted["median"])
+        self.assertEqual([{"percentile": "25", "value": "25.75"}], formatted["percentiles"])
+        self.assertTrue(formatted["quantiles_are_exact"])
@@ -0,0 +1,69 @@
+import unittest
+
+import numpy
+import pandas
+import xarray
+
+from yanv.utilities.cancellation import CancellationToken
+from yanv.utilities.cancellation import OperationCancelled
+from yanv.utilities.statistics import SummaryStatistics
+from yanv.utilities.statistics import summarize
+
+
+class SummaryStatisticsTestCase(unittest.TestCase):
+    def test_chunked_pass_matches_numpy(self):
+        values = numpy.random.default_rng(12).normal(loc=5, scale=3, size=(500, 37))
+        values[values < 0] = numpy.nan
+
+        statistics = summarize(xarray.Variable(("time", "feature_id"), values), chunk_size=100)
+
+        self.assertEqual(numpy.count_nonzero(~numpy.isnan(values)), statistics.count)
+        self.assertEqual(numpy.count_nonzero(numpy.isnan(values)), statistics.missing_count)
+        self.assertEqual(numpy.nanmin(values), statistics.minimum)
+        self.assertEqual(numpy.nanmax(values), statistics.maximum)
+        self.assertAlmostEqual(numpy.nanmean(values), statistics.mean)
+        self.assertAlmostEqual(numpy.nanstd(values), statistics.std)
+
+    def test_merge(self):
+        values = numpy.arange(100, dtype="float64")
+
+        merged = SummaryStatistics().update(values[:30]).merge(SummaryStatistics().update(values[30:]))
+
+        self.assertEqual(100, merged.count)
+        self.assertAlmostEqual(values.mean(), merged.mean)
+        self.assertAlmostEqual(values.var(), merged.variance)
+
+    def test_valid_range_and_fill_values(self):
+        variable = xarray.Variable(
+            ("index",),
+            numpy.array([-9999, 1, 2, 3, 50, 4], dtype="int32"),
+            attrs={"valid_range": [0, 10], "_FillValue": -9999}
+        )
+
+        statistics = summarize(variable)
+
+        self.assertEqual(4, statistics.count)
+        self.assertEqual(2, statistics.missing_count)
+        self.assertEqual({"minimum": "1", "maximum": "4", "mean": "2.50"}, {
+            key: value
+            for key, value in statistics.to_dict().items()
+            if key in ("minimum", "maximum", "mean")
+        })
+
+    def test_dates(self):
+        dates = pandas.date_range("2020-01-01", periods=5, freq="D").values.copy()
+        dates[1] = numpy.datetime64("NaT")
+
+        formatted = summarize(xarray.Variable(("time",), dates), chunk_size=2).to_dict()
+
+        self.assertEqual(str(dates[0]), formatted["minimum"])
+        self.assertEqual(str(dates[-1]), formatted["maximum"])
+        self.assertEqual("1", formatted["missing_count"])
+        self.assertEqual("NaN", formatted["std"])
+
+    def test_cancel(self):
+        token = CancellationToken("statistics")
+        token.cancel()
+
+        with self.assertRaises(OperationCancelled):
+            summarize(xarray.Variable(("index",), numpy.arange(10)), cancellation_token=token)
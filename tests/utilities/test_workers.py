@@ -0,0 +1,31 @@
+import asyncio
+import threading
+import unittest
+
+from yanv.utilities.workers import WorkerPool
+
+
+def get_thread_name() -> str:
+    return threading.current_thread().name
+
+
+class WorkerPoolTestCase(unittest.TestCase):
+    def test_run_off_of_the_loop(self):
+        async def run_both(pool: WorkerPool):
+            return await pool.run(get_thread_name), get_thread_name()
+
+        with WorkerPool(thread_count=2, process_count=0) as pool:
+            worker_thread, loop_thread = asyncio.run(run_both(pool))
+
+        self.assertNotEqual(worker_thread, loop_thread)
+        self.assertTrue(worker_thread.startswith("yanv"))
+
+    def test_cpu_work_falls_back_to_threads(self):
+        with WorkerPool(thread_count=1, process_count=0) as pool:
+            self.assertIsNone(pool.processes)
+            self.assertIs(pool.threads, pool.cpu_executor)
+            self.assertEqual(6, asyncio.run(pool.run_in_process(sum, [1, 2, 3])))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -14,6 +14,45 @@ DEFAULT_PORT: typing.Final[int] = int(os.environ.get("YANV_DEFAULT_PORT", 10324)
 ALLOW_REMOTE: typing.Final[bool] = os.environ.get("YANV_ALLOW_REMOTE", "no").lower() in ("t", "true", "y", "yes", "on", "1")
 INDEX_PAGE: typing.Final[str] = os.environ.get("YANV_INDEX_PAGE", "")
 DEBUG_MODE: typing.Final[bool] = os.environ.get("YANV_DEBUG", "false").lower() in ("t", "true", "y", "yes", "on", "1")
+LAZY_LOAD_THRESHOLD: typing.Final[int] = int(os.environ.get("YANV_LAZY_LOAD_THRESHOLD", 256 * 1000 * 1000))
+"""The size of a file, in bytes, at which only its header will be read upon loading unless told otherwise"""
+THREAD_COUNT: typing.Final[int] = int(os.environ.get("YANV_THREAD_COUNT", min(32, (os.cpu_count() or 1) + 4)))
+"""The number of threads used to handle messages outside of the event loop"""
+PROCESS_COUNT: typing.Final[int] = int(os.environ.get("YANV_PROCESS_COUNT", 0))
+"""The number of processes available for CPU bound work that does not rely on connection state. 0 disables the pool"""
+CACHE_MEMORY_BUDGET: typing.Final[str] = os.environ.get("YANV_CACHE_MEMORY_BUDGET", "25%")
+"""How much memory loaded datasets may occupy - either a size like '4GB' or a fraction of system memory like '25%'"""
+CACHE_EVICTION_POLICY: typing.Final[str] = os.environ.get("YANV_CACHE_EVICTION_POLICY", "lru")
+"""How cached datasets are chosen for eviction - 'lru' for least recently used or 'gds' for GreedyDual-Size"""
+SPILL_DIRECTORY: typing.Final[str] = os.environ.get("YANV_SPILL_DIRECTORY", "")
+"""Where datasets evicted from memory may be written. A 'yanv' directory in the system's temporary directory if blank"""
+SPILL_BUDGET: typing.Final[str] = os.environ.get("YANV_SPILL_BUDGET", "0")
+"""How much disk space datasets evicted from memory may occupy, such as '20GB'. Nothing is written to disk if 0"""
+DOWNLOAD_DIRECTORY: typing.Final[str] = os.environ.get("YANV_DOWNLOAD_DIRECTORY", "")
+"""Where files loaded from the web are written. A 'yanv/downloads' directory in the system's temporary directory if blank"""
+DOWNLOAD_CACHE_BUDGET: typing.Final[str] = os.environ.get("YANV_DOWNLOAD_CACHE_BUDGET", "2GB")
+"""How much disk space files loaded from the web may occupy once nothing reads them. Nothing is kept if 0"""
+QUANTILE_ERROR: typing.Final[float] = float(os.environ.get("YANV_QUANTILE_ERROR", 0.01))
+"""How far, as a fraction of the number of values, an approximate quantile's rank may be from the true rank"""
+EXACT_QUANTILE_LIMIT: typing.Final[int] = int(os.environ.get("YANV_EXACT_QUANTILE_LIMIT", 1000000))
+"""The largest number of values in a variable for which quantiles will be exact rather than approximate"""
+PRECOMPUTE_STATISTICS: typing.Final[bool] = os.environ.get("YANV_PRECOMPUTE_STATISTICS", "no").lower() in ("t", "true", "y", "yes", "on", "1")
+"""Whether statistics for every variable are calculated in the background as soon as a dataset is loaded"""
+PERSISTENT_CACHE_PATH: typing.Final[str] = os.environ.get(
+    "YANV_PERSISTENT_CACHE",
+    os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")), "yanv", "sidecar.db")
+)
+"""Where summaries and statistics for local files are kept between runs. Nothing is kept between runs if blank"""
+SOCKET_CONCURRENCY: typing.Final[int] = int(os.environ.get("YANV_SOCKET_CONCURRENCY", 4))
+"""The number of messages from a single connection that may be processed at the same time"""
+SOCKET_QUEUE_SIZE: typing.Final[int] = int(os.environ.get("YANV_SOCKET_QUEUE_SIZE", 32))
+"""The number of messages from a single connection that may wait to be processed before no more are read"""
+SOCKET_HEARTBEAT: typing.Final[float] = float(os.environ.get("YANV_SOCKET_HEARTBEAT", 30))
+"""How many seconds pass between pings that check whether a connection's client is still there. 0 disables pings"""
+IDLE_TIMEOUT: typing.Final[float] = float(os.environ.get("YANV_IDLE_TIMEOUT", 3600))
+"""How many seconds a connection may go without sending a message before its data is released. 0 never releases it"""
+SESSION_GRACE_PERIOD: typing.Final[float] = float(os.environ.get("YANV_SESSION_GRACE_PERIOD", 120))
+"""How many seconds data loaded by a closed connection is kept in case the client reconnects. 0 releases it at once"""
 
 if ALLOW_REMOTE:
     logging.warning(
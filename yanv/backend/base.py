@@ -11,6 +11,7 @@ import pandas
 
 from yanv.cache import CACHE_TYPE
 from yanv.cache import InMemoryFrameCache
+from yanv.cache import SidecarStore
 
 
 class BaseBackend(typing.Protocol):
@@ -23,8 +24,32 @@ class BaseBackend(typing.Protocol):
     def cache(self) -> CACHE_TYPE:
         ...
 
+    @property
+    def store(self) -> typing.Optional[SidecarStore]:
+        """
+        Where information derived from data is kept between runs, if anywhere
+        """
+        return None
+
+    def get_loaded_ids(self) -> typing.Sequence[str]:
+        """
+        Get the IDs of all data loaded through this backend that is still available
+        """
+        return list(self.cache.keys())
+
+    def reclaim(self) -> int:
+        """
+        Completely clear out records from the backend and measure how much memory was released
+
+        Returns:
+            The number of bytes of data that were released from memory
+        """
+        size_before: int = self.cache.size
+        self.clean()
+        return max(size_before - self.cache.size, 0)
+
     @abc.abstractmethod
-    def load(self, path: PathLike, *args, **kwargs) -> str:
+    def load(self, path: PathLike, lazy: bool = None, *args, **kwargs) -> str:
         ...
 
     @abc.abstractmethod
@@ -1,22 +1,98 @@
 """
 Defines a backed that can load files
 """
+import os
 import typing
 import logging
 import pathlib
+import threading
 from os import PathLike
 import io
 from urllib.parse import urlparse
 
 import xarray
-import requests
 
+from yanv.application_details import LAZY_LOAD_THRESHOLD
 from yanv.backend.base import BaseBackend
 from yanv.cache import CACHE_TYPE
+from yanv.cache import CacheCapacityError
+from yanv.cache import DatasetCache
+from yanv.cache import DownloadCache
+from yanv.cache import FileIdentity
+from yanv.cache import SidecarStore
+from yanv.utilities.cancellation import CancellationToken
+from yanv.utilities.download import PROGRESS_CALLBACK
+from yanv.utilities.memory import format_size
 
 LOGGER: logging.Logger = logging.getLogger(pathlib.Path(__file__).stem)
 
 
+def should_load_lazily(size: int, threshold: int = None) -> bool:
+    """
+    Determine whether data of the given size should only have its header read upon loading
+
+    Args:
+        size: The number of bytes that make up the data
+        threshold: The number of bytes at which data should be loaded lazily. The application default is used if not given
+
+    Returns:
+        True if only the header of the data should be read upon loading
+    """
+    if threshold is None:
+        threshold = LAZY_LOAD_THRESHOLD
+
+    return size >= threshold
+
+
+def get_canonical_path(path: PathLike) -> str:
+    """
+    Get a form of a path that is the same no matter how the path was written so that a file is only loaded once
+
+    Args:
+        path: A path to a local file or a web address
+
+    Returns:
+        The absolute, resolved path for a local file. Web addresses are returned as they are
+    """
+    if urlparse(str(path)).scheme.startswith("http"):
+        return str(path)
+
+    try:
+        return str(pathlib.Path(path).expanduser().resolve())
+    except (OSError, ValueError):
+        return str(path)
+
+
+def open_dataset(source: PathLike | io.IOBase, lazy: bool, cache: DatasetCache = None, **kwargs) -> xarray.Dataset:
+    """
+    Open a dataset either in full or by only reading its header
+
+    When opened lazily, variable data is only read, slice by slice, when it is indexed. Read values are not retained
+    so that repeated reads of large variables don't slowly pull the entire file into memory
+
+    Args:
+        source: Where to read the data from
+        lazy: Whether to only read the header of the data
+        cache: The cache that data read in full will need to fit in
+        **kwargs: Keyword arguments to pass to xarray when opening
+
+    Returns:
+        The opened dataset
+    """
+    if lazy:
+        return xarray.open_dataset(source, cache=False, **kwargs)
+
+    with xarray.open_dataset(source, **kwargs) as dataset:
+        # Check the size described by the header before reading anything so that data that could never be kept
+        #   is turned away before it is pulled into memory
+        if cache is not None and not cache.fits(dataset.nbytes):
+            raise CacheCapacityError(
+                f"Cannot load all {format_size(dataset.nbytes)} of {source} into memory - "
+                f"it is more than the cache may hold. Try loading it lazily instead."
+            )
+        return dataset.load()
+
+
 class FileBackend(BaseBackend):
     """
     A backend built to focus on loading data from the local file system
@@ -24,32 +100,104 @@ class FileBackend(BaseBackend):
 
     def clean(self) -> None:
         self.cache.clear()
+        self.__release_downloads()
+
+    def __release_downloads(self, keep: typing.Iterable[str] = None):
+        """
+        Let the download cache know that local copies of downloaded files are no longer read for data that is
+        no longer held, so that they may be deleted if it needs room
+
+        Args:
+            keep: The IDs of data whose downloads are still being read
+        """
+        keep = set(keep or [])
+
+        with self.__lock:
+            unused_ids = [data_id for data_id in self.__downloads if data_id not in keep]
+            unused_urls = [self.__downloads.pop(data_id) for data_id in unused_ids]
+
+        for url in unused_urls:
+            self.downloads.release(url)
 
     @property
     def cache(self) -> CACHE_TYPE:
         return self.__cache
 
-    def load(self, path: PathLike, *args, **kwargs) -> str:
+    @property
+    def store(self) -> typing.Optional[SidecarStore]:
+        return self.__store
+
+    @property
+    def downloads(self) -> DownloadCache:
+        """
+        Where files loaded from the web are kept. Only created once something is loaded from the web
+        """
+        with self.__lock:
+            if self.__download_cache is None:
+                self.__download_cache = DownloadCache()
+            return self.__download_cache
+
+    def load(
+        self,
+        path: PathLike,
+        lazy: bool = None,
+        *args,
+        progress: PROGRESS_CALLBACK = None,
+        cancellation_token: CancellationToken = None,
+        **kwargs
+    ) -> str:
         """
-        Load the data from disk. Load from the web and keep it in memory if an http address is passed
+        Load the data from disk. Data at an http address is streamed to a local file first and read from there
 
         Args:
             path: Where to find the data
+            lazy: Whether to only read the header of the data and pull variable data as needed. Local files at or
+                above the lazy load threshold and all downloaded files are loaded lazily if not specified
             *args:
+            progress: Called with the number of bytes received so far and the expected total while downloading
+            cancellation_token: A token to check while downloading in case loading should stop early
             **kwargs:
 
         Returns:
             The proper identifier to use to find the data within the backend
         """
+        path = get_canonical_path(path)
+
+        # Downloads for data that is no longer held don't need to be kept around
+        self.__release_downloads(keep=self.cache.keys())
+
+        # Loading the same path from two threads at once would read the file twice, so only load a path one at a time
+        with self.__get_path_lock(path):
+            return self.__load(path, lazy=lazy, progress=progress, cancellation_token=cancellation_token)
+
+    def __get_path_lock(self, path: PathLike) -> threading.Lock:
+        with self.__lock:
+            if path not in self.__path_locks:
+                self.__path_locks[path] = threading.Lock()
+            return self.__path_locks[path]
+
+    def __load(
+        self,
+        path: PathLike,
+        lazy: bool = None,
+        progress: PROGRESS_CALLBACK = None,
+        cancellation_token: CancellationToken = None,
+    ) -> str:
         preexisting_id = self.__entry_record.get(path)
 
         # If the data already exists, just return that data
         if preexisting_id:
             frame = self.cache.get(preexisting_id)
-            if frame:
+            identity: typing.Optional[FileIdentity] = self.cache.recall(preexisting_id, "file_identity")
+
+            if frame is not None and (identity is None or identity.is_current()):
                 return preexisting_id
 
-            # If the key was there but didn't bear any data, kill the key
+            # If the key was there but didn't bear any data or the file has changed since, kill the key
+            if frame is not None:
+                LOGGER.debug(f"{path} has changed since it was loaded - loading it again")
+                self.cache.remove(preexisting_id)
+
             del self.__entry_record[path]
 
         parsed_url = urlparse(str(path))
@@ -57,29 +205,86 @@ class FileBackend(BaseBackend):
             # Requesting data via web address will play foul with the address string by flipping forward slashes on
             # windows. Reverse received backslashes to create proper urls
             sanitized_path: str = parsed_url.path.replace("\\", "/")
-            url = f"{parsed_url.scheme}:/{sanitized_path}"
 
-            # Download the data and save within an in-memory dataset
+            # Flipped slashes may also have collapsed the '//' before the host, leaving the host in the path
+            if parsed_url.netloc:
+                url = parsed_url._replace(path=sanitized_path).geturl()
+            else:
+                url = f"{parsed_url.scheme}:/{sanitized_path}"
+
+            # Stream the data to a local file rather than holding all of it in memory. A copy from an earlier load
+            #   is reused if the server says that it hasn't changed
             LOGGER.debug(f"Downloading data from {url}")
-            with requests.get(url) as response:
-                import pathlib
-                buffer = io.BytesIO(response.content)
-                buffer.seek(0)
-                dataset = xarray.load_dataset(buffer, engine="h5netcdf")
-                dataset.encoding['source'] = url
+            local_path = self.downloads.fetch(url, progress=progress, cancellation_token=cancellation_token)
             LOGGER.debug(f"Data downloaded from {url}")
+
+            # The local copy may be read from as cheaply as any other local file, so only read what is needed
+            if lazy is None:
+                lazy = True
+
+            try:
+                dataset = open_dataset(local_path, lazy=lazy, cache=self.cache)
+            except BaseException:
+                self.downloads.release(url)
+                raise
+
+            dataset.encoding["origin"] = url
         else:
-            dataset = xarray.load_dataset(path)
+            if lazy is None:
+                lazy = should_load_lazily(os.path.getsize(path))
+
+            dataset = open_dataset(path, lazy=lazy, cache=self.cache)
+
+        LOGGER.debug(f"Loaded {path} {'lazily' if lazy else 'in full'}")
 
         data_id = self.cache.add(dataset)
         self.__entry_record[path] = data_id
 
+        if parsed_url.scheme.startswith("http"):
+            with self.__lock:
+                self.__downloads[data_id] = url
+
+        identity: typing.Optional[FileIdentity] = (
+            None if parsed_url.scheme.startswith("http") else FileIdentity.from_path(path)
+        )
+
+        if identity is not None:
+            self.cache.remember(data_id, "file_identity", identity)
+            self.__restore_summary(data_id, identity)
+
         return data_id
 
-    def __init__(self, cache: CACHE_TYPE = None):
-        if cache:
+    def __restore_summary(self, data_id: str, identity: FileIdentity):
+        """
+        Use the summary of a file from the persistent store if it was summarized before. Summarize it and store the
+        summary otherwise
+
+        Args:
+            data_id: The ID of the loaded data
+            identity: The identity of the file that the data was loaded from
+        """
+        if self.store is None:
+            return
+
+        summary = self.store.get(identity, "summary")
+
+        if summary is not None:
+            LOGGER.debug(f"Using the stored summary of {identity.path}")
+            self.cache.remember(data_id, "summary", summary)
+        else:
+            self.store.put(identity, "summary", self.cache.get_information(data_id))
+
+    def __init__(self, cache: CACHE_TYPE = None, store: SidecarStore = None, downloads: DownloadCache = None):
+        if cache is not None:
             self.__cache = cache
         else:
             self.__cache = self.get_default_cache()
 
+        self.__store: typing.Optional[SidecarStore] = store
+
         self.__entry_record: typing.Dict[PathLike, str] = dict()
+        self.__path_locks: typing.Dict[PathLike, threading.Lock] = dict()
+        self.__download_cache: typing.Optional[DownloadCache] = downloads
+        self.__downloads: typing.Dict[str, str] = dict()
+        """The addresses of downloaded files, keyed by the ID of the data read from them"""
+        self.__lock: threading.Lock = threading.Lock()
@@ -0,0 +1,176 @@
+"""
+Lets every connection to the application share the data that has been loaded so that the same file is only held
+in memory once, no matter how many connections are looking at it
+"""
+from __future__ import annotations
+
+import typing
+import logging
+import pathlib
+import threading
+from os import PathLike
+
+from aiohttp import web
+
+from yanv.backend.base import BaseBackend
+from yanv.backend.file import FileBackend
+from yanv.cache import CACHE_TYPE
+from yanv.cache import SidecarStore
+from yanv.cache.base import ID_GENERATOR
+
+LOGGER: logging.Logger = logging.getLogger(pathlib.Path(__file__).stem)
+
+
+class DatasetRegistry:
+    """
+    Keeps track of which connections hold which loaded datasets.
+
+    All datasets are loaded through a single backend, so a file that is opened by several connections is only read
+    once and each connection is given the same data ID for it. A dataset is removed from the backend's cache once
+    the last connection holding it lets it go. Safe to use from multiple threads
+    """
+    def __init__(self, backend: FileBackend = None):
+        """
+        Args:
+            backend: The backend that every connection loads data through
+        """
+        self.__backend: FileBackend = backend or FileBackend()
+        self.__holders: typing.Dict[str, typing.Set[str]] = dict()
+        self.__lock: threading.Lock = threading.Lock()
+
+    @property
+    def backend(self) -> FileBackend:
+        return self.__backend
+
+    def attach(self, holder: str, path: PathLike, lazy: bool = None, **kwargs) -> str:
+        """
+        Load data on behalf of a connection, reusing the data if it has already been loaded
+
+        Args:
+            holder: The ID of the connection that wants the data
+            path: Where to find the data
+            lazy: Whether to only read the header of the data and pull variable data as needed
+            **kwargs: Keyword arguments for the backend's `load`, such as a progress callback
+
+        Returns:
+            The ID of the loaded data
+        """
+        data_id: str = self.__backend.load(path, lazy=lazy, **kwargs)
+
+        with self.__lock:
+            self.__holders.setdefault(data_id, set()).add(holder)
+
+        return data_id
+
+    def detach(self, holder: str, data_id: str = None) -> typing.Sequence[str]:
+        """
+        Let go of data on behalf of a connection. Data that is no longer held by any connection is removed
+
+        Args:
+            holder: The ID of the connection that no longer needs the data
+            data_id: The ID of the data to let go of. Everything held by the connection is let go if not given
+
+        Returns:
+            The IDs of the data that were removed because nothing held them anymore
+        """
+        with self.__lock:
+            data_ids: typing.Sequence[str] = [data_id] if data_id is not None else list(self.__holders.keys())
+            released_ids: typing.List[str] = list()
+
+            for held_id in data_ids:
+                holders: typing.Optional[typing.Set[str]] = self.__holders.get(held_id)
+
+                if holders is None or holder not in holders:
+                    continue
+
+                holders.discard(holder)
+
+                if not holders:
+                    del self.__holders[held_id]
+                    released_ids.append(held_id)
+
+        for released_id in released_ids:
+            LOGGER.debug(f"No connection holds {released_id} anymore - removing it")
+            self.__backend.cache.remove(released_id)
+
+        return released_ids
+
+    def count_holders(self, data_id: str) -> int:
+        """
+        Get the number of connections holding the given data
+        """
+        with self.__lock:
+            return len(self.__holders.get(data_id, ()))
+
+    def get_held(self, holder: str) -> typing.Sequence[str]:
+        """
+        Get the IDs of all data held by a connection
+        """
+        with self.__lock:
+            return [data_id for data_id, holders in self.__holders.items() if holder in holders]
+
+    def __str__(self):
+        with self.__lock:
+            return f"{self.__class__.__name__}(datasets={len(self.__holders)})"
+
+    def __repr__(self):
+        return self.__str__()
+
+
+class SharedBackend(BaseBackend):
+    """
+    A single connection's view of the data held by a dataset registry
+    """
+    def __init__(self, registry: DatasetRegistry, holder: str = None):
+        """
+        Args:
+            registry: The registry shared by every connection
+            holder: The ID of the connection. A new ID is generated if not given
+        """
+        self.__registry: DatasetRegistry = registry
+        self.__holder: str = holder or ID_GENERATOR.generate_id()
+
+    @property
+    def registry(self) -> DatasetRegistry:
+        return self.__registry
+
+    @property
+    def holder(self) -> str:
+        return self.__holder
+
+    @property
+    def cache(self) -> CACHE_TYPE:
+        return self.__registry.backend.cache
+
+    @property
+    def store(self) -> typing.Optional[SidecarStore]:
+        return self.__registry.backend.store
+
+    def load(self, path: PathLike, lazy: bool = None, *args, **kwargs) -> str:
+        return self.__registry.attach(self.__holder, path, lazy=lazy, **kwargs)
+
+    def get_loaded_ids(self) -> typing.Sequence[str]:
+        """
+        Get the IDs of all data held by this connection that is still available
+        """
+        available_ids: typing.Set[str] = set(self.cache.keys())
+        return [data_id for data_id in self.__registry.get_held(self.__holder) if data_id in available_ids]
+
+    def release(self, data_id: str):
+        """
+        Let go of data that this connection no longer needs
+
+        Args:
+            data_id: The ID of the data to let go of
+        """
+        self.__registry.detach(self.__holder, data_id)
+
+    def clean(self) -> None:
+        """
+        Let go of everything this connection holds. Data that other connections still hold is kept
+        """
+        self.__registry.detach(self.__holder)
+
+
+DATASET_REGISTRY_KEY: web.AppKey[DatasetRegistry] = web.AppKey("dataset_registry", DatasetRegistry)
+"""The key for the registry of data shared by every connection within the web application"""
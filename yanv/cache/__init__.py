@@ -3,5 +3,14 @@
 """
 from .base import DatasetCache
 from .base import CACHE_TYPE
+from .base import CacheCapacityError
 
 from .memory import InMemoryFrameCache
+
+from .disk import DiskSpillCache
+from .disk import TieredFrameCache
+
+from .downloads import DownloadCache
+
+from .sidecar import FileIdentity
+from .sidecar import SidecarStore
@@ -2,6 +2,7 @@
 Defines the base class for the cache that will store loaded xarray data
 """
 import abc
+import json
 import typing
 import random
 import string
@@ -29,18 +30,25 @@ class IDGenerator:
         return ''.join(random.choices(population=self.character_set, k=self.id_length))
 
     def generate_id(self) -> str:
-        new_id: str = self._build_id()
+        with self.generated_ids:
+            new_id: str = self._build_id()
 
-        while new_id in self.generated_ids:
-            new_id = self._build_id()
+            while new_id in self.generated_ids:
+                new_id = self._build_id()
 
-        self.generated_ids.add(new_id)
+            self.generated_ids.add(new_id)
         return new_id
 
 
 ID_GENERATOR: IDGenerator = IDGenerator()
 
 
+class CacheCapacityError(Exception):
+    """
+    Raised when data is too large to ever fit within a cache
+    """
+
+
 class DatasetCache(abc.ABC):
     """
     The interface for a mechanism that keeps xarray datasets available in memory
@@ -54,9 +62,60 @@ class DatasetCache(abc.ABC):
         """
         return ID_GENERATOR.generate_id()
 
+    @property
+    def _companions(self) -> typing.Dict[str, typing.Dict[str, typing.Any]]:
+        """
+        Values derived from cached datasets, organized by the ID of the dataset they were derived from
+        """
+        if not hasattr(self, "_companions_"):
+            self._companions_ = dict()
+        return self._companions_
+
+    def remember(self, key: str, name: str, value: typing.Any) -> typing.Any:
+        """
+        Store a value derived from a cached dataset alongside it. The value is forgotten once the dataset is removed
+
+        Args:
+            key: The ID of the dataset that the value was derived from
+            name: The name of the value
+            value: The value to store
+
+        Returns:
+            The stored value
+        """
+        self._companions.setdefault(key, dict())[name] = value
+        return value
+
+    def recall(self, key: str, name: str, default: typing.Any = None) -> typing.Any:
+        """
+        Get a value that was stored alongside a cached dataset
+
+        Args:
+            key: The ID of the dataset that the value was derived from
+            name: The name of the value
+            default: What to return if no such value was stored
+
+        Returns:
+            The stored value
+        """
+        return self._companions.get(key, dict()).get(name, default)
+
+    def forget(self, key: str = None):
+        """
+        Discard values that were stored alongside a cached dataset
+
+        Args:
+            key: The ID of the dataset whose values should be discarded. Values for every dataset are discarded if
+                not given
+        """
+        if key is None:
+            self._companions.clear()
+        else:
+            self._companions.pop(key, None)
+
     def get_information(self, key: str) -> typing.Optional[Dataset]:
         """
-        Try to get a dataset summary by its ID
+        Try to get a dataset summary by its ID. The summary is only built once per dataset
 
         Args:
             key: The ID issued when the desired dataset was added to the cache
@@ -64,8 +123,40 @@ class DatasetCache(abc.ABC):
         Returns:
             The retrieved dataset
         """
-        dataset = self.get(key=key)
-        return Dataset.from_xarray(dataset) if dataset else None
+        summary: typing.Optional[Dataset] = self.recall(key, "summary")
+
+        if summary is None:
+            dataset = self.get(key=key)
+
+            if dataset is None:
+                return None
+
+            summary = self.remember(key, "summary", Dataset.from_xarray(dataset))
+
+        return summary
+
+    def get_serialized_information(self, key: str) -> typing.Optional[str]:
+        """
+        Try to get a dataset summary by its ID, already serialized to JSON. The summary is only serialized once per
+        dataset
+
+        Args:
+            key: The ID issued when the desired dataset was added to the cache
+
+        Returns:
+            The dataset summary as a JSON string
+        """
+        serialized_summary: typing.Optional[str] = self.recall(key, "serialized_summary")
+
+        if serialized_summary is None:
+            summary = self.get_information(key)
+
+            if summary is None:
+                return None
+
+            serialized_summary = self.remember(key, "serialized_summary", json.dumps(summary.model_dump()))
+
+        return serialized_summary
 
     def get_frame(self, key: str) -> typing.Optional[pandas.DataFrame]:
         """
@@ -80,6 +171,37 @@ class DatasetCache(abc.ABC):
         dataset = self.get(key)
         return dataset.to_dataframe().reset_index() if isinstance(dataset, xarray.Dataset) else None
 
+    @property
+    def size(self) -> int:
+        """
+        The number of bytes that datasets within the cache occupy, if known
+        """
+        return 0
+
+    def fits(self, size: int) -> bool:
+        """
+        Whether data of the given size could be held by the cache, even if everything else had to be evicted
+
+        Args:
+            size: The number of bytes that the data will occupy in memory
+
+        Returns:
+            True if the cache could hold the data
+        """
+        return True
+
+    def spill(self, key: str) -> bool:
+        """
+        Move data to cheaper storage, such as the local disk, if the cache supports it
+
+        Args:
+            key: The ID of the data to move
+
+        Returns:
+            Whether the data was moved
+        """
+        return False
+
     @abc.abstractmethod
     def add(self, data: xarray.Dataset):
         ...
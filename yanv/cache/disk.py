@@ -0,0 +1,392 @@
+"""
+Caches that keep datasets on the local disk in a layout that may be memory mapped instead of decoded
+"""
+from __future__ import annotations
+
+import os
+import pickle
+import shutil
+import typing
+import logging
+import pathlib
+import tempfile
+
+import numpy
+import xarray
+
+from yanv.application_details import SPILL_BUDGET
+from yanv.application_details import SPILL_DIRECTORY
+from yanv.cache.base import DatasetCache
+from yanv.cache.memory import InMemoryFrameCache
+from yanv.cache.policy import EvictionPolicy
+from yanv.cache.policy import LeastRecentlyUsedPolicy
+from yanv.utilities.memory import format_size
+from yanv.utilities.memory import parse_memory_size
+from yanv.utilities.mixins import Lockable
+
+LOGGER: logging.Logger = logging.getLogger(pathlib.Path(__file__).stem)
+
+_MANIFEST_NAME: typing.Final[str] = "manifest.pickle"
+
+
+def get_directory_size(directory: pathlib.Path) -> int:
+    """
+    Get the number of bytes occupied by all files within a directory
+    """
+    return sum(path.stat().st_size for path in directory.rglob("*") if path.is_file())
+
+
+def write_dataset(dataset: xarray.Dataset, directory: pathlib.Path) -> int:
+    """
+    Write a dataset to a directory as a set of uncompressed numpy arrays that may be memory mapped later
+
+    Args:
+        dataset: The dataset to write
+        directory: The directory to write the dataset into. It will be replaced if it already exists
+
+    Returns:
+        The number of bytes written
+    """
+    # Write everything to a neighboring directory first so that a failed write never leaves a partial entry behind
+    partial_directory = directory.with_name(directory.name + ".partial")
+    shutil.rmtree(partial_directory, ignore_errors=True)
+    partial_directory.mkdir(parents=True)
+
+    try:
+        variables: typing.Dict[str, typing.Dict[str, typing.Any]] = dict()
+
+        for index, (name, variable) in enumerate(dataset.variables.items()):
+            filename = f"{index}.npy"
+            values = numpy.asarray(variable.values)
+            numpy.save(partial_directory / filename, values, allow_pickle=values.dtype.hasobject)
+            variables[name] = {
+                "filename": filename,
+                "dims": variable.dims,
+                "attrs": dict(variable.attrs),
+                "encoding": dict(variable.encoding),
+                "is_coordinate": name in dataset.coords,
+            }
+
+        manifest = {
+            "variables": variables,
+            "attrs": dict(dataset.attrs),
+            "encoding": dict(dataset.encoding),
+        }
+
+        with open(partial_directory / _MANIFEST_NAME, "wb") as manifest_file:
+            pickle.dump(manifest, manifest_file)
+
+        shutil.rmtree(directory, ignore_errors=True)
+        partial_directory.rename(directory)
+    except BaseException:
+        shutil.rmtree(partial_directory, ignore_errors=True)
+        raise
+
+    return get_directory_size(directory)
+
+
+def read_dataset(directory: pathlib.Path) -> xarray.Dataset:
+    """
+    Read a dataset written by `write_dataset`, memory mapping its values rather than reading them
+
+    Args:
+        directory: The directory that the dataset was written to
+
+    Returns:
+        A dataset whose variables are backed by memory mapped files
+    """
+    with open(directory / _MANIFEST_NAME, "rb") as manifest_file:
+        manifest = pickle.load(manifest_file)
+
+    data_variables: typing.Dict[str, xarray.Variable] = dict()
+    coordinates: typing.Dict[str, xarray.Variable] = dict()
+
+    for name, description in manifest["variables"].items():
+        path = directory / description["filename"]
+
+        try:
+            values = numpy.load(path, mmap_mode="r")
+        except ValueError:
+            # Arrays of python objects, like strings of varying length, can't be memory mapped
+            values = numpy.load(path, allow_pickle=True)
+
+        variable = xarray.Variable(
+            dims=description["dims"],
+            data=values,
+            attrs=description["attrs"],
+            encoding=description["encoding"],
+        )
+
+        if description["is_coordinate"]:
+            coordinates[name] = variable
+        else:
+            data_variables[name] = variable
+
+    dataset = xarray.Dataset(data_vars=data_variables, coords=coordinates, attrs=manifest["attrs"])
+    dataset.encoding.update(manifest["encoding"])
+    return dataset
+
+
+class DiskSpillCache(Lockable, DatasetCache):
+    """
+    A dataset cache that keeps data in a scratch directory as uncompressed arrays.
+
+    Retrieving data maps the stored arrays into memory without copying or decoding them, making it far cheaper than
+    reading the original, compressed file again. The least recently used entries are deleted once the directory
+    grows past its budget
+    """
+    def __init__(
+        self,
+        directory: typing.Union[str, os.PathLike] = None,
+        budget: typing.Union[str, int, float] = None,
+        eviction_policy: EvictionPolicy = None,
+    ):
+        """
+        Args:
+            directory: The directory to create the scratch directory in. Uses the application default if not given
+            budget: How much disk space the cache may occupy. Uses the application default if not given
+            eviction_policy: The policy deciding which entries to delete first. Least recently used if not given
+        """
+        if directory is None:
+            directory = SPILL_DIRECTORY or pathlib.Path(tempfile.gettempdir()) / "yanv"
+
+        if budget is None:
+            budget = SPILL_BUDGET
+
+        root = pathlib.Path(directory)
+        root.mkdir(parents=True, exist_ok=True)
+
+        # Each cache receives its own scratch directory so that caches never step on each other's data
+        self._directory: pathlib.Path = pathlib.Path(tempfile.mkdtemp(prefix="spill-", dir=root))
+        self._budget: int = parse_memory_size(budget)
+        self._sizes: typing.Dict[str, int] = dict()
+        self._total_size: int = 0
+        self._policy: EvictionPolicy = eviction_policy or LeastRecentlyUsedPolicy()
+
+    @property
+    def directory(self) -> pathlib.Path:
+        return self._directory
+
+    @property
+    def budget(self) -> int:
+        return self._budget
+
+    @property
+    def size(self) -> int:
+        with self:
+            return self._total_size
+
+    def fits(self, size: int) -> bool:
+        return size <= self._budget
+
+    def _get_entry_directory(self, key: str) -> pathlib.Path:
+        return self._directory / key
+
+    def store(self, key: str, data: xarray.Dataset) -> bool:
+        """
+        Write a dataset to disk under the given key
+
+        Args:
+            key: The key to store the dataset under
+            data: The dataset to store
+
+        Returns:
+            Whether the dataset was stored
+        """
+        if not self.fits(data.nbytes):
+            LOGGER.debug(f"Not spilling {key} to disk - {format_size(data.nbytes)} is larger than the disk budget")
+            return False
+
+        with self:
+            size = write_dataset(data, self._get_entry_directory(key))
+            self._total_size += size - self._sizes.get(key, 0)
+            self._sizes[key] = size
+            self._policy.touch(key, size)
+            LOGGER.debug(f"Spilled {format_size(size)} to disk for {key}")
+            self.clean_up(keep=key)
+
+        return key in self._sizes
+
+    def add(self, data: xarray.Dataset) -> str:
+        new_id: str = self._generate_data_id()
+        self.store(new_id, data)
+        return new_id
+
+    def remove(self, data_id: str):
+        with self:
+            self._total_size -= self._sizes.pop(data_id, 0)
+            self._policy.discard(data_id)
+            self.forget(data_id)
+            shutil.rmtree(self._get_entry_directory(data_id), ignore_errors=True)
+
+    def __len__(self) -> int:
+        return len(self._sizes)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._sizes
+
+    def keys(self) -> typing.Iterable[str]:
+        with self:
+            return list(self._sizes.keys())
+
+    def clean_up(self, keep: str = None):
+        with self:
+            kept: bool = False
+
+            while self._total_size > self._budget:
+                evicted_id: typing.Optional[str] = self._policy.evict()
+
+                if evicted_id is None:
+                    break
+
+                if evicted_id == keep:
+                    kept = True
+                    continue
+
+                LOGGER.debug(f"The spill directory is full - deleting {evicted_id}")
+                self.remove(evicted_id)
+
+            if kept:
+                self._policy.touch(keep, self._sizes.get(keep, 0))
+
+    def clear(self):
+        with self:
+            for key in list(self._sizes.keys()):
+                self.remove(key)
+
+            self._policy.clear()
+            self.forget()
+            shutil.rmtree(self._directory, ignore_errors=True)
+            self._directory.mkdir(parents=True, exist_ok=True)
+
+    def get(self, key: str) -> typing.Optional[xarray.Dataset]:
+        with self:
+            if key not in self._sizes:
+                return None
+
+            self._policy.touch(key, self._sizes[key])
+
+        return read_dataset(self._get_entry_directory(key))
+
+
+def get_reopenable_source(dataset: xarray.Dataset) -> typing.Optional[str]:
+    """
+    Get the path to the local file that a lazily opened dataset reads from
+
+    Args:
+        dataset: The dataset that may have been opened lazily
+
+    Returns:
+        The path to the file that backs the dataset. None if the dataset was read into memory or isn't backed by a
+        local file
+    """
+    source = dataset.encoding.get("source")
+
+    if not isinstance(source, str) or not os.path.isfile(source):
+        return None
+
+    if all(variable._in_memory for variable in dataset.variables.values()):
+        return None
+
+    return source
+
+
+class TieredFrameCache(InMemoryFrameCache):
+    """
+    A dataset cache that keeps recently used data in memory and spills evicted data to disk.
+
+    Evicted data is written to a size-capped scratch directory as uncompressed arrays. Retrieving it again maps
+    those arrays back into memory rather than decoding the original file again. Evicted data that was only being
+    read lazily from a local file isn't written at all - the file is simply opened again when needed
+    """
+    def __init__(
+        self,
+        limit: int = None,
+        memory_budget: typing.Union[str, int, float] = None,
+        eviction_policy: typing.Union[str, EvictionPolicy] = None,
+        spill_directory: typing.Union[str, os.PathLike] = None,
+        spill_budget: typing.Union[str, int, float] = None,
+    ):
+        super().__init__(limit=limit, memory_budget=memory_budget, eviction_policy=eviction_policy)
+        self._disk: DiskSpillCache = DiskSpillCache(directory=spill_directory, budget=spill_budget)
+        self._reopenable: typing.Dict[str, str] = dict()
+
+    @property
+    def disk(self) -> DiskSpillCache:
+        return self._disk
+
+    def spill(self, key: str) -> bool:
+        with self:
+            dataset: typing.Optional[xarray.Dataset] = self._datasets.get(key)
+
+            if dataset is None or not self._disk.store(key, dataset):
+                return False
+
+            # Swap the in-memory copy for the memory mapped one so that the copy in memory may be released
+            self._discard(key)
+            self._insert(key, self._disk.get(key))
+
+        return True
+
+    def _evict(self, data_id: str):
+        dataset: typing.Optional[xarray.Dataset] = self._datasets.get(data_id)
+
+        if dataset is not None and data_id not in self._disk:
+            source = get_reopenable_source(dataset)
+
+            if source is not None:
+                self._reopenable[data_id] = source
+            else:
+                try:
+                    self._disk.store(data_id, dataset)
+                except Exception as e:
+                    LOGGER.error(f"Could not spill {data_id} to disk: {e}", exc_info=True)
+
+        # Anything derived from the dataset is still valid since it may still be retrieved from disk
+        self._discard(data_id)
+
+    def recall(self, key: str, name: str, default: typing.Any = None) -> typing.Any:
+        # The disk tier may have deleted the dataset on its own, so make sure it still exists somewhere
+        if key not in self._datasets and key not in self._disk and key not in self._reopenable:
+            self.forget(key)
+            return default
+
+        return super().recall(key, name, default)
+
+    def remove(self, data_id: str):
+        with self:
+            super().remove(data_id)
+            self._disk.remove(data_id)
+            self._reopenable.pop(data_id, None)
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def keys(self) -> typing.Iterable[str]:
+        with self:
+            return list(
+                dict.fromkeys([*self._datasets.keys(), *self._disk.keys(), *self._reopenable.keys()])
+            )
+
+    def clear(self):
+        with self:
+            super().clear()
+            self._disk.clear()
+            self._reopenable.clear()
+
+    def get(self, key: str) -> typing.Optional[xarray.Dataset]:
+        with self:
+            dataset = super().get(key)
+
+            if dataset is not None:
+                return dataset
+
+            if key in self._disk:
+                dataset = self._disk.get(key)
+            elif key in self._reopenable:
+                dataset = xarray.open_dataset(self._reopenable.pop(key), cache=False)
+            else:
+                return None
+
+            self._insert(key, dataset)
+            return dataset
@@ -0,0 +1,332 @@
+"""
+A size-capped, on-disk cache of files loaded from the web. Cached files are revalidated with conditional requests,
+so loading the same address again only costs a round trip unless the file has changed
+"""
+from __future__ import annotations
+
+import os
+import json
+import time
+import typing
+import logging
+import pathlib
+import threading
+import collections
+import dataclasses
+
+import requests
+
+from yanv.application_details import DOWNLOAD_CACHE_BUDGET
+from yanv.utilities.cancellation import CancellationToken
+from yanv.utilities.download import DOWNLOAD_TIMEOUT
+from yanv.utilities.download import PROGRESS_CALLBACK
+from yanv.utilities.download import get_download_directory
+from yanv.utilities.download import get_download_name
+from yanv.utilities.download import get_session
+from yanv.utilities.download import write_response
+from yanv.utilities.memory import format_size
+from yanv.utilities.memory import parse_memory_size
+from yanv.utilities.mixins import Lockable
+
+LOGGER: logging.Logger = logging.getLogger(pathlib.Path(__file__).stem)
+
+_METADATA_SUFFIX: typing.Final[str] = ".json"
+
+
+@dataclasses.dataclass
+class CachedDownload:
+    """
+    A file that was downloaded along with what is needed to ask the server whether it has changed since
+    """
+    url: str
+    path: pathlib.Path
+    size: int
+    etag: typing.Optional[str] = None
+    last_modified: typing.Optional[str] = None
+    last_used: float = dataclasses.field(default_factory=time.time)
+
+    @property
+    def metadata_path(self) -> pathlib.Path:
+        return self.path.with_name(self.path.name + _METADATA_SUFFIX)
+
+    @property
+    def is_revalidatable(self) -> bool:
+        """
+        Whether the server gave anything that may be used to check whether the file changed
+        """
+        return bool(self.etag or self.last_modified)
+
+    def get_conditional_headers(self) -> typing.Dict[str, str]:
+        """
+        Get the headers that ask the server to only send the file again if it has changed
+        """
+        headers: typing.Dict[str, str] = dict()
+
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+
+        return headers
+
+    def save(self):
+        """
+        Write the description of the download next to the downloaded file
+        """
+        metadata = dataclasses.asdict(self)
+        metadata["path"] = self.path.name
+        self.metadata_path.write_text(json.dumps(metadata))
+
+    @classmethod
+    def load(cls, metadata_path: pathlib.Path) -> typing.Optional[CachedDownload]:
+        """
+        Read the description of a download
+
+        Args:
+            metadata_path: The path to the description
+
+        Returns:
+            The described download. None if the description can't be read or the file is gone
+        """
+        try:
+            metadata = json.loads(metadata_path.read_text())
+            metadata["path"] = metadata_path.parent / metadata["path"]
+            download = cls(**metadata)
+        except (OSError, ValueError, TypeError, KeyError):
+            return None
+
+        return download if download.path.is_file() else None
+
+
+class DownloadCache(Lockable):
+    """
+    Keeps files downloaded from the web on disk, keyed by their address.
+
+    Fetching an address that was fetched before sends a conditional request with the ETag and Last-Modified values
+    the server gave last time. If the server answers that nothing changed, the file on disk is used as is. If the
+    server can't be reached, the file on disk is used anyway.
+
+    Files that are being read are held and never deleted. The least recently used files that aren't held are
+    deleted once the cache grows past its budget. Safe to use from multiple threads
+    """
+    def __init__(
+        self,
+        directory: typing.Union[str, os.PathLike] = None,
+        budget: typing.Union[str, int, float] = None,
+    ):
+        """
+        Args:
+            directory: Where downloaded files are written. Uses the application default if not given
+            budget: How much disk space files that aren't held may occupy. Uses the application default if not given
+        """
+        if budget is None:
+            budget = DOWNLOAD_CACHE_BUDGET
+
+        self._directory: pathlib.Path = get_download_directory(directory)
+        self._budget: int = parse_memory_size(budget)
+        self._entries: typing.Dict[str, CachedDownload] = dict()
+        self._holds: typing.Counter[str] = collections.Counter()
+        self._url_locks: typing.Dict[str, threading.Lock] = dict()
+
+        # Files downloaded by earlier runs may still be used
+        for metadata_path in self._directory.glob(f"*{_METADATA_SUFFIX}"):
+            entry = CachedDownload.load(metadata_path)
+
+            if entry is not None:
+                self._entries[entry.url] = entry
+
+        self.clean_up()
+
+    @property
+    def directory(self) -> pathlib.Path:
+        return self._directory
+
+    @property
+    def budget(self) -> int:
+        return self._budget
+
+    @property
+    def size(self) -> int:
+        with self:
+            return sum(entry.size for entry in self._entries.values())
+
+    def _get_url_lock(self, url: str) -> threading.Lock:
+        with self:
+            if url not in self._url_locks:
+                self._url_locks[url] = threading.Lock()
+            return self._url_locks[url]
+
+    def fetch(
+        self,
+        url: str,
+        progress: PROGRESS_CALLBACK = None,
+        cancellation_token: CancellationToken = None,
+    ) -> pathlib.Path:
+        """
+        Get a local copy of a file on the web, downloading it only if it isn't cached or has changed.
+
+        The file is held until `release` is called for the address
+
+        Args:
+            url: The address of the file
+            progress: Called as data arrives with the number of bytes received so far and the expected total
+            cancellation_token: A token to check while downloading in case the download should stop early
+
+        Returns:
+            The path to the local copy of the file
+        """
+        with self:
+            self._holds[url] += 1
+
+        try:
+            with self._get_url_lock(url):
+                return self._fetch(url, progress=progress, cancellation_token=cancellation_token)
+        except BaseException:
+            self.release(url)
+            raise
+
+    def _fetch(
+        self,
+        url: str,
+        progress: PROGRESS_CALLBACK = None,
+        cancellation_token: CancellationToken = None,
+    ) -> pathlib.Path:
+        with self:
+            entry: typing.Optional[CachedDownload] = self._entries.get(url)
+
+        if entry is not None and not entry.path.is_file():
+            self.remove(url)
+            entry = None
+
+        headers = entry.get_conditional_headers() if entry is not None else {}
+
+        try:
+            with get_session().get(url, headers=headers, stream=True, timeout=DOWNLOAD_TIMEOUT) as response:
+                if response.status_code == 304 and entry is not None:
+                    LOGGER.debug(f"{url} hasn't changed - using the copy at {entry.path}")
+
+                    if progress is not None:
+                        progress(entry.size, entry.size)
+
+                    self._touch(entry)
+                    return entry.path
+
+                response.raise_for_status()
+
+                path = self._directory / get_download_name(url)
+                size = write_response(response, path, progress=progress, cancellation_token=cancellation_token)
+
+                entry = CachedDownload(
+                    url=url,
+                    path=path,
+                    size=size,
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified"),
+                )
+        except requests.RequestException as e:
+            if entry is None:
+                raise
+
+            LOGGER.warning(f"Could not check whether {url} has changed - using the copy at {entry.path}: {e}")
+            self._touch(entry)
+            return entry.path
+
+        LOGGER.debug(f"Downloaded {format_size(entry.size)} from {url} to {entry.path}")
+
+        with self:
+            self._entries[url] = entry
+            self._save(entry)
+            self.clean_up()
+
+        return entry.path
+
+    def _touch(self, entry: CachedDownload):
+        with self:
+            entry.last_used = time.time()
+            self._save(entry)
+
+    def _save(self, entry: CachedDownload):
+        try:
+            entry.save()
+        except OSError as e:
+            LOGGER.warning(f"Could not record the download of {entry.url}; it won't be reused after a restart: {e}")
+
+    def release(self, url: str):
+        """
+        Stop holding the local copy of a file so that it may be deleted if the cache needs room
+
+        Args:
+            url: The address of the file
+        """
+        with self:
+            if self._holds[url] > 1:
+                self._holds[url] -= 1
+            else:
+                self._holds.pop(url, None)
+
+            self.clean_up()
+
+    def is_held(self, url: str) -> bool:
+        with self:
+            return self._holds[url] > 0
+
+    def clean_up(self):
+        """
+        Delete the least recently used files that aren't held until the cache is within its budget
+        """
+        with self:
+            unheld = sorted(
+                (entry for url, entry in self._entries.items() if self._holds[url] <= 0),
+                key=lambda entry: entry.last_used
+            )
+            size = self.size
+
+            for entry in unheld:
+                if size <= self._budget:
+                    break
+
+                LOGGER.debug(f"The download cache is full - deleting the copy of {entry.url}")
+                size -= entry.size
+                self.remove(entry.url)
+
+    def remove(self, url: str):
+        """
+        Delete the local copy of a file, even if it is held
+
+        Args:
+            url: The address of the file
+        """
+        with self:
+            entry: typing.Optional[CachedDownload] = self._entries.pop(url, None)
+
+        if entry is None:
+            return
+
+        for path in (entry.path, entry.metadata_path):
+            try:
+                path.unlink(missing_ok=True)
+            except OSError as e:
+                LOGGER.warning(f"Could not delete {path}: {e}")
+
+    def clear(self):
+        """
+        Delete every file that isn't held
+        """
+        with self:
+            for url in [url for url in self._entries if self._holds[url] <= 0]:
+                self.remove(url)
+
+    def __contains__(self, url: str) -> bool:
+        with self:
+            return url in self._entries
+
+    def __len__(self) -> int:
+        with self:
+            return len(self._entries)
+
+    def __str__(self):
+        return f"{self.__class__.__name__}({self._directory}, {format_size(self.size)} of {format_size(self._budget)})"
+
+    def __repr__(self):
+        return self.__str__()
@@ -3,43 +3,115 @@
 """
 from __future__ import annotations
 
+import time
 import typing
 import logging
 
-from collections import Counter
-from datetime import datetime
-
 import pandas
 import xarray
 
+from yanv.application_details import CACHE_MEMORY_BUDGET
+from yanv.application_details import CACHE_EVICTION_POLICY
 from yanv.cache.base import DatasetCache
+from yanv.cache.base import CacheCapacityError
+from yanv.cache.policy import EvictionPolicy
+from yanv.cache.policy import get_eviction_policy
 from yanv.model.dataset import Dataset
-
-_DEFAULT_FRAME_LIMIT = 4
+from yanv.utilities.memory import format_size
+from yanv.utilities.memory import parse_memory_size
+from yanv.utilities.mixins import Lockable
+from yanv.utilities.netcdf import get_resident_size
 
 
-class InMemoryFrameCache(DatasetCache):
-    """
-    XArray dataset cache that keeps data in memory
+class InMemoryFrameCache(Lockable, DatasetCache):
     """
+    XArray dataset cache that keeps data in memory. Safe to use from multiple threads
 
-    def __init__(self, limit: int = None):
-        if limit is None or limit <= 0:
-            limit = _DEFAULT_FRAME_LIMIT
+    Datasets are evicted, in an order decided by the eviction policy, once the datasets held in memory exceed the
+    memory budget or, if given, once there are more datasets than the limit
+    """
 
-        self._limit = limit
+    def __init__(
+        self,
+        limit: int = None,
+        memory_budget: typing.Union[str, int, float] = None,
+        eviction_policy: typing.Union[str, EvictionPolicy] = None
+    ):
+        """
+        Args:
+            limit: An optional maximum number of datasets to hold
+            memory_budget: The maximum amount of memory that datasets may occupy, either in bytes, as a description
+                like '4GB', or as a fraction of system memory like '25%' or 0.25. Uses the application default if
+                not given
+            eviction_policy: The policy, or the name of the policy, deciding which datasets to evict first. Uses the
+                application default if not given
+        """
+        if limit is not None and limit <= 0:
+            limit = None
+
+        if memory_budget is None:
+            memory_budget = CACHE_MEMORY_BUDGET
+
+        if eviction_policy is None:
+            eviction_policy = CACHE_EVICTION_POLICY
+
+        self._limit: typing.Optional[int] = limit
+        self._memory_budget: int = parse_memory_size(memory_budget)
         self._datasets: typing.Dict[str, xarray.Dataset] = dict()
-        self._last_access_times: Counter[str] = Counter()
+        self._sizes: typing.Dict[str, int] = dict()
+        self._total_size: int = 0
+        self._policy: EvictionPolicy = get_eviction_policy(eviction_policy)
+
+    @property
+    def memory_budget(self) -> int:
+        """
+        The number of bytes that datasets within the cache may occupy
+        """
+        return self._memory_budget
+
+    @property
+    def size(self) -> int:
+        """
+        The number of bytes that datasets within the cache occupied when last measured
+        """
+        with self:
+            return self._total_size
+
+    def fits(self, size: int) -> bool:
+        return size <= self._memory_budget
 
     def add(self, data: xarray.Dataset) -> str:
-        new_id: str = self._generate_data_id()
-        self._datasets[new_id] = data
-        self.touch_frame(new_id)
+        size: int = get_resident_size(data)
 
-        self.clean_up()
+        if not self.fits(size):
+            raise CacheCapacityError(
+                f"Cannot cache a dataset that occupies {format_size(size)} - "
+                f"datasets may only occupy {format_size(self._memory_budget)}"
+            )
 
+        new_id: str = self._generate_data_id()
+        self._insert(new_id, data, size)
         return new_id
 
+    def _insert(self, data_id: str, data: xarray.Dataset, size: int = None):
+        """
+        Place a dataset within the cache under the given ID and make room for it
+
+        Args:
+            data_id: The ID to store the dataset under
+            data: The dataset to store
+            size: The number of bytes that the dataset occupies in memory, if already known
+        """
+        if size is None:
+            size = get_resident_size(data)
+
+        with self:
+            self._datasets[data_id] = data
+            self._set_size(data_id, size)
+            self.touch_frame(data_id)
+
+            self.clean_up(keep=data_id)
+
     def get_id(self, frame: pandas.DataFrame) -> typing.Optional[str]:
         for data_id, cached_frame in self._datasets.items():
             if frame == cached_frame:
@@ -47,13 +119,41 @@ class InMemoryFrameCache(DatasetCache):
         return None
 
     def touch_frame(self, data_id: str) -> int:
-        new_timestamp = int(datetime.now().timestamp())
-        self._last_access_times[data_id] = new_timestamp
-        return new_timestamp
+        """
+        Record that a dataset was used
+
+        Args:
+            data_id: The ID of the dataset that was used
+
+        Returns:
+            The value of the monotonic clock, in nanoseconds, when the dataset was used
+        """
+        with self:
+            self._policy.touch(data_id, self._sizes.get(data_id, 0))
+        return time.monotonic_ns()
+
+    def _set_size(self, data_id: str, size: int):
+        self._total_size += size - self._sizes.get(data_id, 0)
+        self._sizes[data_id] = size
 
     def remove(self, data_id: str):
-        if data_id in self._datasets.keys():
-            dataset: xarray.Dataset = self._datasets.pop(data_id)
+        with self:
+            self._discard(data_id)
+            self.forget(data_id)
+
+    def _discard(self, data_id: str):
+        """
+        Release a dataset from memory without forgetting anything that was derived from it
+
+        Args:
+            data_id: The ID of the dataset to release
+        """
+        with self:
+            dataset: typing.Optional[xarray.Dataset] = self._datasets.pop(data_id, None)
+            self._total_size -= self._sizes.pop(data_id, 0)
+            self._policy.discard(data_id)
+
+        if dataset is not None:
             try:
                 dataset.close()
             except:
@@ -61,33 +161,78 @@ class InMemoryFrameCache(DatasetCache):
 
             del dataset
 
-        if data_id in self._last_access_times:
-            del self._last_access_times[data_id]
-
     def __len__(self) -> int:
         return len(self._datasets)
 
     def keys(self) -> typing.Iterable[str]:
-        return self._datasets.keys()
+        with self:
+            return list(self._datasets.keys())
+
+    def _too_many(self) -> bool:
+        return self._limit is not None and len(self._datasets) > self._limit
+
+    def _too_large(self) -> bool:
+        return self._total_size > self._memory_budget
+
+    def clean_up(self, keep: str = None):
+        """
+        Evict datasets until the cache is within its limits
+
+        Args:
+            keep: The ID of a dataset that must not be evicted, such as one that was just added
+        """
+        with self:
+            # Lazily loaded datasets grow as they are read, so measure again before deciding what to evict
+            for data_id, dataset in self._datasets.items():
+                self._set_size(data_id, get_resident_size(dataset))
+
+            kept: bool = False
+
+            while len(self._datasets) > 1 and (self._too_many() or self._too_large()):
+                evicted_id: typing.Optional[str] = self._policy.evict()
+
+                if evicted_id is None:
+                    break
+
+                if evicted_id == keep:
+                    kept = True
+                    continue
+
+                logging.debug(
+                    f"The cache is full - removing {evicted_id}, "
+                    f"which occupies {format_size(self._sizes.get(evicted_id, 0))}"
+                )
+                self._evict(evicted_id)
+
+            if kept:
+                self._policy.touch(keep, self._sizes.get(keep, 0))
+
+    def _evict(self, data_id: str):
+        """
+        Remove a dataset in order to make room for others
 
-    def clean_up(self):
-        while len(self._datasets) > self._limit:
-            least_recent_id, timestamp = self._last_access_times.most_common()[-1]
-            logging.debug(f"Too many data frames detected - removing {least_recent_id}")
-            self.remove(least_recent_id)
+        Args:
+            data_id: The ID of the dataset to evict
+        """
+        self.remove(data_id)
 
     def clear(self):
-        keys: list[str] = list(self._datasets.keys())
+        with self:
+            keys: list[str] = list(self._datasets.keys())
 
-        for key in keys:
-            self.remove(key)
+            for key in keys:
+                self.remove(key)
 
-        self._datasets = dict()
-        self._last_access_times = Counter()
+            self._datasets = dict()
+            self._sizes = dict()
+            self._total_size = 0
+            self._policy.clear()
+            self.forget()
 
     def get(self, key: str) -> typing.Optional[xarray.Dataset]:
-        if key not in self._datasets.keys():
-            return None
+        with self:
+            if key not in self._datasets.keys():
+                return None
 
-        self.touch_frame(key)
-        return self._datasets[key]
+            self.touch_frame(key)
+            return self._datasets[key]
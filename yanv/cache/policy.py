@@ -0,0 +1,201 @@
+"""
+Strategies used to decide which cached datasets to evict first
+"""
+from __future__ import annotations
+
+import abc
+import heapq
+import itertools
+import time
+import typing
+
+from collections import OrderedDict
+
+
+class EvictionPolicy(abc.ABC):
+    """
+    Keeps track of how cached entries are used in order to decide which entry should be evicted next
+    """
+    @abc.abstractmethod
+    def touch(self, key: str, size: int) -> None:
+        """
+        Record that an entry was added or accessed
+
+        Args:
+            key: The key of the entry
+            size: The number of bytes that the entry occupies
+        """
+        ...
+
+    @abc.abstractmethod
+    def discard(self, key: str) -> None:
+        """
+        Stop tracking an entry that was removed from the cache
+
+        Args:
+            key: The key of the removed entry
+        """
+        ...
+
+    @abc.abstractmethod
+    def evict(self) -> typing.Optional[str]:
+        """
+        Stop tracking and return the entry that should be evicted next
+
+        Returns:
+            The key of the entry to evict. None if there are no entries
+        """
+        ...
+
+    @abc.abstractmethod
+    def clear(self) -> None:
+        ...
+
+    @abc.abstractmethod
+    def __len__(self) -> int:
+        ...
+
+    @abc.abstractmethod
+    def __contains__(self, key: str) -> bool:
+        ...
+
+
+class LeastRecentlyUsedPolicy(EvictionPolicy):
+    """
+    Evicts the entry that was accessed the longest time ago.
+
+    Entries are kept in access order, so recording an access and finding the next entry to evict are both O(1).
+    Access order is exact, so entries touched within the same instant are never confused with one another
+    """
+    def __init__(self):
+        self.__entries: OrderedDict[str, int] = OrderedDict()
+        self.__access_times: typing.Dict[str, int] = dict()
+
+    def touch(self, key: str, size: int) -> None:
+        self.__entries[key] = size
+        self.__entries.move_to_end(key)
+        self.__access_times[key] = time.monotonic_ns()
+
+    def last_accessed(self, key: str) -> typing.Optional[int]:
+        """
+        Get when an entry was last accessed
+
+        Args:
+            key: The key of the entry
+
+        Returns:
+            The value of the monotonic clock, in nanoseconds, when the entry was last accessed
+        """
+        return self.__access_times.get(key)
+
+    def discard(self, key: str) -> None:
+        self.__entries.pop(key, None)
+        self.__access_times.pop(key, None)
+
+    def evict(self) -> typing.Optional[str]:
+        if not self.__entries:
+            return None
+
+        key, _ = self.__entries.popitem(last=False)
+        self.__access_times.pop(key, None)
+        return key
+
+    def clear(self) -> None:
+        self.__entries.clear()
+        self.__access_times.clear()
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__entries
+
+
+class GreedyDualSizePolicy(EvictionPolicy):
+    """
+    Evicts entries based on both how recently they were used and how large they are (GreedyDual-Size).
+
+    Every entry is given a priority of 'L + cost / size', where 'L' is the priority of the last evicted entry. The
+    entry with the lowest priority is evicted first. Large entries are evicted before small ones of the same age, so
+    many more small entries may be held, while 'L' rising over time makes sure that unused small entries still age out.
+
+    Recording an access and evicting are O(log n)
+    """
+    def __init__(self, cost: float = 1.0):
+        self.__cost: float = cost
+        self.__inflation: float = 0.0
+        self.__priorities: typing.Dict[str, typing.Tuple[float, int]] = dict()
+        self.__heap: typing.List[typing.Tuple[float, int, str]] = list()
+        self.__counter: typing.Iterator[int] = itertools.count()
+
+    def touch(self, key: str, size: int) -> None:
+        priority = self.__inflation + self.__cost / max(size, 1)
+
+        # The order of access breaks ties, so entries of the same priority are evicted in least recently used order
+        entry = (priority, next(self.__counter))
+        self.__priorities[key] = entry
+        heapq.heappush(self.__heap, (*entry, key))
+
+        # Old heap entries are only thrown away lazily, so rebuild the heap if they start to pile up
+        if len(self.__heap) > 2 * len(self.__priorities) + 16:
+            self.__heap = [(*entry, key) for key, entry in self.__priorities.items()]
+            heapq.heapify(self.__heap)
+
+    def discard(self, key: str) -> None:
+        self.__priorities.pop(key, None)
+
+    def evict(self) -> typing.Optional[str]:
+        while self.__heap:
+            priority, order, key = heapq.heappop(self.__heap)
+
+            # Skip over heap entries for keys that were removed or accessed again
+            if self.__priorities.get(key) != (priority, order):
+                continue
+
+            del self.__priorities[key]
+            self.__inflation = priority
+            return key
+
+        return None
+
+    def clear(self) -> None:
+        self.__inflation = 0.0
+        self.__priorities.clear()
+        self.__heap.clear()
+
+    def __len__(self) -> int:
+        return len(self.__priorities)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__priorities
+
+
+EVICTION_POLICIES: typing.Final[typing.Mapping[str, typing.Type[EvictionPolicy]]] = {
+    "lru": LeastRecentlyUsedPolicy,
+    "gds": GreedyDualSizePolicy,
+}
+"""Eviction policies by the names they may be configured with"""
+
+
+def get_eviction_policy(policy: typing.Union[str, EvictionPolicy, None]) -> EvictionPolicy:
+    """
+    Create an eviction policy based on its name
+
+    Args:
+        policy: The name of the policy or a policy to use as is. The least recently used policy is used if not given
+
+    Returns:
+        An eviction policy
+    """
+    if isinstance(policy, EvictionPolicy):
+        return policy
+
+    if policy is None:
+        return LeastRecentlyUsedPolicy()
+
+    policy_type = EVICTION_POLICIES.get(policy.lower())
+
+    if policy_type is None:
+        raise KeyError(f"'{policy}' is not a valid eviction policy. Valid options are: {', '.join(EVICTION_POLICIES)}")
+
+    return policy_type()
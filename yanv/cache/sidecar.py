@@ -0,0 +1,204 @@
+"""
+A persistent store for information derived from local files, such as summaries and statistics, that outlives the
+application so that it doesn't need to be calculated again after a restart
+"""
+from __future__ import annotations
+
+import os
+import time
+import pickle
+import typing
+import logging
+import pathlib
+import sqlite3
+import contextlib
+import dataclasses
+
+from yanv.application_details import PERSISTENT_CACHE_PATH
+
+LOGGER: logging.Logger = logging.getLogger(pathlib.Path(__file__).stem)
+
+_SCHEMA: typing.Final[str] = """
+CREATE TABLE IF NOT EXISTS entry (
+    path TEXT NOT NULL,
+    variable TEXT NOT NULL,
+    name TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    modified INTEGER NOT NULL,
+    payload BLOB NOT NULL,
+    stored_at REAL NOT NULL,
+    PRIMARY KEY (path, variable, name)
+)
+"""
+
+
+@dataclasses.dataclass(frozen=True)
+class FileIdentity:
+    """
+    Identifies a specific version of a local file. Any change to the file's size or modification time creates a new
+    identity
+    """
+    path: str
+    size: int
+    modified: int
+    """When the file was last modified, in nanoseconds since the epoch"""
+
+    @classmethod
+    def from_path(cls, path: typing.Union[str, os.PathLike]) -> typing.Optional[FileIdentity]:
+        """
+        Identify the current version of a local file
+
+        Args:
+            path: The path to the file
+
+        Returns:
+            The identity of the file. None if the path doesn't lead to a local file
+        """
+        try:
+            resolved_path = pathlib.Path(path).expanduser().resolve()
+            status = resolved_path.stat()
+        except (OSError, ValueError):
+            return None
+
+        if not resolved_path.is_file():
+            return None
+
+        return cls(path=str(resolved_path), size=status.st_size, modified=status.st_mtime_ns)
+
+    def is_current(self) -> bool:
+        """
+        Whether the file has not changed since it was identified
+        """
+        return FileIdentity.from_path(self.path) == self
+
+
+class SidecarStore:
+    """
+    Stores information derived from local files in a SQLite database.
+
+    Entries are keyed by the resolved path of the file, the name of a variable within it (blank for the file as a
+    whole), and the name of the information. An entry is only returned if the file still has the size and
+    modification time it had when the entry was stored - all entries for a file are dropped once it changes.
+
+    Problems with the database are logged rather than raised since everything stored may be calculated again
+    """
+    def __init__(self, path: typing.Union[str, os.PathLike] = None):
+        """
+        Args:
+            path: Where the database should be stored. Uses the application's default if not given
+        """
+        self.__path: pathlib.Path = pathlib.Path(path or PERSISTENT_CACHE_PATH).expanduser()
+        self.__path.parent.mkdir(parents=True, exist_ok=True)
+
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(_SCHEMA)
+
+    @property
+    def path(self) -> pathlib.Path:
+        return self.__path
+
+    @contextlib.contextmanager
+    def _connect(self) -> typing.Iterator[sqlite3.Connection]:
+        # Connections are cheap and may not be shared across threads, so each operation gets its own
+        connection = sqlite3.connect(self.__path, timeout=10)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def get(self, identity: FileIdentity, name: str, variable: str = None) -> typing.Any:
+        """
+        Retrieve stored information about a file
+
+        Args:
+            identity: The identity of the file the information was derived from
+            name: The name of the information
+            variable: The name of the variable that the information describes, if it describes a single variable
+
+        Returns:
+            The stored information. None if nothing was stored or the file has changed since
+        """
+        try:
+            with self._connect() as connection:
+                row = connection.execute(
+                    "SELECT size, modified, payload FROM entry WHERE path = ? AND variable = ? AND name = ?",
+                    (identity.path, variable or "", name)
+                ).fetchone()
+
+                if row is None:
+                    return None
+
+                size, modified, payload = row
+
+                if (size, modified) != (identity.size, identity.modified):
+                    LOGGER.debug(f"{identity.path} has changed - forgetting everything stored for it")
+                    connection.execute("DELETE FROM entry WHERE path = ?", (identity.path,))
+                    return None
+
+            return pickle.loads(payload)
+        except Exception as e:
+            LOGGER.warning(f"Could not read '{name}' for {identity.path} from {self.__path}: {e}")
+            return None
+
+    def put(self, identity: FileIdentity, name: str, value: typing.Any, variable: str = None) -> bool:
+        """
+        Store information about a file
+
+        Args:
+            identity: The identity of the file the information was derived from
+            name: The name of the information
+            value: The information to store. Must be picklable
+            variable: The name of the variable that the information describes, if it describes a single variable
+
+        Returns:
+            Whether the information was stored
+        """
+        try:
+            payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+            with self._connect() as connection:
+                # Anything stored for an older version of the file is no longer valid
+                connection.execute(
+                    "DELETE FROM entry WHERE path = ? AND (size != ? OR modified != ?)",
+                    (identity.path, identity.size, identity.modified)
+                )
+                connection.execute(
+                    "INSERT OR REPLACE INTO entry (path, variable, name, size, modified, payload, stored_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (identity.path, variable or "", name, identity.size, identity.modified, payload, time.time())
+                )
+            return True
+        except Exception as e:
+            LOGGER.warning(f"Could not store '{name}' for {identity.path} in {self.__path}: {e}")
+            return False
+
+    def invalidate(self, path: typing.Union[str, os.PathLike]):
+        """
+        Forget everything stored for a file
+
+        Args:
+            path: The path to the file
+        """
+        resolved_path = str(pathlib.Path(path).expanduser().resolve())
+
+        with self._connect() as connection:
+            connection.execute("DELETE FROM entry WHERE path = ?", (resolved_path,))
+
+    def clear(self):
+        """
+        Forget everything that has been stored
+        """
+        with self._connect() as connection:
+            connection.execute("DELETE FROM entry")
+
+    def __len__(self) -> int:
+        with self._connect() as connection:
+            return connection.execute("SELECT COUNT(*) FROM entry").fetchone()[0]
+
+    def __str__(self):
+        return f"{self.__class__.__name__}({self.__path})"
+
+    def __repr__(self):
+        return self.__str__()
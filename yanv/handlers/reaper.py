@@ -0,0 +1,142 @@
+"""
+Periodically releases the data held by connections that have sat idle for too long so that forgotten browser tabs
+don't keep memory occupied on long running servers
+"""
+from __future__ import annotations
+
+import asyncio
+import typing
+import logging
+import pathlib
+import weakref
+
+from aiohttp import web
+
+from yanv.application_details import IDLE_TIMEOUT
+from yanv.handlers.state import SocketState
+from yanv.utilities.memory import format_size
+from yanv.utilities.workers import get_workers
+
+LOGGER: logging.Logger = logging.getLogger(pathlib.Path(__file__).stem)
+
+_LONGEST_INTERVAL: typing.Final[float] = 60
+"""The most seconds that may pass between checks for idle connections"""
+
+
+class IdleReaper:
+    """
+    Keeps track of open connections and releases the data of any that haven't sent a message within the idle
+    timeout. Connections that are still handling messages or background work are left alone
+    """
+    def __init__(self, idle_timeout: float = None):
+        """
+        Args:
+            idle_timeout: How many seconds a connection may go without sending a message before its data is
+                released. Uses the application default if not given. Nothing is released if 0
+        """
+        if idle_timeout is None:
+            idle_timeout = IDLE_TIMEOUT
+
+        self.__idle_timeout: float = max(idle_timeout, 0)
+        # States compare by value and can't be hashed, so they are tracked by identity
+        self.__states: weakref.WeakValueDictionary[int, SocketState] = weakref.WeakValueDictionary()
+
+    @property
+    def idle_timeout(self) -> float:
+        return self.__idle_timeout
+
+    @property
+    def interval(self) -> float:
+        """
+        How many seconds pass between checks for idle connections
+        """
+        return min(max(self.__idle_timeout / 4, 1), _LONGEST_INTERVAL)
+
+    def track(self, state: SocketState):
+        """
+        Start watching a connection for inactivity
+
+        Args:
+            state: The state of the connection
+        """
+        self.__states[id(state)] = state
+
+    def untrack(self, state: SocketState):
+        """
+        Stop watching a connection, such as when it closes
+
+        Args:
+            state: The state of the connection
+        """
+        self.__states.pop(id(state), None)
+
+    def get_idle(self) -> typing.Sequence[SocketState]:
+        """
+        Get every idle connection that still holds data
+        """
+        if self.__idle_timeout <= 0:
+            return []
+
+        return [
+            state
+            for state in list(self.__states.values())
+            if not state.is_busy
+            and state.idle_time >= self.__idle_timeout
+            and state.backend.get_loaded_ids()
+        ]
+
+    async def reap(self) -> int:
+        """
+        Release the data held by every idle connection
+
+        Returns:
+            The number of bytes of data that were released from memory
+        """
+        reclaimed: int = 0
+
+        for state in self.get_idle():
+            reclaimed += await get_workers().run(
+                state.release_data,
+                f"from a connection that was idle for {state.idle_time:.0f} seconds"
+            )
+
+        if reclaimed:
+            LOGGER.info(f"Reclaimed {format_size(reclaimed)} from idle connections")
+
+        return reclaimed
+
+    async def run(self):
+        """
+        Check for idle connections until cancelled
+        """
+        while True:
+            await asyncio.sleep(self.interval)
+
+            try:
+                await self.reap()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                LOGGER.error(f"Could not release the data of idle connections: {e}", exc_info=True)
+
+    async def cleanup_context(self, application: web.Application) -> typing.AsyncIterator[None]:
+        """
+        Check for idle connections for as long as the application runs. Meant for `application.cleanup_ctx`
+
+        Args:
+            application: The web application that connections are made through
+        """
+        task: typing.Optional[asyncio.Task] = None
+
+        if self.__idle_timeout > 0:
+            task = asyncio.create_task(self.run(), name="idle-reaper")
+
+        yield
+
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+
+IDLE_REAPER_KEY: web.AppKey[IdleReaper] = web.AppKey("idle_reaper", IdleReaper)
+"""The key for the reaper of idle connections within the web application"""
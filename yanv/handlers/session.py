@@ -0,0 +1,160 @@
+"""
+Keeps the data loaded by a connection around for a little while after it closes so that a client that reconnects,
+such as after a page refresh or a brief network drop, may pick up where it left off without loading anything again
+"""
+from __future__ import annotations
+
+import asyncio
+import typing
+import logging
+import pathlib
+import secrets
+import dataclasses
+
+from aiohttp import web
+
+from yanv.application_details import SESSION_GRACE_PERIOD
+from yanv.backend.base import BaseBackend
+from yanv.utilities.memory import format_size
+
+LOGGER: logging.Logger = logging.getLogger(pathlib.Path(__file__).stem)
+
+_TOKEN_LENGTH: typing.Final[int] = 24
+"""The number of random bytes used to build a session token"""
+
+
+@dataclasses.dataclass
+class Session:
+    """
+    The data belonging to a client, which may outlive the connection it was loaded through
+    """
+    token: str
+    backend: BaseBackend
+    expiration: typing.Optional[asyncio.TimerHandle] = dataclasses.field(default=None, repr=False)
+    """Releases the session's data once the grace period runs out. Only set while no connection uses the session"""
+
+    @property
+    def is_suspended(self) -> bool:
+        """
+        Whether no connection is currently using the session
+        """
+        return self.expiration is not None
+
+
+class SessionManager:
+    """
+    Issues session tokens and keeps the backends of disconnected sessions alive for a grace period.
+
+    A session may only be used by one connection at a time. Presenting the token of a session that is still in use
+    or that has already expired starts a new session instead
+    """
+    def __init__(self, grace_period: float = None):
+        """
+        Args:
+            grace_period: How many seconds a session's data is kept after its connection closes. Uses the
+                application default if not given
+        """
+        if grace_period is None:
+            grace_period = SESSION_GRACE_PERIOD
+
+        self.__grace_period: float = max(grace_period, 0)
+        self.__sessions: typing.Dict[str, Session] = dict()
+
+    @property
+    def grace_period(self) -> float:
+        return self.__grace_period
+
+    def start(self, backend: BaseBackend) -> Session:
+        """
+        Start a new session
+
+        Args:
+            backend: The backend that data for the session will be loaded through
+
+        Returns:
+            The new session
+        """
+        token: str = secrets.token_urlsafe(_TOKEN_LENGTH)
+
+        while token in self.__sessions:
+            token = secrets.token_urlsafe(_TOKEN_LENGTH)
+
+        session = Session(token=token, backend=backend)
+        self.__sessions[token] = session
+        return session
+
+    def resume(self, token: typing.Optional[str]) -> typing.Optional[Session]:
+        """
+        Pick a suspended session back up
+
+        Args:
+            token: The token that was issued when the session started
+
+        Returns:
+            The resumed session. None if there is no suspended session with that token
+        """
+        session: typing.Optional[Session] = self.__sessions.get(token) if token else None
+
+        if session is None or not session.is_suspended:
+            return None
+
+        session.expiration.cancel()
+        session.expiration = None
+
+        LOGGER.debug(f"Resumed a session holding {len(session.backend.get_loaded_ids())} dataset(s)")
+        return session
+
+    def suspend(self, session: Session):
+        """
+        Mark a session as no longer used by any connection. Its data is released once the grace period runs out
+
+        Args:
+            session: The session whose connection closed
+        """
+        if self.__grace_period <= 0:
+            self.expire(session.token)
+            return
+
+        if session.expiration is not None:
+            session.expiration.cancel()
+
+        session.expiration = asyncio.get_running_loop().call_later(self.__grace_period, self.expire, session.token)
+
+    def expire(self, token: str):
+        """
+        End a session and release all of its data
+
+        Args:
+            token: The token of the session to end
+        """
+        session: typing.Optional[Session] = self.__sessions.pop(token, None)
+
+        if session is None:
+            return
+
+        if session.expiration is not None:
+            session.expiration.cancel()
+            session.expiration = None
+
+        try:
+            reclaimed: int = session.backend.reclaim()
+            LOGGER.info(f"Released the data of an expired session - reclaimed {format_size(reclaimed)}")
+        except Exception as e:
+            LOGGER.error(f"Could not release the data held by an expired session: {e}", exc_info=True)
+
+    def expire_all(self):
+        """
+        End every session and release all of their data
+        """
+        for token in list(self.__sessions.keys()):
+            self.expire(token)
+
+    def __contains__(self, token: str) -> bool:
+        return token in self.__sessions
+
+    def __len__(self) -> int:
+        return len(self.__sessions)
+
+
+SESSION_MANAGER_KEY: web.AppKey[SessionManager] = web.AppKey("session_manager", SessionManager)
+"""The key for the manager of client sessions within the web application"""
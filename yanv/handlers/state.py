@@ -1,7 +1,11 @@
 """
 The objects necessary to structure application state
 """
+import asyncio
+import time
 import typing
+import logging
+import pathlib
 import dataclasses
 import sys
 import weakref
@@ -10,8 +14,16 @@ import pandas
 
 from aiohttp.web import Request
 
+from yanv.application_details import PRECOMPUTE_STATISTICS
+from yanv.application_details import SOCKET_CONCURRENCY
+from yanv.application_details import SOCKET_QUEUE_SIZE
 from yanv.backend.base import BaseBackend
 from yanv.backend.file import FileBackend
+from yanv.utilities.cancellation import CancellationToken
+from yanv.utilities.cancellation import NEVER_CANCELLED
+from yanv.utilities.memory import format_size
+
+LOGGER: logging.Logger = logging.getLogger(pathlib.Path(__file__).stem)
 
 
 @dataclasses.dataclass
@@ -20,18 +32,278 @@ class SocketState:
     Contains state information meant to be persisted between socket messages on an active connection
     """
     backend: BaseBackend = dataclasses.field(default_factory=FileBackend)
-    frames: typing.Dict[str, pandas.DataFrame] = dataclasses.field(default_factory=list)
+    frames: typing.Dict[str, pandas.DataFrame] = dataclasses.field(default_factory=dict)
     _request: typing.Optional[weakref.ref[Request] | Request] = dataclasses.field(
         default=None,
         repr=False,
         compare=False,
         kw_only=True,
     )
+    concurrency_limit: int = dataclasses.field(default=SOCKET_CONCURRENCY, kw_only=True)
+    """The number of messages that may be processed at the same time"""
+    queue_size: int = dataclasses.field(default=SOCKET_QUEUE_SIZE, kw_only=True)
+    """The number of messages that may wait for processing before no more messages are read"""
+    precompute_statistics: bool = dataclasses.field(default=PRECOMPUTE_STATISTICS, kw_only=True)
+    """Whether statistics for loaded data should be calculated in the background before they are requested"""
+    release_on_close: bool = dataclasses.field(default=True, kw_only=True)
+    """Whether everything loaded through the backend should be released once the connection closes"""
+    _tasks: typing.Dict[asyncio.Task, typing.Optional[str]] = dataclasses.field(
+        default_factory=dict,
+        init=False,
+        repr=False,
+        compare=False,
+    )
+    _background_tasks: typing.Dict[asyncio.Task, str] = dataclasses.field(
+        default_factory=dict,
+        init=False,
+        repr=False,
+        compare=False,
+    )
+    _cancellation_tokens: typing.Dict[str, CancellationToken] = dataclasses.field(
+        default_factory=dict,
+        init=False,
+        repr=False,
+        compare=False,
+    )
+    _slots: asyncio.Semaphore = dataclasses.field(init=False, repr=False, compare=False)
+    _send_lock: asyncio.Lock = dataclasses.field(default_factory=asyncio.Lock, init=False, repr=False, compare=False)
+    _last_active: float = dataclasses.field(default_factory=time.monotonic, init=False, repr=False, compare=False)
+    _notifier: typing.Optional[typing.Callable[[typing.Any], typing.Awaitable]] = dataclasses.field(
+        default=None,
+        init=False,
+        repr=False,
+        compare=False,
+    )
+    _loop: typing.Optional[asyncio.AbstractEventLoop] = dataclasses.field(
+        default=None,
+        init=False,
+        repr=False,
+        compare=False,
+    )
 
     def __post_init__(self):
         if self._request is not None and not isinstance(self._request, weakref.ReferenceType):
             self._request = weakref.ref(self._request)
 
+        self.concurrency_limit = max(self.concurrency_limit, 1)
+        self.queue_size = max(self.queue_size, 0)
+        self._slots = asyncio.Semaphore(self.concurrency_limit)
+
+    @property
+    def slots(self) -> asyncio.Semaphore:
+        """
+        Guards the number of messages that may be processed at once
+        """
+        return self._slots
+
+    @property
+    def send_lock(self) -> asyncio.Lock:
+        """
+        Ensures that only one response is written to the connection at a time
+        """
+        return self._send_lock
+
+    @property
+    def idle_time(self) -> float:
+        """
+        The number of seconds since the client last sent a message
+        """
+        return time.monotonic() - self._last_active
+
+    @property
+    def is_busy(self) -> bool:
+        """
+        Whether any messages or background work are still being handled
+        """
+        return bool(self._tasks) or bool(self._background_tasks)
+
+    def set_notifier(self, notifier: typing.Callable[[typing.Any], typing.Awaitable]):
+        """
+        Set how messages that aren't a response to a request, such as progress updates, reach the client
+
+        Args:
+            notifier: A coroutine function that sends a message through the connection. Must be set from within
+                the event loop the connection runs on
+        """
+        self._notifier = notifier
+        self._loop = asyncio.get_running_loop()
+
+    def notify(self, message: typing.Any):
+        """
+        Send a message to the client without waiting for it to be sent. Safe to call from worker threads.
+        Messages are dropped if there is no way to reach the client
+
+        Args:
+            message: The message to send
+        """
+        if self._notifier is None or self._loop is None or self._loop.is_closed():
+            return
+
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+
+        if running_loop is self._loop:
+            self._loop.create_task(self._notifier(message))
+        else:
+            asyncio.run_coroutine_threadsafe(self._notifier(message), self._loop)
+
+    def touch(self):
+        """
+        Record that the client sent a message
+        """
+        self._last_active = time.monotonic()
+
+    def release_data(self, reason: str = None) -> int:
+        """
+        Release everything that was loaded through the backend and report how much memory was reclaimed
+
+        Args:
+            reason: Why the data is being released, for the log
+
+        Returns:
+            The number of bytes of data that were released from memory
+        """
+        loaded_count: int = len(self.backend.get_loaded_ids())
+        reclaimed: int = self.backend.reclaim()
+
+        LOGGER.info(
+            f"Released {loaded_count} dataset(s){f' {reason}' if reason else ''} - "
+            f"reclaimed {format_size(reclaimed)}"
+        )
+        return reclaimed
+
+    @property
+    def in_flight(self) -> typing.Sequence[asyncio.Task]:
+        """
+        Tasks for messages that are either waiting to be processed or are being processed
+        """
+        return list(self._tasks.keys())
+
+    @property
+    def is_full(self) -> bool:
+        """
+        Whether no more messages should be read until an in-flight message has been handled
+        """
+        return len(self._tasks) >= self.concurrency_limit + self.queue_size
+
+    def track(self, task: asyncio.Task, message_id: typing.Optional[str] = None) -> asyncio.Task:
+        """
+        Keep track of a task handling a message until it finishes
+
+        Args:
+            task: The task handling a message
+            message_id: The ID of the message being handled
+
+        Returns:
+            The tracked task
+        """
+        self._tasks[task] = message_id
+
+        if message_id is not None:
+            self._cancellation_tokens.setdefault(message_id, CancellationToken(message_id))
+
+        task.add_done_callback(self._forget_task)
+        return task
+
+    def _forget_task(self, task: asyncio.Task):
+        message_id: typing.Optional[str] = self._tasks.pop(task, None)
+
+        if message_id is not None and message_id not in self._tasks.values():
+            self._cancellation_tokens.pop(message_id, None)
+
+    def run_in_background(self, name: str, work: typing.Callable[[], typing.Coroutine]) -> typing.Optional[asyncio.Task]:
+        """
+        Start work that isn't tied to any one message. Background work doesn't count against the number of messages
+        that may be in flight, is stopped along with everything else when the connection closes, and may be
+        cancelled by name
+
+        Args:
+            name: A unique name for the work. Its cancellation token may be retrieved with this name
+            work: A function that creates the coroutine to run
+
+        Returns:
+            The task running the work. None if work with the same name is already running
+        """
+        if name in self._background_tasks.values():
+            return None
+
+        self._cancellation_tokens[name] = CancellationToken(name)
+        task = asyncio.create_task(work(), name=name)
+        self._background_tasks[task] = name
+        task.add_done_callback(self._forget_background_task)
+        return task
+
+    def _forget_background_task(self, task: asyncio.Task):
+        name: typing.Optional[str] = self._background_tasks.pop(task, None)
+
+        if name is not None and name not in self._tasks.values():
+            self._cancellation_tokens.pop(name, None)
+
+    def get_cancellation_token(self, message_id: typing.Optional[str]) -> CancellationToken:
+        """
+        Get the token that work for a message should check to see if it has been cancelled
+
+        Args:
+            message_id: The ID of the message being processed
+
+        Returns:
+            The token signalling whether work for the message should stop
+        """
+        if message_id is None:
+            return NEVER_CANCELLED
+
+        return self._cancellation_tokens.get(message_id, NEVER_CANCELLED)
+
+    def cancel(self, message_id: str) -> bool:
+        """
+        Stop processing the message with the given ID.
+
+        Messages still waiting to be processed are dropped. Messages being processed are told to stop at the next
+        opportunity and will not send a response
+
+        Args:
+            message_id: The ID of the message to stop processing
+
+        Returns:
+            Whether there was work to stop
+        """
+        token: typing.Optional[CancellationToken] = self._cancellation_tokens.get(message_id)
+
+        if token is None:
+            return False
+
+        token.cancel()
+
+        for task, task_message_id in [*self._tasks.items(), *self._background_tasks.items()]:
+            if task_message_id == message_id:
+                task.cancel()
+
+        return True
+
+    async def wait_for_capacity(self):
+        """
+        Wait until there is room for another message to be handled
+        """
+        while self.is_full:
+            await asyncio.wait(self.in_flight, return_when=asyncio.FIRST_COMPLETED)
+
+    async def cancel_all(self):
+        """
+        Stop handling all in-flight messages and stop all background work
+        """
+        tasks: typing.Sequence[asyncio.Task] = [*self.in_flight, *self._background_tasks.keys()]
+
+        for token in self._cancellation_tokens.values():
+            token.cancel()
+
+        for task in tasks:
+            task.cancel()
+
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
     @property
     def request(self) -> typing.Optional[Request]:
         return self._request()
@@ -47,6 +319,19 @@ class SocketState:
     def __enter__(self):
         return self
 
+    async def __aenter__(self):
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """
+        Stop all remaining work and release everything held for the connection
+        """
+        await self.cancel_all()
+        self.__exit__(exc_type, exc_val, exc_tb)
+
+        if self.release_on_close:
+            self.release_data("after the connection closed")
+
     def __exit__(self, exc_type, exc_val, exc_tb):
         keys: list[str] = list(self.frames.keys())
 
@@ -3,6 +3,9 @@ Handling for messages comming through a websocket
 """
 from __future__ import annotations
 
+import asyncio
+import collections
+import functools
 import json
 import logging
 import random
@@ -18,8 +21,18 @@ from aiohttp_jinja2 import render_string
 
 from yanv.messages.responses import invalid_message_response
 from yanv.messages.responses.error import missing_data_response
+from yanv.utilities.cancellation import CancellationToken
+from yanv.utilities.cancellation import OperationCancelled
 from yanv.utilities.common import local_only
+from yanv.utilities.memory import parse_memory_size
+from yanv.utilities.netcdf import get_random_values
+from yanv.utilities.sketches import KLLSketch
+from yanv.utilities.statistics import SummaryStatistics
+from yanv.utilities.statistics import is_summarizable
+from yanv.utilities.statistics import summarize
+from yanv.utilities.workers import get_workers
 from yanv.messages.base import YanvMessage
+from yanv.messages.requests import CancelRequest
 from yanv.messages.requests import FileSelectionRequest
 from yanv.messages.requests.data import DataDescriptionRequest
 from yanv.messages.responses.base import RenderResponse
@@ -27,10 +40,33 @@ from yanv.messages.requests import MasterRequest
 from yanv.messages.requests import YanvRequest
 from yanv.messages.responses import ErrorResponse
 from yanv.messages.responses.base import OpenResponse
+from yanv.messages.responses.base import CancelledResponse
+from yanv.messages.responses.base import DownloadProgressResponse
 from yanv.messages.responses.data import YanvDataResponse
 from yanv.messages.responses.data import DataDescriptionResponse
-
+from yanv.messages.responses.data import VariableStatisticsResponse
+
+from yanv.backend.file import FileBackend
+from yanv.backend.shared import DATASET_REGISTRY_KEY
+from yanv.backend.shared import DatasetRegistry
+from yanv.backend.shared import SharedBackend
+from yanv.cache import DatasetCache
+from yanv.cache import DownloadCache
+from yanv.cache import FileIdentity
+from yanv.cache import InMemoryFrameCache
+from yanv.cache import SidecarStore
+from yanv.cache import TieredFrameCache
+from yanv.handlers.reaper import IDLE_REAPER_KEY
+from yanv.handlers.reaper import IdleReaper
+from yanv.handlers.session import SESSION_MANAGER_KEY
+from yanv.handlers.session import Session
+from yanv.handlers.session import SessionManager
 from yanv.handlers.state import SocketState
+from yanv.launch_parameters import ApplicationArguments
+from yanv.launch_parameters import APPLICATION_ARGUMENTS_KEY
+from yanv.application_details import EXACT_QUANTILE_LIMIT
+from yanv.application_details import SOCKET_HEARTBEAT
+from yanv.application_details import QUANTILE_ERROR
 
 CONNECTION_ID_LENGTH = 10
 CONNECTION_ID_CHARACTER_SET = string.hexdigits
@@ -42,6 +78,10 @@ LOGGER: logging.Logger = logging.getLogger(pathlib.Path(__file__).stem)
 
 
 HANDLER = typing.Callable[[REQUEST_TYPE, SocketState], RESPONSE_TYPE]
+FOLLOW_UP_HANDLER = typing.Callable[
+    [web.WebSocketResponse, REQUEST_TYPE, typing.Sequence[YanvMessage], SocketState],
+    None
+]
 
 
 def load_file(request: FileSelectionRequest, state: SocketState) -> YanvDataResponse:
@@ -55,19 +95,241 @@ def load_file(request: FileSelectionRequest, state: SocketState) -> YanvDataResp
     Returns:
         A response object ready to send back to the client
     """
-    new_id: str = state.backend.load(request.path)
+    def report_progress(received: int, total: typing.Optional[int]):
+        state.notify(
+            DownloadProgressResponse(
+                message_id=request.message_id,
+                url=str(request.path),
+                received=received,
+                total=total,
+            )
+        )
+
+    new_id: str = state.backend.load(
+        request.path,
+        lazy=request.lazy,
+        progress=report_progress,
+        cancellation_token=state.get_cancellation_token(request.message_id),
+    )
     uploaded_data = state.backend.cache.get_information(new_id)
 
+    # The summary was serialized when the data was first loaded, so reuse that rather than serializing it again
     response = YanvDataResponse(
         operation=request.operation,
         data_id=new_id,
         data=uploaded_data,
         message_id=request.message_id
-    )
+    ).use_serialized_data(state.backend.cache.get_serialized_information(new_id))
 
     return response
 
 
+def get_statistics_key(variable_name: str) -> str:
+    """
+    Get the name that a variable's statistics are stored under alongside its dataset
+    """
+    return f"statistics:{variable_name}"
+
+
+def record_view(cache: DatasetCache, data_id: str, variable_name: str):
+    """
+    Record that a variable was looked at so that its statistics may be prioritized later
+
+    Args:
+        cache: The cache holding the variable's dataset
+        data_id: The ID of the variable's dataset
+        variable_name: The name of the variable that was looked at
+    """
+    views: typing.Optional[collections.Counter] = cache.recall(data_id, "views")
+
+    if views is None:
+        views = cache.remember(data_id, "views", collections.Counter())
+
+    views[variable_name] += 1
+
+
+def get_variable_statistics(
+    cache: DatasetCache,
+    data_id: str,
+    data: xarray.DataArray,
+    cancellation_token: CancellationToken = None,
+    quantile_error: float = None,
+    exact_quantiles: bool = None,
+    store: SidecarStore = None,
+) -> SummaryStatistics:
+    """
+    Get summary statistics for a variable, reusing ones that were already calculated where possible
+
+    Statistics calculated with the default quantile settings are stored alongside the dataset and, if the dataset
+    came from a local file, in the persistent store
+
+    Args:
+        cache: The cache holding the variable's dataset
+        data_id: The ID of the variable's dataset
+        data: The variable to get statistics for
+        cancellation_token: A token to check in case the work should stop early
+        quantile_error: How far an approximate quantile's rank may be from the true rank
+        exact_quantiles: Whether quantiles must be exact. Only small variables have exact quantiles if not given
+        store: Where statistics are kept between runs
+
+    Returns:
+        Statistics for the variable
+    """
+    uses_defaults = quantile_error is None and exact_quantiles is None
+    variable_name = str(data.name)
+    key = get_statistics_key(variable_name)
+    identity: typing.Optional[FileIdentity] = cache.recall(data_id, "file_identity") if store is not None else None
+
+    if uses_defaults:
+        statistics: typing.Optional[SummaryStatistics] = cache.recall(data_id, key)
+
+        if statistics is None and identity is not None:
+            statistics = store.get(identity, "statistics", variable=variable_name)
+
+            if statistics is not None:
+                cache.remember(data_id, key, statistics)
+
+        if statistics is not None:
+            return statistics
+
+    # Small variables get exact quantiles for little cost, so only estimate them for large variables
+    if exact_quantiles is None:
+        exact_quantiles = data.size <= EXACT_QUANTILE_LIMIT
+
+    sketch = KLLSketch(error=quantile_error or QUANTILE_ERROR, exact=exact_quantiles)
+    statistics = summarize(data, cancellation_token=cancellation_token, sketch=sketch)
+
+    if uses_defaults:
+        cache.remember(data_id, key, statistics)
+
+        if identity is not None:
+            store.put(identity, "statistics", statistics, variable=variable_name)
+
+    return statistics
+
+
+def summarize_next_variable(
+    data_id: str,
+    state: SocketState,
+    cancellation_token: CancellationToken,
+    skipped: typing.Set[str],
+) -> typing.Optional[VariableStatisticsResponse]:
+    """
+    Calculate statistics for the variable that is most likely to be looked at next and hasn't been summarized yet.
+    The variables that have been looked at the most go first, followed by the smallest
+
+    Args:
+        data_id: The ID of the dataset whose variables should be summarized
+        state: The current state of the data that has flown through the given socket
+        cancellation_token: A token to check in case the work should stop early
+        skipped: The names of variables that could not be summarized
+
+    Returns:
+        The statistics for the variable. None if there is nothing left to summarize
+    """
+    cache: DatasetCache = state.backend.cache
+    dataset: typing.Optional[xarray.Dataset] = cache.get(data_id)
+
+    while dataset is not None and not cancellation_token.cancelled:
+        views: typing.Mapping[str, int] = cache.recall(data_id, "views", {})
+        candidates = [
+            name
+            for name, variable in dataset.variables.items()
+            if variable.ndim > 0
+               and is_summarizable(variable.dtype)
+               and name not in skipped
+               and cache.recall(data_id, get_statistics_key(name)) is None
+        ]
+
+        if not candidates:
+            return None
+
+        variable_name = min(candidates, key=lambda name: (-views.get(name, 0), dataset.variables[name].size))
+
+        try:
+            statistics = get_variable_statistics(
+                cache=cache,
+                data_id=data_id,
+                data=dataset[variable_name],
+                cancellation_token=cancellation_token,
+                store=state.backend.store,
+            )
+        except OperationCancelled:
+            raise
+        except Exception as e:
+            LOGGER.error(f"Could not calculate statistics for '{variable_name}' in the background: {e}")
+            skipped.add(variable_name)
+            continue
+
+        return VariableStatisticsResponse(
+            data_id=data_id,
+            variable=variable_name,
+            statistics=statistics.to_dict(),
+        )
+
+    return None
+
+
+async def precompute_statistics(connection: web.WebSocketResponse, data_id: str, state: SocketState):
+    """
+    Calculate statistics for every variable in a dataset one at a time and send each set to the client as soon as
+    it's ready
+
+    Args:
+        connection: The connection through which information may flow
+        data_id: The ID of the dataset whose variables should be summarized
+        state: The current state of the application for a user's connection
+    """
+    name: str = f"precompute-{data_id}"
+    cancellation_token: CancellationToken = state.get_cancellation_token(name)
+    skipped: typing.Set[str] = set()
+
+    try:
+        while not cancellation_token.cancelled and not connection.closed:
+            # Each variable takes one of the connection's slots so that requested work is never starved
+            async with state.slots:
+                response = await get_workers().run(summarize_next_variable, data_id, state, cancellation_token, skipped)
+
+            if response is None:
+                break
+
+            await send_responses(connection, [response], state)
+    except OperationCancelled:
+        pass
+
+    LOGGER.debug(f"Stopped calculating statistics for {data_id} in the background")
+
+
+def start_precomputing_statistics(
+    connection: web.WebSocketResponse,
+    request: FileSelectionRequest,
+    responses: typing.Sequence[YanvMessage],
+    state: SocketState,
+):
+    """
+    Start calculating statistics for newly loaded data in the background if asked to
+
+    Args:
+        connection: The connection through which information may flow
+        request: The request that loaded the data
+        responses: The responses that were sent for the request
+        state: The current state of the application for a user's connection
+    """
+    should_precompute = request.precompute_statistics
+    if should_precompute is None:
+        should_precompute = state.precompute_statistics
+
+    if not should_precompute:
+        return
+
+    for response in responses:
+        if isinstance(response, YanvDataResponse):
+            state.run_in_background(
+                f"precompute-{response.data_id}",
+                functools.partial(precompute_statistics, connection, response.data_id, state)
+            )
+
+
 def describe_data(request: DataDescriptionRequest, state: SocketState) -> RenderResponse | ErrorResponse:
     """
     Read information from a variable and generate a description of it
@@ -87,7 +349,7 @@ def describe_data(request: DataDescriptionRequest, state: SocketState) -> Render
     dataset: xarray.Dataset | None = state.backend.cache.get(key=request.data_id)
 
     if dataset is None:
-        return missing_data_response(data_id=request.data_id)
+        return missing_data_response(data_id=request.data_id, message_id=request.message_id)
 
     if request.variable not in dataset:
         return ErrorResponse(
@@ -96,98 +358,52 @@ def describe_data(request: DataDescriptionRequest, state: SocketState) -> Render
         )
 
     data: xarray.DataArray = dataset[request.variable]
-
-    if 'valid_range' in data.attrs and isinstance(data.attrs['valid_range'], typing.Iterable):
-        try:
-            lower_limit = min(data.attrs['valid_range'])
-            upper_limit = max(data.attrs['valid_range'])
-            data = data.where((lower_limit < data) & (data < upper_limit), drop=True)
-        except Exception as e:
-            LOGGER.error(f"Could not constrain '{request.variable}' to its valid range: {e}")
+    cancellation_token: CancellationToken = state.get_cancellation_token(request.message_id)
 
     context: dict[str, typing.Optional[str | typing.Sequence[str]]] = {
         "minimum": "NaN",
         "maximum": "NaN",
         "mean": "NaN",
         "median": "NaN",
+        "percentiles": [],
+        "quantiles_are_exact": False,
         "samples": [],
         "count": str(data.size),
+        "missing_count": None,
         "std": "NaN",
         "data_id": request.data_id,
         "message_id": request.message_id,
         "variable": request.variable,
     }
 
-    if not isinstance(data.dtype, (dtypes.ObjectDType, dtypes.BytesDType, dtypes.StrDType)) and len(data.shape) > 0:
-        try:
-            minimum = data.min().values
-
-            if issubclass(minimum.dtype.type, float):
-                minimum = f"{minimum:.2f}"
-            else:
-                minimum = str(minimum)
+    record_view(state.backend.cache, data_id=request.data_id, variable_name=request.variable)
 
-            context['minimum'] = minimum
-        except Exception as e:
-            LOGGER.error(f"Could not calculate the minimum of '{data.dtype} {request.variable}': {e}")
-
-    if not isinstance(data.dtype, (dtypes.ObjectDType, dtypes.BytesDType, dtypes.StrDType)) and len(data.shape) > 0:
-        try:
-            maximum = data.max().values
-
-            if issubclass(maximum.dtype.type, float):
-                maximum = f"{maximum:.2f}"
-            else:
-                maximum = str(maximum)
-            context['maximum'] = maximum
-        except Exception as e:
-            LOGGER.error(f"Could not calculate the maximum of '{data.dtype} {request.variable}': {e}")
-
-    if not isinstance(data.dtype, (dtypes.ObjectDType, dtypes.BytesDType, dtypes.StrDType, dtypes.DateTime64DType)) and len(data.shape) > 0:
+    if is_summarizable(data.dtype) and len(data.shape) > 0:
         try:
-            std = data.std().values
-
-            if issubclass(std.dtype.type, float):
-                std = f"{std:.2f}"
-            else:
-                std = str(std)
-            context['std'] = std
+            statistics = get_variable_statistics(
+                cache=state.backend.cache,
+                data_id=request.data_id,
+                data=data,
+                cancellation_token=cancellation_token,
+                quantile_error=request.quantile_error,
+                exact_quantiles=request.exact_quantiles,
+                store=state.backend.store,
+            )
+            context.update(statistics.to_dict(percentiles=request.percentiles))
+        except OperationCancelled:
+            raise
         except Exception as e:
-            LOGGER.error(f"Could not calculate the standard deviation of '{data.dtype} {request.variable}': {e}")
+            LOGGER.error(f"Could not summarize '{data.dtype} {request.variable}': {e}")
 
-    if not isinstance(data.dtype, (dtypes.ObjectDType, dtypes.BytesDType, dtypes.StrDType)) and len(data.shape) > 0:
-        try:
-            mean = data.mean().values
-
-            if issubclass(mean.dtype.type, float):
-                mean = f"{mean:.2f}"
-            else:
-                mean = str(mean)
-            context['mean'] = mean
-        except Exception as e:
-            LOGGER.error(f"Could not calculate the mean of '{data.dtype} {request.variable}': {e}")
-
-    if not isinstance(data.dtype, (dtypes.ObjectDType, dtypes.BytesDType, dtypes.StrDType, dtypes.DateTime64DType)) and len(data.shape) > 0:
-        try:
-            median = data.median().values
-
-            if issubclass(median.dtype.type, float):
-                median = f"{median:.2f}"
-            else:
-                median = str(median)
-            context['median'] = median
-        except Exception as e:
-            LOGGER.error(f"Could not calculate the median of '{data.dtype} {request.variable}': {e}")
+    cancellation_token.raise_if_cancelled()
 
     try:
-        non_nan_data: xarray.DataArray = data.where(data.notnull(), drop=True)
-        if non_nan_data.size > 0:
-            sample_count: int = min(5, non_nan_data.size)
-            sample = [
-                f"{value:.2f}" if issubclass(non_nan_data.dtype.type, float) else str(value)
-                for value in numpy.random.choice(non_nan_data.values.ravel(), size=sample_count, replace=False)
+        random_values = get_random_values(data, size=5)
+        if random_values:
+            context['samples'] = [
+                f"{value:.2f}" if issubclass(data.dtype.type, numpy.floating) else str(value)
+                for value in random_values
             ]
-            context['samples'] = sample
     except Exception as e:
         LOGGER.error(f"Could not sample '{data.dtype} {request.variable}': {e}")
 
@@ -206,11 +422,39 @@ def describe_data(request: DataDescriptionRequest, state: SocketState) -> Render
     return response
 
 
+def cancel_message(request: CancelRequest, state: SocketState) -> CancelledResponse:
+    """
+    Stop processing a previously sent message
+
+    Args:
+        request: A request naming the message to stop processing
+        state: The current state of the data that has flown through the given socket
+
+    Returns:
+        A response stating whether there was anything to stop
+    """
+    cancelled: bool = state.cancel(request.target_message_id)
+
+    if cancelled:
+        LOGGER.debug(f"Cancelling work for message '{request.target_message_id}'")
+
+    return CancelledResponse(
+        message_id=request.message_id,
+        target_message_id=request.target_message_id,
+        cancelled=cancelled,
+    )
+
+
 MESSAGE_HANDLERS: typing.Mapping[typing.Type[REQUEST_TYPE], typing.Union[HANDLER, typing.Sequence[HANDLER]]] = {
     FileSelectionRequest: load_file,
     DataDescriptionRequest: describe_data
 }
 
+FOLLOW_UP_HANDLERS: typing.Mapping[typing.Type[REQUEST_TYPE], FOLLOW_UP_HANDLER] = {
+    FileSelectionRequest: start_precomputing_statistics,
+}
+"""Functions called on the event loop once a request's responses have been sent, such as to start background work"""
+
 
 def default_message_handler(request: YanvRequest, state: SocketState) -> RESPONSE_TYPE:
     """
@@ -233,38 +477,60 @@ def default_message_handler(request: YanvRequest, state: SocketState) -> RESPONS
     )
 
 
-async def handle_message(
+def parse_message(message: typing.Union[str, bytes, dict]) -> typing.Optional[YanvRequest]:
+    """
+    Convert a raw message from a client into a request
+
+    Args:
+        message: The raw data that prompted handling
+
+    Returns:
+        The request that was sent if it could be interpreted
+    """
+    if isinstance(message, (str, bytes)):
+        message = json.loads(message)
+
+    request_wrapper = MasterRequest.model_validate({"request": message})
+    return request_wrapper.request
+
+
+async def send_responses(
     connection: web.WebSocketResponse,
-    message: typing.Union[str, bytes, dict],
+    responses: typing.Sequence[YanvMessage],
     state: SocketState,
 ) -> None:
     """
-    Handle a raw message that has come in from a client
+    Send responses back through a connection one at a time
 
     Args:
         connection: The connection through which information may flow
-        message: The raw data that prompted handling
+        responses: The responses to send
         state: The current state of the application for a user's connection
     """
-    if isinstance(message, (str, bytes)):
-        message = json.loads(message)
+    async with state.send_lock:
+        for response in responses:
+            if connection.closed:
+                LOGGER.warning(f"Cannot send a '{response.operation}' response - the connection has closed")
+                return
+            await connection.send_str(response.serialize())
 
-    request: typing.Optional[YanvRequest] = None
-    responses: list[YanvMessage] = []
-    failed: bool = False
 
-    try:
-        request_wrapper = MasterRequest.model_validate({"request": message})
-        request = request_wrapper.request
-    except Exception as error:
-        LOGGER.error(
-            f"Could not deserialize the incoming message due to: {error}{os.linesep * 2}{message}{os.linesep * 2}",
-            exc_info=True
-        )
-        responses.append(invalid_message_response())
-        failed = True
+async def handle_request(
+    connection: web.WebSocketResponse,
+    request: YanvRequest,
+    state: SocketState,
+) -> None:
+    """
+    Process a deserialized request and send its responses back once it has been processed
 
-    if not failed and isinstance(request, YanvRequest):
+    Args:
+        connection: The connection through which information may flow
+        request: The request to process
+        state: The current state of the application for a user's connection
+    """
+    responses: list[YanvMessage] = []
+
+    async with state.slots:
         try:
             handler = MESSAGE_HANDLERS.get(type(request), default_message_handler)
 
@@ -273,13 +539,17 @@ async def handle_message(
             else:
                 handlers: typing.Sequence[HANDLER] = [handler]
 
+            # Handlers may spend a long time reading and crunching data, so run them on worker threads to
+            #   keep the event loop free for other connections
             for function in handlers:
-                responses.append(function(request, state))
+                responses.append(await get_workers().run(function, request, state))
 
             if not responses:
                 responses.append(default_message_handler(request, state))
-
-        except BaseException as error:
+        except OperationCancelled:
+            LOGGER.debug(f"Stopped handling the '{request.operation}' message '{request.message_id}'")
+            return
+        except Exception as error:
             message = f"An error occurred while handling a `{type(request).__name__}` message: {str(error)}"
             LOGGER.error(
                 message,
@@ -292,15 +562,142 @@ async def handle_message(
                 error_message=message
             )
             responses.append(response)
-    elif not failed:
+
+    # Responses may be sent out of order, so make sure that they may all be matched back to their request
+    for response in responses:
+        if response.message_id is None:
+            response.message_id = request.message_id
+
+    await send_responses(connection, responses, state)
+
+    follow_up: typing.Optional[FOLLOW_UP_HANDLER] = FOLLOW_UP_HANDLERS.get(type(request))
+
+    if follow_up is not None:
+        try:
+            follow_up(connection, request, responses, state)
+        except Exception as error:
+            LOGGER.error(f"Could not follow up on a `{type(request).__name__}` message: {error}", exc_info=error)
+
+
+async def handle_message(
+    connection: web.WebSocketResponse,
+    message: typing.Union[str, bytes, dict],
+    state: SocketState,
+) -> typing.Optional[asyncio.Task]:
+    """
+    Handle a raw message that has come in from a client
+
+    The message is processed in the background so that other messages may be read while it is being handled
+
+    Args:
+        connection: The connection through which information may flow
+        message: The raw data that prompted handling
+        state: The current state of the application for a user's connection
+
+    Returns:
+        The task processing the request if the message bore a valid request
+    """
+    state.touch()
+
+    try:
+        request: typing.Optional[YanvRequest] = parse_message(message)
+    except Exception as error:
+        LOGGER.error(
+            f"Could not deserialize the incoming message due to: {error}{os.linesep * 2}{message}{os.linesep * 2}",
+            exc_info=True
+        )
+        await send_responses(connection, [invalid_message_response()], state)
+        return None
+
+    if not isinstance(request, YanvRequest):
         LOGGER.error(
             f"The data sent from the client was a proper request but did not bear a proper inner request:{os.linesep}"
         )
-        response = invalid_message_response()
-        responses.append(response)
+        await send_responses(connection, [invalid_message_response()], state)
+        return None
 
-    for response in responses:
-        await connection.send_json(response.model_dump())
+    # Cancellations need to be handled right away - they would be pointless if they had to wait behind the
+    #   messages that they are trying to stop
+    if isinstance(request, CancelRequest):
+        await send_responses(connection, [cancel_message(request, state)], state)
+        return None
+
+    # Stop reading once too many messages are waiting so that a single connection can't flood the server
+    await state.wait_for_capacity()
+
+    task = asyncio.create_task(handle_request(connection, request, state))
+    return state.track(task, message_id=request.message_id)
+
+
+def create_backend(arguments: ApplicationArguments) -> FileBackend:
+    """
+    Create a backend to load data through based on how the application was launched
+
+    Args:
+        arguments: The arguments the application was launched with
+
+    Returns:
+        A backend whose caches and persistent store follow the given arguments
+    """
+    if parse_memory_size(arguments.spill_budget) > 0:
+        cache = TieredFrameCache(
+            memory_budget=arguments.cache_memory_budget,
+            eviction_policy=arguments.cache_eviction_policy,
+            spill_directory=arguments.spill_directory or None,
+            spill_budget=arguments.spill_budget,
+        )
+    else:
+        cache = InMemoryFrameCache(
+            memory_budget=arguments.cache_memory_budget,
+            eviction_policy=arguments.cache_eviction_policy,
+        )
+
+    store: typing.Optional[SidecarStore] = None
+
+    if arguments.persistent_cache:
+        try:
+            store = SidecarStore(arguments.persistent_cache)
+        except Exception as e:
+            LOGGER.warning(f"Summaries won't be kept between runs - {arguments.persistent_cache} can't be used: {e}")
+
+    downloads = DownloadCache(
+        directory=arguments.download_directory or None,
+        budget=arguments.download_cache_budget,
+    )
+
+    return FileBackend(cache=cache, store=store, downloads=downloads)
+
+
+def get_state_options(request: web.Request) -> typing.Dict[str, typing.Any]:
+    """
+    Get the options used to build the state for a new connection based on how the application was launched
+
+    Connections share loaded data through the application's dataset registry if it has one
+
+    Args:
+        request: The request to form the connection
+
+    Returns:
+        Keyword arguments for socket state
+    """
+    arguments: typing.Optional[ApplicationArguments] = request.app.get(APPLICATION_ARGUMENTS_KEY)
+    registry: typing.Optional[DatasetRegistry] = request.app.get(DATASET_REGISTRY_KEY)
+
+    options: typing.Dict[str, typing.Any] = dict()
+
+    if registry is not None:
+        options["backend"] = SharedBackend(registry)
+    elif arguments is not None:
+        options["backend"] = create_backend(arguments)
+
+    if arguments is not None:
+        options.update(
+            concurrency_limit=arguments.socket_concurrency,
+            precompute_statistics=arguments.precompute_statistics,
+            queue_size=arguments.socket_queue_size,
+        )
+
+    return options
 
 
 @local_only
@@ -308,32 +705,95 @@ async def socket_handler(request: web.Request) -> web.WebSocketResponse:
     """
     Handle information coming in through a websocket connection
 
+    Messages are handled concurrently, so a slow message does not hold up quicker ones sent after it. Responses are
+    sent as soon as they are ready and may be matched to their requests by their message ids.
+
+    Clients are issued a session token when they connect. Connecting with `?session=<token>` within the grace
+    period after a connection closes picks the session back up along with everything it had loaded.
+
     Args:
         request: The request to form the connection
 
     Returns:
         The connection that was made with the client
     """
-    connection = web.WebSocketResponse()
+    arguments: typing.Optional[ApplicationArguments] = request.app.get(APPLICATION_ARGUMENTS_KEY)
+    heartbeat: float = arguments.socket_heartbeat if arguments is not None else SOCKET_HEARTBEAT
+
+    # Pings reveal clients that vanished without closing the connection so that their data may be released
+    connection = web.WebSocketResponse(heartbeat=heartbeat if heartbeat > 0 else None)
 
     # Come up with a basic ID to help track when connections are opening or closing
     connection_id = ''.join(random.choices(population=CONNECTION_ID_CHARACTER_SET, k=CONNECTION_ID_LENGTH))
 
     await connection.prepare(request=request)
 
-    # Create a container for state information that will hold application state for this socket connection
-    state = SocketState(_request=request)
+    options: typing.Dict[str, typing.Any] = get_state_options(request)
+
+    # Pick an earlier session back up if the client presents its token so that nothing needs to be loaded again
+    sessions: typing.Optional[SessionManager] = request.app.get(SESSION_MANAGER_KEY)
+    session: typing.Optional[Session] = None
+    resumed: bool = False
 
-    LOGGER.info(f"Connected to socket {connection_id} from {request.remote}")
+    if sessions is not None:
+        session = sessions.resume(request.query.get("session"))
+        resumed = session is not None
 
-    # Prepare and send a response saying "You have been connected to the application
-    open_response = OpenResponse()
-    await connection.send_json(open_response.model_dump())
+        if not resumed:
+            session = sessions.start(options.get("backend") or FileBackend())
 
-    # Handle messages as they come through the connection
-    async for message in connection:  # type: WSMessage
-        await handle_message(connection, message=message.data, state=state)
+        options["backend"] = session.backend
 
-    LOGGER.info(f"Connection to Socket {connection_id} closing")
+    reaper: typing.Optional[IdleReaper] = request.app.get(IDLE_REAPER_KEY)
+
+    # Create a container for state information that will hold application state for this socket connection.
+    #   Data belonging to a session is kept for a while after the connection closes in case the client comes back
+    state = SocketState(_request=request, release_on_close=session is None, **options)
+
+    try:
+        async with state:
+            if reaper is not None:
+                reaper.track(state)
+
+            state.set_notifier(lambda notification: send_responses(connection, [notification], state))
+
+            LOGGER.info(f"Connected to socket {connection_id} from {request.remote}{' (resumed)' if resumed else ''}")
+
+            # Prepare and send a response saying "You have been connected to the application
+            loaded_ids: typing.Sequence[str] = state.backend.get_loaded_ids() if resumed else []
+            open_response = OpenResponse(
+                session_id=session.token if session is not None else None,
+                resumed=resumed,
+                data_ids=loaded_ids,
+            )
+            await send_responses(connection, [open_response], state)
+
+            # Send the summaries of everything the session already had loaded, just as if it had been loaded again
+            if loaded_ids:
+                await send_responses(
+                    connection,
+                    [
+                        YanvDataResponse(
+                            operation="load",
+                            data_id=data_id,
+                            data=state.backend.cache.get_information(data_id),
+                        ).use_serialized_data(state.backend.cache.get_serialized_information(data_id))
+                        for data_id in loaded_ids
+                    ],
+                    state
+                )
+
+            # Handle messages as they come through the connection
+            async for message in connection:  # type: WSMessage
+                await handle_message(connection, message=message.data, state=state)
+
+            LOGGER.info(f"Connection to Socket {connection_id} closing")
+    finally:
+        if reaper is not None:
+            reaper.untrack(state)
+
+        # Keep the session's data for a little while in case the client comes back
+        if session is not None:
+            sessions.suspend(session)
 
     return connection
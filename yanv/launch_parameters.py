@@ -6,13 +6,49 @@ from __future__ import annotations
 import argparse
 import typing
 
+from aiohttp import web
+
 from yanv import application_details
+from yanv.cache.policy import EVICTION_POLICIES
+from yanv.utilities.memory import parse_memory_size
+
+
+def validate_memory_size(value: str) -> str:
+    """
+    Ensure that a command line argument describes an amount of memory
+
+    Args:
+        value: The passed argument
+
+    Returns:
+        The unaltered argument
+    """
+    try:
+        parse_memory_size(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from e
+    return value
 
 
 class ApplicationArguments:
     def __init__(self, *argv):
         self.__port: typing.Optional[int] = None
         self.__index_page: typing.Optional[str] = None
+        self.__thread_count: typing.Optional[int] = None
+        self.__process_count: typing.Optional[int] = None
+        self.__cache_memory_budget: typing.Optional[str] = None
+        self.__cache_eviction_policy: typing.Optional[str] = None
+        self.__spill_directory: typing.Optional[str] = None
+        self.__spill_budget: typing.Optional[str] = None
+        self.__download_directory: typing.Optional[str] = None
+        self.__download_cache_budget: typing.Optional[str] = None
+        self.__precompute_statistics: typing.Optional[bool] = None
+        self.__persistent_cache: typing.Optional[str] = None
+        self.__socket_concurrency: typing.Optional[int] = None
+        self.__socket_queue_size: typing.Optional[int] = None
+        self.__session_grace_period: typing.Optional[float] = None
+        self.__socket_heartbeat: typing.Optional[float] = None
+        self.__idle_timeout: typing.Optional[float] = None
 
         self.__parse_arguments(*argv)
 
@@ -24,6 +60,66 @@ class ApplicationArguments:
     def index_page(self) -> str:
         return self.__index_page
 
+    @property
+    def thread_count(self) -> int:
+        return self.__thread_count
+
+    @property
+    def process_count(self) -> int:
+        return self.__process_count
+
+    @property
+    def cache_memory_budget(self) -> str:
+        return self.__cache_memory_budget
+
+    @property
+    def cache_eviction_policy(self) -> str:
+        return self.__cache_eviction_policy
+
+    @property
+    def spill_directory(self) -> str:
+        return self.__spill_directory
+
+    @property
+    def spill_budget(self) -> str:
+        return self.__spill_budget
+
+    @property
+    def download_directory(self) -> str:
+        return self.__download_directory
+
+    @property
+    def download_cache_budget(self) -> str:
+        return self.__download_cache_budget
+
+    @property
+    def precompute_statistics(self) -> bool:
+        return self.__precompute_statistics
+
+    @property
+    def persistent_cache(self) -> str:
+        return self.__persistent_cache
+
+    @property
+    def socket_concurrency(self) -> int:
+        return self.__socket_concurrency
+
+    @property
+    def socket_queue_size(self) -> int:
+        return self.__socket_queue_size
+
+    @property
+    def session_grace_period(self) -> float:
+        return self.__session_grace_period
+
+    @property
+    def socket_heartbeat(self) -> float:
+        return self.__socket_heartbeat
+
+    @property
+    def idle_timeout(self) -> float:
+        return self.__idle_timeout
+
     def __parse_arguments(self, *argv):
         parser = argparse.ArgumentParser(
             prog=application_details.APPLICATION_NAME,
@@ -46,8 +142,149 @@ class ApplicationArguments:
             help="The path to the index page"
         )
 
+        parser.add_argument(
+            "--threads",
+            dest="thread_count",
+            type=int,
+            default=application_details.THREAD_COUNT,
+            help="The number of threads used to handle messages without blocking the server"
+        )
+
+        parser.add_argument(
+            "--processes",
+            dest="process_count",
+            type=int,
+            default=application_details.PROCESS_COUNT,
+            help="The number of processes used for CPU heavy calculations. 0 keeps all calculations on threads"
+        )
+
+        parser.add_argument(
+            "--cache-budget",
+            dest="cache_memory_budget",
+            type=validate_memory_size,
+            default=application_details.CACHE_MEMORY_BUDGET,
+            help="How much memory loaded data may occupy, such as '4GB', '25%%', or '0.25' for a quarter of system memory"
+        )
+
+        parser.add_argument(
+            "--cache-policy",
+            dest="cache_eviction_policy",
+            choices=list(EVICTION_POLICIES),
+            default=application_details.CACHE_EVICTION_POLICY,
+            help="How loaded data is chosen for eviction: 'lru' for least recently used or 'gds' for GreedyDual-Size, "
+                 "which evicts larger data first"
+        )
+
+        parser.add_argument(
+            "--spill-directory",
+            dest="spill_directory",
+            type=str,
+            default=application_details.SPILL_DIRECTORY,
+            help="Where data evicted from memory may be written. Uses the system's temporary directory if not given"
+        )
+
+        parser.add_argument(
+            "--spill-budget",
+            dest="spill_budget",
+            type=validate_memory_size,
+            default=application_details.SPILL_BUDGET,
+            help="How much disk space data evicted from memory may occupy, such as '20GB'. "
+                 "Evicted data is discarded instead if 0"
+        )
+
+        parser.add_argument(
+            "--download-directory",
+            dest="download_directory",
+            type=str,
+            default=application_details.DOWNLOAD_DIRECTORY,
+            help="Where files loaded from the web are written. Uses the system's temporary directory if not given"
+        )
+
+        parser.add_argument(
+            "--download-cache-budget",
+            dest="download_cache_budget",
+            type=validate_memory_size,
+            default=application_details.DOWNLOAD_CACHE_BUDGET,
+            help="How much disk space files loaded from the web may keep occupying so that loading them again only "
+                 "needs to check whether they changed, such as '2GB'. Nothing is kept if 0"
+        )
+
+        parser.add_argument(
+            "--precompute-statistics",
+            dest="precompute_statistics",
+            action="store_true",
+            default=application_details.PRECOMPUTE_STATISTICS,
+            help="Calculate statistics for every variable in the background as soon as data is loaded"
+        )
+
+        parser.add_argument(
+            "--persistent-cache",
+            dest="persistent_cache",
+            type=str,
+            default=application_details.PERSISTENT_CACHE_PATH,
+            help="Where summaries and statistics for local files are kept between runs. Pass '' to keep nothing"
+        )
+
+        parser.add_argument(
+            "--socket-concurrency",
+            dest="socket_concurrency",
+            type=int,
+            default=application_details.SOCKET_CONCURRENCY,
+            help="The number of messages from a single connection that may be processed at once"
+        )
+
+        parser.add_argument(
+            "--socket-queue-size",
+            dest="socket_queue_size",
+            type=int,
+            default=application_details.SOCKET_QUEUE_SIZE,
+            help="The number of messages from a single connection that may wait to be processed"
+        )
+
+        parser.add_argument(
+            "--session-grace-period",
+            dest="session_grace_period",
+            type=float,
+            default=application_details.SESSION_GRACE_PERIOD,
+            help="How many seconds data loaded by a closed connection is kept in case the client reconnects"
+        )
+
+        parser.add_argument(
+            "--socket-heartbeat",
+            dest="socket_heartbeat",
+            type=float,
+            default=application_details.SOCKET_HEARTBEAT,
+            help="How many seconds pass between pings that check whether a client is still connected. 0 disables pings"
+        )
+
+        parser.add_argument(
+            "--idle-timeout",
+            dest="idle_timeout",
+            type=float,
+            default=application_details.IDLE_TIMEOUT,
+            help="How many seconds a connection may sit idle before its data is released. 0 never releases it"
+        )
+
         parameters = parser.parse_args(argv or None)
 
         self.__port = parameters.port
         self.__index_page = parameters.index_page
+        self.__thread_count = parameters.thread_count
+        self.__process_count = parameters.process_count
+        self.__cache_memory_budget = parameters.cache_memory_budget
+        self.__cache_eviction_policy = parameters.cache_eviction_policy
+        self.__spill_directory = parameters.spill_directory
+        self.__spill_budget = parameters.spill_budget
+        self.__download_directory = parameters.download_directory
+        self.__download_cache_budget = parameters.download_cache_budget
+        self.__precompute_statistics = parameters.precompute_statistics
+        self.__persistent_cache = parameters.persistent_cache
+        self.__socket_concurrency = parameters.socket_concurrency
+        self.__socket_queue_size = parameters.socket_queue_size
+        self.__session_grace_period = parameters.session_grace_period
+        self.__socket_heartbeat = parameters.socket_heartbeat
+        self.__idle_timeout = parameters.idle_timeout
+
 
+APPLICATION_ARGUMENTS_KEY: web.AppKey[ApplicationArguments] = web.AppKey("arguments", ApplicationArguments)
+"""The key for the arguments the application was launched with within the web application"""
@@ -4,6 +4,7 @@ Defines base classes for all messages
 from __future__ import annotations
 
 import abc
+import json
 import typing
 
 import pydantic
@@ -19,6 +20,12 @@ class YanvMessage(pydantic.BaseModel, abc.ABC):
     operation: str = pydantic.Field(description="The name of the operation to perform")
     message_id: typing.Optional[str] = pydantic.Field(default=None, description="A trackable ID for the message")
 
+    def serialize(self) -> str:
+        """
+        Convert the message into the JSON string that will be sent through a socket
+        """
+        return json.dumps(self.model_dump())
+
 
 class DataMessage(pydantic.BaseModel):
     data_id: str = pydantic.Field(description="The ID of the data to pass back and forth")
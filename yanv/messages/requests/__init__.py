@@ -12,6 +12,8 @@ from .data import FileSelectionRequest
 from .data import PageRequest
 from .data import DataDescriptionRequest
 
+from .control import CancelRequest
+
 from ...utilities.common import get_subclasses
 
 
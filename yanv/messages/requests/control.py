@@ -0,0 +1,20 @@
+"""
+Requests that control how other requests are processed
+"""
+from __future__ import annotations
+
+import typing
+
+import pydantic
+
+from .base import YanvRequest
+
+
+class CancelRequest(YanvRequest):
+    """
+    A message asking for the processing of a previously sent message to stop
+    """
+    operation: typing.Literal['cancel'] = pydantic.Field(
+        description="Description stating that this is intended to stop work for another message"
+    )
+    target_message_id: str = pydantic.Field(description="The ID of the message whose processing should stop")
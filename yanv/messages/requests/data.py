@@ -24,6 +24,16 @@ class FileSelectionRequest(YanvRequest):
     """
     operation: typing.Literal['load'] = pydantic.Field(description="Description stating that this should be loading data")
     path: pathlib.Path = pydantic.Field(description="The path to the requested file")
+    lazy: typing.Optional[bool] = pydantic.Field(
+        default=None,
+        description="Whether to only read the header of the file and read variable data on demand. "
+                    "Large files are read lazily if not specified"
+    )
+    precompute_statistics: typing.Optional[bool] = pydantic.Field(
+        default=None,
+        description="Whether to calculate statistics for every variable in the background once the file is loaded. "
+                    "Uses the application's setting if not specified"
+    )
 
 
 class SampleRequest(YanvDataRequest):
@@ -41,6 +51,35 @@ class DataDescriptionRequest(YanvDataRequest):
     )
     variable: str
     container_id: str
+    percentiles: typing.List[float] = pydantic.Field(
+        default_factory=list,
+        description="Percentiles, between 0 and 100, to report alongside the median"
+    )
+    quantile_error: typing.Optional[float] = pydantic.Field(
+        default=None,
+        description="How far, as a fraction of the number of values, an approximate quantile's rank may be from "
+                    "the true rank. Uses the application's default if not given"
+    )
+    exact_quantiles: typing.Optional[bool] = pydantic.Field(
+        default=None,
+        description="Whether the median and percentiles must be exact. Only small variables get exact values if "
+                    "not given"
+    )
+
+    @field_validator("percentiles")
+    @classmethod
+    def validate_percentiles(cls, percentiles: typing.List[float]) -> typing.List[float]:
+        for percentile in percentiles:
+            if not 0 <= percentile <= 100:
+                raise ValueError(f"Percentiles must be between 0 and 100, not {percentile}")
+        return percentiles
+
+    @field_validator("quantile_error")
+    @classmethod
+    def validate_quantile_error(cls, quantile_error: typing.Optional[float]) -> typing.Optional[float]:
+        if quantile_error is not None and not 0 < quantile_error < 1:
+            raise ValueError(f"A quantile error must be between 0 and 1, not {quantile_error}")
+        return quantile_error
 
 
 class FilterRequest(YanvDataRequest):
@@ -18,6 +18,15 @@ class YanvResponse(YanvMessage):
 
 class OpenResponse(YanvResponse):
     operation: typing.Literal['connection_opened'] = pydantic.Field(default="connection_opened")
+    session_id: typing.Optional[str] = pydantic.Field(
+        default=None,
+        description="A token that may be presented when reconnecting to pick the session back up"
+    )
+    resumed: bool = pydantic.Field(default=False, description="Whether an earlier session was picked back up")
+    data_ids: list[str] = pydantic.Field(
+        default_factory=list,
+        description="The IDs of data that were already loaded by the resumed session"
+    )
 
 
 class RenderResponse(YanvResponse):
@@ -29,3 +38,19 @@ class RenderResponse(YanvResponse):
 
 class AcknowledgementResponse(YanvResponse):
     operation: typing.Literal['acknowledgement'] = pydantic.Field(default="acknowledgement")
+
+
+class DownloadProgressResponse(YanvResponse):
+    operation: typing.Literal['download_progress'] = pydantic.Field(default="download_progress")
+    url: str = pydantic.Field(description="Where the data is being downloaded from")
+    received: int = pydantic.Field(description="The number of bytes that have arrived so far")
+    total: typing.Optional[int] = pydantic.Field(
+        default=None,
+        description="The number of bytes expected in all, if the server said"
+    )
+
+
+class CancelledResponse(YanvResponse):
+    operation: typing.Literal['cancelled'] = pydantic.Field(default="cancelled")
+    target_message_id: str = pydantic.Field(description="The ID of the message whose processing was asked to stop")
+    cancelled: bool = pydantic.Field(description="Whether there was still work to stop for the targeted message")
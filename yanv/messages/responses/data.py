@@ -1,6 +1,7 @@
 """
 Types of responses pertaining to data
 """
+import json
 import typing
 
 import pydantic
@@ -12,6 +13,27 @@ from yanv.model.dataset import Dataset
 
 class YanvDataResponse(YanvResponse, DataMessage):
     data: Dataset
+    _serialized_data: typing.Optional[str] = pydantic.PrivateAttr(default=None)
+
+    def use_serialized_data(self, serialized_data: typing.Optional[str]) -> typing.Self:
+        """
+        Provide a previously serialized copy of the data so that it does not need to be serialized again
+
+        Args:
+            serialized_data: The data as a JSON string
+
+        Returns:
+            This response
+        """
+        self._serialized_data = serialized_data
+        return self
+
+    def serialize(self) -> str:
+        if self._serialized_data is None:
+            return super().serialize()
+
+        envelope = json.dumps(self.model_dump(exclude={"data"}))
+        return f'{envelope[:-1]}, "data": {self._serialized_data}}}'
 
 
 class YanvSampleResponse(YanvResponse, DataMessage):
@@ -30,6 +52,18 @@ class DataDescriptionResponse(YanvResponse, DataMessage):
     count: int = pydantic.Field(default=0, description="The number of items in the variable")
 
 
+class VariableStatisticsResponse(YanvResponse, DataMessage):
+    """
+    Statistics for a variable that were calculated in the background, sent without having been requested
+    """
+    operation: typing.Literal["variable_statistics"] = pydantic.Field(default="variable_statistics")
+    variable: str
+    statistics: typing.Dict[str, typing.Any] = pydantic.Field(
+        default_factory=dict,
+        description="Formatted statistics, such as the minimum, maximum, mean, and median, keyed by name"
+    )
+
+
 class PlotDataResponse(YanvResponse, DataMessage):
     operation: typing.Literal["plot_data"]
     markup: str
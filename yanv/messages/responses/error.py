@@ -32,9 +32,10 @@ def invalid_message_response() -> ErrorResponse:
     )
 
 
-def missing_data_response(data_id: str) -> ErrorResponse:
+def missing_data_response(data_id: str, message_id: str = None) -> ErrorResponse:
     return ErrorResponse(
-        f"No data could be found with an id of '{data_id}'"
+        error_message=f"No data could be found with an id of '{data_id}'",
+        message_id=message_id
     )
 
 
@@ -30,13 +30,14 @@ def make_value_serializable(value: typing.Any):
 class Dataset(pydantic.BaseModel):
     @classmethod
     def from_xarray(cls, dataset: xarray.Dataset, name: str = None) -> Dataset:
-        variables = Variable.from_xarray(dataset)
         dimensions = Dimension.from_xarray(dataset)
+        variables = Variable.from_xarray(dataset, dimensions=dimensions)
         attributes = {
             key: make_value_serializable(value)
             for key, value in dataset.attrs.items()
         }
-        source = dataset.encoding.get("source")
+        # Downloaded data is read from a local copy, so prefer where the data originally came from
+        source = dataset.encoding.get("origin", dataset.encoding.get("source"))
 
         kwargs = dict(
             variables=variables,
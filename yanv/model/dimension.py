@@ -7,6 +7,7 @@ import inspect
 import typing
 
 import numpy
+import pandas
 import pydantic
 import xarray
 
@@ -19,6 +20,47 @@ def make_value_serializable(value: typing.Any):
     return value
 
 
+def get_extrema(
+    variable: xarray.Variable,
+    index: typing.Optional[pandas.Index] = None
+) -> typing.Tuple[str, str]:
+    """
+    Find the smallest and largest values of a variable that describes a dimension while reading as little as possible
+
+    The range recorded in the file's header is used if available. The ends of the dimension's index are used if the
+    index is sorted. Every value is only scanned if neither is possible
+
+    Args:
+        variable: The variable describing the dimension
+        index: The index that xarray built for the dimension, if there is one
+
+    Returns:
+        The minimum and maximum values as strings
+    """
+    if variable.size == 0:
+        return "NaN", "NaN"
+
+    # Values in the header are stored raw, so they won't match values that were decoded into dates
+    actual_range = variable.attrs.get("actual_range")
+    if actual_range is not None and variable.dtype.kind not in "Mm" and numpy.size(actual_range) == 2:
+        return str(numpy.min(actual_range)), str(numpy.max(actual_range))
+
+    if index is not None:
+        # The index has already been read into memory, so its ends may be read without touching the file again
+        values = index.values
+
+        if index.is_monotonic_increasing:
+            return str(values[0]), str(values[-1])
+
+        if index.is_monotonic_decreasing:
+            return str(values[-1]), str(values[0])
+
+        return str(values.min()), str(values.max())
+
+    values = variable.values
+    return str(values.min()), str(values.max())
+
+
 class Dimension(pydantic.BaseModel):
     @classmethod
     def from_xarray(cls, dataset: xarray.Dataset) -> typing.Sequence[Dimension]:
@@ -29,8 +71,7 @@ class Dimension(pydantic.BaseModel):
 
             if variable is not None:
                 datatype = str(variable.dtype)
-                minimum = str(variable.values.min())
-                maximum = str(variable.values.max())
+                minimum, maximum = get_extrema(variable, index=dataset.indexes.get(dimension_name))
                 attributes = {
                     key: make_value_serializable(value)
                     for key, value in variable.attrs.items()
@@ -75,16 +75,22 @@ def make_value_serializable(value: typing.Any, encountered_items: list[typing.An
 
 class Variable(pydantic.BaseModel):
     @classmethod
-    def from_xarray(cls, dataset: xarray.Dataset) -> typing.Sequence[Variable]:
+    def from_xarray(
+        cls,
+        dataset: xarray.Dataset,
+        dimensions: typing.Sequence[Dimension] = None
+    ) -> typing.Sequence[Variable]:
+        if dimensions is None:
+            dimensions = Dimension.from_xarray(dataset)
+
         dimensions = {
             dim.name: dim
-            for dim in Dimension.from_xarray(dataset)
+            for dim in dimensions
         }
 
         variables: typing.List[Variable] = list()
 
-        for variable_name in dataset.variables.keys():
-            variable = dataset[variable_name]
+        for variable_name, variable in dataset.variables.items():
 
             # NOTE: Separating random sampling into a separate call since this can be wildly expensive
             #random_values = get_random_values(variable=variable, size=5)
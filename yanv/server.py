@@ -16,12 +16,22 @@ from aiohttp.web_routedef import RouteDef
 
 from yanv.application_details import ALLOW_REMOTE
 from yanv.application_details import INDEX_PAGE
+from yanv.backend.shared import DATASET_REGISTRY_KEY
+from yanv.backend.shared import DatasetRegistry
 from yanv.handlers import navigate
 from yanv.launch_parameters import ApplicationArguments
+from yanv.launch_parameters import APPLICATION_ARGUMENTS_KEY
 from yanv.utilities import common
+from yanv.utilities.workers import configure_workers
+from yanv.utilities.workers import get_workers
 from yanv.handlers import handle_index
 from yanv.handlers import register_resource_handlers
 from yanv.handlers import socket_handler
+from yanv.handlers.websocket import create_backend
+from yanv.handlers.reaper import IDLE_REAPER_KEY
+from yanv.handlers.reaper import IdleReaper
+from yanv.handlers.session import SESSION_MANAGER_KEY
+from yanv.handlers.session import SessionManager
 
 from yanv.application_details import APPLICATION_NAME
 from yanv.application_details import DEBUG_MODE
@@ -90,6 +100,29 @@ def get_routes() -> generic.Iterable[RouteDef]:
     ]
 
 
+async def expire_sessions(application: web.Application) -> None:
+    """
+    Release the data held by every session once the application is closing
+
+    Args:
+        application: The web application that is shutting down
+    """
+    sessions: typing.Optional[SessionManager] = application.get(SESSION_MANAGER_KEY)
+
+    if sessions is not None:
+        sessions.expire_all()
+
+
+async def shutdown_workers(application: web.Application) -> None:
+    """
+    Stop the workers that were handling messages once the application is closing
+
+    Args:
+        application: The web application that is shutting down
+    """
+    get_workers().shutdown(wait=False)
+
+
 def serve(arguments: ApplicationArguments | tuple | None = None) -> int:
     """
     The primary entry point for the server
@@ -114,6 +147,19 @@ def serve(arguments: ApplicationArguments | tuple | None = None) -> int:
         LOGGER.critical(f"Could not create the base application: {e}", exc_info=True)
         return 1
 
+    application[APPLICATION_ARGUMENTS_KEY] = arguments
+
+    # Every connection loads data through the same registry so that a file opened in several tabs is only held once
+    application[DATASET_REGISTRY_KEY] = DatasetRegistry(create_backend(arguments))
+    application[SESSION_MANAGER_KEY] = SessionManager(grace_period=arguments.session_grace_period)
+    application.on_cleanup.append(expire_sessions)
+
+    idle_reaper: IdleReaper = IdleReaper(idle_timeout=arguments.idle_timeout)
+    application[IDLE_REAPER_KEY] = idle_reaper
+    application.cleanup_ctx.append(idle_reaper.cleanup_context)
+    configure_workers(thread_count=arguments.thread_count, process_count=arguments.process_count)
+    application.on_cleanup.append(shutdown_workers)
+
     try:
         register_resource_handlers(application)
     except KeyboardInterrupt:
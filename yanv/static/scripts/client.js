@@ -1,4 +1,4 @@
-import {Request} from "./requests.js"
+import {CancelRequest, Request} from "./requests.js"
 
 function sleep(ms, message) {
     if (ms === null || ms === undefined) {
@@ -12,6 +12,12 @@ function sleep(ms, message) {
     return new Promise(resolve => setTimeout(resolve, ms));
 }
 
+/**
+ * The key that the server issued session token is kept under in session storage so that a refreshed page may pick
+ * its session back up
+ */
+const SESSION_STORAGE_KEY = "yanv-session";
+
 const ReadyState = Object.freeze({
     Connecting: 0,
     Open: 1,
@@ -29,6 +35,11 @@ export class YanvClient {
     #id = null;
     #payloadTypes = {}
     #currentPath = null;
+    /**
+     * Payloads that have been sent but have not been answered yet, keyed by their message IDs
+     * @type {Object<string, object>}
+     */
+    #pending = {};
     
     constructor () {
         this.#id = this.#generateID();
@@ -101,6 +112,10 @@ export class YanvClient {
             rawPayload['message_id'] = this.#generateID()
         }
 
+        if (rawPayload['operation'] !== "cancel") {
+            this.#pending[rawPayload['message_id']] = rawPayload;
+        }
+
         const payloadText = JSON.stringify(rawPayload, null, 4)
 
         if (!this.isConnected()) {
@@ -118,6 +133,22 @@ export class YanvClient {
         }
     }
     
+    /**
+     * Ask the server to stop working on sent messages that have not been answered yet
+     *
+     * @param predicate {function(object): boolean} Determines whether a sent payload should be cancelled
+     */
+    cancel = async (predicate) => {
+        const messageIDs = Object.entries(this.#pending)
+            .filter(([messageID, payload]) => predicate(payload))
+            .map(([messageID, payload]) => messageID);
+
+        for (let messageID of messageIDs) {
+            delete this.#pending[messageID];
+            await this.send(new CancelRequest({target_message_id: messageID}));
+        }
+    }
+
     sendRawMessage = (message) => {
         const payload = {
             "message_id": this.#generateID(),
@@ -129,7 +160,9 @@ export class YanvClient {
     
     #build_websocket_url = (path) => {
         const location = window.location;
-        return `ws://${location.host}/${path}`;
+        const session = window.sessionStorage?.getItem(SESSION_STORAGE_KEY);
+        const query = session ? `?session=${encodeURIComponent(session)}` : "";
+        return `ws://${location.host}/${path}${query}`;
     }
 
     connect = async (path) => {
@@ -166,6 +199,10 @@ export class YanvClient {
             return;
         }
 
+        if (deserializedPayload?.message_id) {
+            delete this.#pending[deserializedPayload.message_id];
+        }
+
         let operation;
         try {
             operation = deserializedPayload.operation;
@@ -175,6 +212,11 @@ export class YanvClient {
             return
         }
 
+        // Remember the session so that reconnecting, even after a refresh, doesn't require loading everything again
+        if (operation === "connection_opened" && deserializedPayload.session_id) {
+            window.sessionStorage?.setItem(SESSION_STORAGE_KEY, deserializedPayload.session_id);
+        }
+
         try {
             this.#handle(operation, deserializedPayload);
         } catch (e) {
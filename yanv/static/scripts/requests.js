@@ -192,6 +192,31 @@ export class PageRequest extends DataRequest {
     }
 }
 
+export class CancelRequest extends Request {
+    operation = "cancel"
+    /**
+     * @member {string}
+     */
+    target_message_id
+
+    constructor ({target_message_id}) {
+        super();
+
+        this.target_message_id = target_message_id;
+    }
+
+    getRawPayload = () => {
+        return {
+            "operation": this.operation,
+            "target_message_id": this.target_message_id
+        };
+    }
+
+    getOperation = () => {
+        return "cancel"
+    }
+}
+
 if (!Object.hasOwn(window, "yanv")) {
     console.log("Creating a new yanv namespace");
     window.yanv = {};
@@ -203,3 +228,4 @@ window.yanv.DataRequest = DataRequest;
 window.yanv.Filter = Filter;
 window.yanv.FileSelectionRequest = FileSelectionRequest;
 window.yanv.DataDescriptionRequest = DataDescriptionRequest;
+window.yanv.CancelRequest = CancelRequest;
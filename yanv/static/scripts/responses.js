@@ -1,8 +1,27 @@
 import {Dataset} from "./model.js";
 
 export class OpenResponse {
+    /**
+     * A token that may be presented when reconnecting to pick the session back up
+     * @type {string|null}
+     */
+    session_id;
+    /**
+     * Whether an earlier session was picked back up
+     * @type {boolean}
+     */
+    resumed;
+    /**
+     * The IDs of data that were already loaded by the resumed session
+     * @type {string[]}
+     */
+    data_ids;
+
     constructor (payload) {
-        console.log("Connected")
+        this.session_id = payload?.session_id ?? null;
+        this.resumed = payload?.resumed ?? false;
+        this.data_ids = payload?.data_ids ?? [];
+        console.log(this.resumed ? `Connected - resumed a session with ${this.data_ids.length} dataset(s)` : "Connected")
     }
 }
 
@@ -135,6 +154,76 @@ export class DataResponse {
     }
 }
 
+export class VariableStatisticsResponse {
+    /**
+     * @member {string}
+     */
+    operation
+    /**
+     * @member {string}
+     */
+    data_id
+    /**
+     * @member {string}
+     */
+    variable
+    /**
+     * Formatted statistics, such as the minimum, maximum, mean, and median, keyed by name
+     * @member {Object<string, any>}
+     */
+    statistics
+
+    constructor({operation, data_id, variable, statistics}) {
+        this.operation = operation
+        this.data_id = data_id
+        this.variable = variable
+        this.statistics = statistics
+    }
+}
+
+export class DownloadProgressResponse {
+    /**
+     * @member {string}
+     */
+    operation
+    /**
+     * The ID of the load message that started the download
+     * @member {string}
+     */
+    messageID
+    /**
+     * Where the data is being downloaded from
+     * @member {string}
+     */
+    url
+    /**
+     * The number of bytes that have arrived so far
+     * @member {number}
+     */
+    received
+    /**
+     * The number of bytes expected in all, if the server said
+     * @member {number|null}
+     */
+    total
+
+    constructor({operation, message_id, url, received, total}) {
+        this.operation = operation
+        this.messageID = message_id
+        this.url = url
+        this.received = received
+        this.total = total ?? null
+    }
+
+    /**
+     * How much of the download has arrived, between 0 and 1. null if the total size isn't known
+     * @returns {number|null}
+     */
+    get fraction() {
+        return this.total ? Math.min(this.received / this.total, 1) : null;
+    }
+}
+
 if (!Object.hasOwn(window, "yanv")) {
     console.log("Creating a new yanv namespace");
     window.yanv = {};
@@ -145,3 +234,5 @@ window.yanv.AcknowledgementResponse = AcknowledgementResponse;
 window.yanv.OpenResponse = OpenResponse;
 window.yanv.DataDescriptionResponse = DataDescriptionResponse;
 window.yanv.RenderResponse = RenderResponse;
+window.yanv.VariableStatisticsResponse = VariableStatisticsResponse;
+window.yanv.DownloadProgressResponse = DownloadProgressResponse;
@@ -1,5 +1,13 @@
 import {closeAllDialogs, openDialog} from "./utility.js";
-import {AcknowledgementResponse, DataResponse, OpenResponse, DataDescriptionResponse, RenderResponse} from "./responses.js";
+import {
+    AcknowledgementResponse,
+    DataResponse,
+    OpenResponse,
+    DataDescriptionResponse,
+    RenderResponse,
+    VariableStatisticsResponse,
+    DownloadProgressResponse
+} from "./responses.js";
 import {DatasetView} from "./views/metadata.js";
 import {BooleanValue, ListValue, ListValueAction} from "./value.js";
 
@@ -26,6 +34,15 @@ function initializeBackingVariables() {
         }
     )
 
+    Object.defineProperty(
+        yanv,
+        "statistics",
+        {
+            value: {},
+            enumerable: true
+        }
+    )
+
     Object.defineProperty(
         yanv,
         "datasets",
@@ -56,12 +73,16 @@ async function initializeClient() {
     client.addHandler("load", dataLoaded);
     client.addHandler("error", handleError);
     client.addHandler("render", markupReceived);
+    client.addHandler("variable_statistics", variableStatisticsReceived);
+    client.addHandler("download_progress", downloadProgressReceived);
 
     client.registerPayloadType("connection_opened", OpenResponse);
     client.registerPayloadType("data", DataResponse);
     client.registerPayloadType("acknowledgement", AcknowledgementResponse);
     client.registerPayloadType("load", DataResponse)
     client.registerPayloadType("render", RenderResponse);
+    client.registerPayloadType("variable_statistics", VariableStatisticsResponse);
+    client.registerPayloadType("download_progress", DownloadProgressResponse);
 
     Object.defineProperty(
         yanv,
@@ -125,6 +146,32 @@ function dataLoaded(response) {
     }
 }
 
+/**
+ * Handler for statistics that the server calculated in the background
+ * @param {VariableStatisticsResponse} response
+ */
+function variableStatisticsReceived(response) {
+    if (!Object.hasOwn(yanv.statistics, response.data_id)) {
+        yanv.statistics[response.data_id] = {};
+    }
+
+    yanv.statistics[response.data_id][response.variable] = response.statistics;
+    document.dispatchEvent(new CustomEvent("yanv:variable-statistics", {detail: response}));
+}
+
+/**
+ * Handler for updates on how much of a file being loaded from the web has arrived
+ * @param {DownloadProgressResponse} response
+ */
+function downloadProgressReceived(response) {
+    const fraction = response.fraction;
+    console.log(
+        `Downloading ${response.url}: ` +
+        (fraction === null ? `${response.received} bytes` : `${Math.round(fraction * 100)}%`)
+    );
+    document.dispatchEvent(new CustomEvent("yanv:download-progress", {detail: response}));
+}
+
 /**
  * Handler for when markup was sent by the server
  * @param {RenderResponse} response
@@ -317,6 +364,11 @@ async function initialize() {
                 if (responseIndex >= 0) {
                     yanv.datasets.removeAt(responseIndex);
                 }
+
+                // Nothing will be around to show work for the removed data, so stop anything still running for it
+                yanv.client.cancel((payload) => payload.data_id === data_id);
+                yanv.client.send(new yanv.CancelRequest({target_message_id: `precompute-${data_id}`}));
+                delete yanv.statistics[data_id];
             }
         }
     )
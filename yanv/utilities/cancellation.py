@@ -0,0 +1,58 @@
+"""
+Cooperative cancellation for work running outside of the event loop
+"""
+from __future__ import annotations
+
+import threading
+
+
+class OperationCancelled(Exception):
+    """
+    Raised when work notices that it has been asked to stop
+    """
+
+
+class CancellationToken:
+    """
+    A flag that long-running work may check between steps to see if it should stop.
+
+    Work running on a worker thread cannot be interrupted from the outside, so it is up to the work itself to check
+    the token and stop early
+    """
+    def __init__(self, name: str = None):
+        self.__name: str = name or "operation"
+        self.__event: threading.Event = threading.Event()
+
+    @property
+    def name(self) -> str:
+        return self.__name
+
+    @property
+    def cancelled(self) -> bool:
+        return self.__event.is_set()
+
+    def cancel(self):
+        """
+        Signal that the work should stop
+        """
+        self.__event.set()
+
+    def raise_if_cancelled(self):
+        """
+        Raise an OperationCancelled exception if the work has been asked to stop
+        """
+        if self.cancelled:
+            raise OperationCancelled(f"'{self.__name}' was cancelled")
+
+    def __bool__(self):
+        return self.cancelled
+
+    def __str__(self):
+        return f"{self.__class__.__name__}({self.__name}{', cancelled' if self.cancelled else ''})"
+
+    def __repr__(self):
+        return self.__str__()
+
+
+NEVER_CANCELLED: CancellationToken = CancellationToken("uncancellable")
+"""A token for work that can't be addressed and therefore can't be cancelled"""
@@ -0,0 +1,194 @@
+"""
+Streams files from the web to the local disk so that they never need to be held in memory all at once
+"""
+from __future__ import annotations
+
+import os
+import time
+import typing
+import hashlib
+import logging
+import pathlib
+import tempfile
+import threading
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from yanv.application_details import DOWNLOAD_DIRECTORY
+from yanv.application_details import THREAD_COUNT
+from yanv.utilities.cancellation import CancellationToken
+from yanv.utilities.cancellation import NEVER_CANCELLED
+
+LOGGER: logging.Logger = logging.getLogger(pathlib.Path(__file__).stem)
+
+DOWNLOAD_CHUNK_SIZE: typing.Final[int] = 2 ** 20
+"""The number of bytes to read from the web and write to disk at a time"""
+
+PROGRESS_INTERVAL: typing.Final[float] = 0.25
+"""The fewest seconds between reports of how much of a download has arrived"""
+
+DOWNLOAD_TIMEOUT: typing.Final[typing.Tuple[float, float]] = (10, 60)
+"""How many seconds to wait to connect to a server and to wait between chunks of data"""
+
+PROGRESS_CALLBACK = typing.Callable[[int, typing.Optional[int]], None]
+"""Called with the number of bytes received so far and the total number of bytes expected, if known"""
+
+_SESSION: typing.Optional[requests.Session] = None
+_SESSION_LOCK: threading.Lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """
+    Get the session shared by every download so that connections to the same server are pooled and reused
+    """
+    global _SESSION
+
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=THREAD_COUNT, pool_maxsize=THREAD_COUNT)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _SESSION = session
+
+    return _SESSION
+
+
+def get_download_directory(directory: typing.Union[str, os.PathLike] = None) -> pathlib.Path:
+    """
+    Get the directory that downloads are written to, creating it if needed
+
+    Args:
+        directory: The directory to use. The application default is used if not given
+
+    Returns:
+        The path to the directory
+    """
+    if not directory:
+        directory = DOWNLOAD_DIRECTORY or pathlib.Path(tempfile.gettempdir()) / "yanv" / "downloads"
+
+    directory = pathlib.Path(directory).expanduser()
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory
+
+
+def get_download_name(url: str) -> str:
+    """
+    Build a file name for a download that is unique to its address but keeps the original name and extension
+    so that the file's format may still be recognized
+
+    Args:
+        url: The address of the file
+
+    Returns:
+        A name for the local copy of the file
+    """
+    digest = hashlib.sha256(url.encode()).hexdigest()[:16]
+    original_name = pathlib.PurePosixPath(urlparse(url).path).name or "download"
+    return f"{digest}-{original_name}"
+
+
+def write_response(
+    response: requests.Response,
+    destination: pathlib.Path,
+    progress: PROGRESS_CALLBACK = None,
+    cancellation_token: CancellationToken = None,
+    chunk_size: int = None,
+) -> int:
+    """
+    Stream the body of a response to a file, one chunk at a time
+
+    The body is written under a temporary name and only moved into place once it has fully arrived, so a partial
+    download is never mistaken for a complete one
+
+    Args:
+        response: A response that was requested with `stream=True`
+        destination: Where to write the body
+        progress: Called as data arrives with the number of bytes received so far and the expected total
+        cancellation_token: A token to check between chunks in case the download should stop early
+        chunk_size: The number of bytes to read and write at a time
+
+    Returns:
+        The number of bytes written
+    """
+    if cancellation_token is None:
+        cancellation_token = NEVER_CANCELLED
+
+    if chunk_size is None:
+        chunk_size = DOWNLOAD_CHUNK_SIZE
+
+    content_length = response.headers.get("Content-Length")
+    total: typing.Optional[int] = int(content_length) if content_length and content_length.isdigit() else None
+    received: int = 0
+    last_report: float = 0
+
+    descriptor, partial_path = tempfile.mkstemp(prefix=f"{destination.name}.", suffix=".part", dir=destination.parent)
+
+    try:
+        with os.fdopen(descriptor, "wb") as output:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                cancellation_token.raise_if_cancelled()
+                output.write(chunk)
+                received += len(chunk)
+
+                if progress is not None and time.monotonic() - last_report >= PROGRESS_INTERVAL:
+                    last_report = time.monotonic()
+                    progress(received, total)
+
+        os.replace(partial_path, destination)
+    except BaseException:
+        pathlib.Path(partial_path).unlink(missing_ok=True)
+        raise
+
+    if progress is not None:
+        progress(received, total)
+
+    return received
+
+
+def download(
+    url: str,
+    directory: typing.Union[str, os.PathLike] = None,
+    progress: PROGRESS_CALLBACK = None,
+    cancellation_token: CancellationToken = None,
+    chunk_size: int = None,
+) -> pathlib.Path:
+    """
+    Stream a file from the web to a new file on the local disk, one chunk at a time
+
+    Args:
+        url: The address of the file
+        directory: Where to write the file. The application default is used if not given
+        progress: Called as data arrives with the number of bytes received so far and the expected total
+        cancellation_token: A token to check between chunks in case the download should stop early
+        chunk_size: The number of bytes to read and write at a time
+
+    Returns:
+        The path to the local copy of the file
+    """
+    directory = get_download_directory(directory)
+
+    # Each download gets its own file so that data that is still open from an earlier download isn't replaced
+    digest, _, original_name = get_download_name(url).partition("-")
+    descriptor, destination = tempfile.mkstemp(prefix=f"{digest}-", suffix=f"-{original_name}", dir=directory)
+    os.close(descriptor)
+    destination = pathlib.Path(destination)
+
+    try:
+        with get_session().get(url, stream=True, timeout=DOWNLOAD_TIMEOUT) as response:
+            response.raise_for_status()
+            received = write_response(
+                response,
+                destination,
+                progress=progress,
+                cancellation_token=cancellation_token,
+                chunk_size=chunk_size
+            )
+    except BaseException:
+        destination.unlink(missing_ok=True)
+        raise
+
+    LOGGER.debug(f"Downloaded {received} bytes from {url} to {destination}")
+    return destination
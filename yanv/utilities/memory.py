@@ -0,0 +1,117 @@
+"""
+Utilities used to describe and measure amounts of memory
+"""
+from __future__ import annotations
+
+import os
+import re
+import typing
+
+_UNITS: typing.Final[typing.Dict[str, int]] = {
+    "": 1,
+    "b": 1,
+    "k": 1000,
+    "kb": 1000,
+    "m": 1000 ** 2,
+    "mb": 1000 ** 2,
+    "g": 1000 ** 3,
+    "gb": 1000 ** 3,
+    "t": 1000 ** 4,
+    "tb": 1000 ** 4,
+    "kib": 1024,
+    "mib": 1024 ** 2,
+    "gib": 1024 ** 3,
+    "tib": 1024 ** 4,
+}
+
+MEMORY_SIZE_PATTERN = re.compile(r"^\s*(?P<amount>\d+(\.\d*)?|\.\d+)\s*(?P<unit>%|[a-zA-Z]*)\s*$")
+"""Matches descriptions of memory like '4GB', '512 MiB', '25%', '0.5', and '1000000'"""
+
+
+def get_system_memory() -> typing.Optional[int]:
+    """
+    Get the total amount of physical memory on the machine in bytes
+
+    Returns:
+        The number of bytes of physical memory if it could be determined
+    """
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def parse_memory_size(value: typing.Union[str, int, float, None]) -> typing.Optional[int]:
+    """
+    Convert a description of an amount of memory into a number of bytes
+
+    Example:
+        >>> parse_memory_size("4GB")
+        4000000000
+        >>> parse_memory_size("512MiB")
+        536870912
+        >>> parse_memory_size(2048)
+        2048
+
+    Values that are a percentage ('25%') or a number no greater than 1 ('0.25') are treated as a fraction of the
+    total memory on the machine
+
+    Args:
+        value: The description of the amount of memory
+
+    Returns:
+        The described number of bytes. None if no value was given
+    """
+    if value is None:
+        return None
+
+    if isinstance(value, str):
+        match = MEMORY_SIZE_PATTERN.match(value)
+
+        if match is None:
+            raise ValueError(f"'{value}' is not a valid amount of memory")
+
+        amount = float(match.group("amount"))
+        unit = match.group("unit").lower()
+    else:
+        amount = float(value)
+        unit = ""
+
+    if unit == "%":
+        amount = amount / 100
+        unit = ""
+    elif unit not in _UNITS:
+        raise ValueError(f"'{value}' is not a valid amount of memory - '{unit}' is not a recognized unit")
+
+    if unit == "" and 0 < amount <= 1:
+        system_memory = get_system_memory()
+
+        if system_memory is None:
+            raise ValueError(
+                f"Cannot use '{value}' as a fraction of system memory - the amount of system memory is not known"
+            )
+
+        return int(system_memory * amount)
+
+    return int(amount * _UNITS[unit])
+
+
+def format_size(size: typing.Union[int, float]) -> str:
+    """
+    Describe a number of bytes in a human readable form
+
+    Example:
+        >>> format_size(2500000)
+        '2.50 MB'
+
+    Args:
+        size: The number of bytes
+
+    Returns:
+        A human readable description of the number of bytes
+    """
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(size) < 1000:
+            return f"{size:.2f} {unit}" if unit != "B" else f"{int(size)} {unit}"
+        size /= 1000
+    return f"{size:.2f} TB"
@@ -3,8 +3,8 @@ Utilities used to help manipulate netcdf data
 """
 from __future__ import annotations
 
+import mmap
 import queue
-import random
 import typing
 import logging
 import pathlib
@@ -15,10 +15,14 @@ import numpy
 import xarray
 from numpy import datetime64
 
-from numpy.random import choice
 from pandas import Timestamp
 from xarray.core.coordinates import DataArrayCoordinates
 
+from yanv.utilities.statistics import get_fill_values
+from yanv.utilities.statistics import get_valid_limits
+from yanv.utilities.statistics import get_valid_mask
+from yanv.utilities.statistics import is_summarizable
+
 _VALUE_TYPE = typing.TypeVar("_VALUE_TYPE")
 
 
@@ -70,6 +74,37 @@ def variable_is_temporal(variable: xarray.DataArray) -> bool:
     return False
 
 
+def is_memory_mapped(array: typing.Any) -> bool:
+    """
+    Determines if an array's values are memory mapped from a file rather than held in memory
+
+    :param array: The array to check
+    :return: Whether the array's values come from a memory mapped file
+    """
+    while array is not None:
+        if isinstance(array, (mmap.mmap, numpy.memmap)):
+            return True
+        array = getattr(array, "base", None)
+    return False
+
+
+def get_resident_size(dataset: xarray.Dataset) -> int:
+    """
+    Determine how many bytes of a dataset are actually held in memory.
+
+    Variables that have not been read from a lazily opened dataset do not count towards its size, nor do memory
+    mapped variables, whose pages may be dropped and read again by the operating system as needed
+
+    :param dataset: The dataset to measure
+    :return: The number of bytes held in memory by the dataset's variables
+    """
+    return sum(
+        variable.nbytes
+        for variable in dataset.variables.values()
+        if variable._in_memory and not is_memory_mapped(variable._data)
+    )
+
+
 def has_value(value: typing.Any) -> bool:
     if value is None:
         return False
@@ -82,24 +117,60 @@ def has_value(value: typing.Any) -> bool:
         return False
 
 
+SAMPLE_ROUNDS: typing.Final[int] = 8
+"""How many times to draw more random positions when too many of the drawn values were missing"""
+
+EXHAUSTIVE_SAMPLE_LIMIT: typing.Final[int] = 100000
+"""The largest variable that may be scanned for valid values when random draws keep landing on missing values"""
+
+
+def read_points(variable: xarray.Variable, indices: numpy.ndarray) -> numpy.ndarray:
+    """
+    Read values at the given flat positions without reading the rest of the variable
+
+    :param variable: The variable to read from
+    :param indices: Positions within the flattened variable
+    :return: The value at each position
+    """
+    positions = numpy.unravel_index(indices, variable.shape)
+
+    if variable._in_memory:
+        return numpy.asarray(variable.values)[positions]
+
+    # Values that haven't been read yet are read one at a time so that only the chunks holding them are decoded
+    return numpy.array([
+        variable[tuple(int(position[index]) for position in positions)].values
+        for index in range(len(indices))
+    ])
+
+
 def get_random_values(
-    variable: xarray.DataArray,
+    variable: typing.Union[xarray.DataArray, xarray.Variable],
     size: int = None,
     messages: queue.Queue[str] = None
 ) -> typing.Optional[typing.Sequence]:
     """
-    Retrieve a random sample of values from a variable
+    Retrieve a random sample of valid values from a variable
+
+    Random positions are drawn and only the values at those positions are read. Positions holding missing values,
+    fill values, or values outside of the variable's valid range are replaced with new draws, so the cost depends on
+    the size of the sample rather than the size of the variable
 
     :param variable: The variable to sample
     :param size: The requested amount of values to retrieve
     :param messages: A queue of messages to return to the UI
     :return: A sequence of values from the variable
     """
-    import pandas
-    import math
+    name = getattr(variable, "name", None) or "variable"
+
+    if isinstance(variable, xarray.DataArray):
+        variable = variable.variable
+
+    if variable.size == 0:
+        return None
 
     if size is None:
-        size = min(math.prod(variable.sizes.values(), start=0), 10)
+        size = min(variable.size, 10)
 
     if not size:
         return None
@@ -107,75 +178,58 @@ def get_random_values(
     if messages is None:
         messages = queue.Queue()
 
-    variable_frame: pandas.DataFrame = variable.to_dataframe(name=variable.name)
+    can_be_compared = is_summarizable(variable.dtype)
 
-    failure_messages: typing.Set[str] = set()
+    # Limits and fill values are stored as raw numbers, so they can't be compared to decoded dates
+    if variable.dtype.kind in "Mm" or not can_be_compared:
+        lower_limit, upper_limit, fill_values = None, None, []
+    else:
+        lower_limit, upper_limit = get_valid_limits(variable.attrs)
+        fill_values = get_fill_values(variable.attrs)
 
-    max_attempts = 25
+    if variable.ndim == 0:
+        value = variable.values[()]
+        return [value] if has_value(value) else []
 
+    generator = numpy.random.default_rng()
+    tried: typing.Set[int] = set()
     random_values: typing.List[_VALUE_TYPE] = []
 
-    dimension_count = len(variable.dims)
-
-    if dimension_count == 0:
-        return None
-    elif dimension_count == 1:
-        values = set(variable_frame.sample(n=size, replace=False))
-        attempts = 0
-        while len(values) < size and attempts < max_attempts:
-            new_choices = variable_frame.sample(n=size, replace=False)
-
-            for new_value in new_choices:
-                try:
-                    if has_value(new_value):
-                        values.add(new_value)
-                except Exception as e:
-                    message: str = f"{type(e).__name__}: Ran into an error when trying to evaluate '{new_value}' for sample data from '{variable.name}': {e}"
-                    failure_messages.add(message)
-
-                if len(values) >= size:
-                    for message in failure_messages:
-                        messages.put(message)
-                        LOGGER.error(message)
-                    return [value for value in values]
-            attempts += 1
-        for message in failure_messages:
-            messages.put(message)
-            LOGGER.error(message)
-        return [value for value in values]
-
-    outer_attempts = 0
-
-    while len(random_values) < size and outer_attempts < max_attempts:
-        try:
-            attempts = 0
-
-            while attempts < max_attempts:
-                variable_coordinates = {
-                    key: random.randint(0, size - 1)
-                    for key, size in variable.coords.sizes.items()
-                    if key != variable.coords.dims[-1]
-                }
-
-                sample_array = variable.isel(variable_coordinates)
-
-                random_sample = choice(sample_array, size=min(size, sample_array.size))
-
-                for random_value in random_sample:
-                    if not numpy.isnan(random_value) and random_value not in random_values:
-                        random_values.append(random_value)
-                    if len(random_values) >= size:
-                        for message in failure_messages:
-                            messages.put(message)
-                            LOGGER.error(message)
-                        return random_values
-
-                attempts += 1
-        except Exception as e:
-            failure_messages.add(f"Ran into an error when trying to evaluate sample data from '{variable.name}': {e}")
-        outer_attempts += 1
-
-    for message in failure_messages:
+    try:
+        for _ in range(SAMPLE_ROUNDS):
+            remaining = size - len(random_values)
+            untried_count = variable.size - len(tried)
+
+            if remaining <= 0 or untried_count <= 0:
+                break
+
+            # Draw extra positions so that a few missing values don't require another round
+            candidates = numpy.unique(generator.integers(0, variable.size, size=min(untried_count, remaining * 2)))
+            candidates = numpy.array([index for index in candidates.tolist() if index not in tried], dtype="int64")
+            tried.update(candidates.tolist())
+            generator.shuffle(candidates)
+
+            if candidates.size == 0:
+                continue
+
+            values = read_points(variable, candidates)
+
+            if can_be_compared:
+                values = values[get_valid_mask(values, lower_limit, upper_limit, fill_values)]
+            else:
+                values = values[[has_value(value) for value in values]]
+
+            random_values.extend(values[:remaining])
+
+        # The variable is mostly missing values - if it's small enough, look through the whole thing instead
+        if len(random_values) < size and variable.size <= EXHAUSTIVE_SAMPLE_LIMIT and can_be_compared:
+            values = numpy.ravel(variable.values)
+            valid_indices = numpy.flatnonzero(get_valid_mask(values, lower_limit, upper_limit, fill_values))
+            chosen_indices = generator.choice(valid_indices, size=min(size, valid_indices.size), replace=False)
+            random_values = list(values[chosen_indices])
+    except Exception as e:
+        message: str = f"{type(e).__name__}: Ran into an error when trying to sample data from '{name}': {e}"
         messages.put(message)
         LOGGER.error(message)
+
     return random_values
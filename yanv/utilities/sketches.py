@@ -0,0 +1,230 @@
+"""
+Compact, mergeable summaries of large sets of values
+"""
+from __future__ import annotations
+
+import math
+import typing
+
+import numpy
+
+DEFAULT_QUANTILE_ERROR: typing.Final[float] = 0.01
+"""The default bound on how far, in rank, an approximate quantile may be from the true quantile"""
+
+_CAPACITY_DECAY: typing.Final[float] = 2 / 3
+"""How much smaller each lower level of a KLL sketch is than the level above it"""
+
+_MINIMUM_CAPACITY: typing.Final[int] = 2
+
+
+def get_sketch_size(error: float) -> int:
+    """
+    Get the size parameter of a KLL sketch that will keep quantiles within the given rank error
+
+    Args:
+        error: The largest acceptable rank error as a fraction of the number of values, such as 0.01 for 1%
+
+    Returns:
+        The number of values kept by the top level of the sketch
+    """
+    if not 0 < error < 1:
+        raise ValueError(f"A quantile error must be between 0 and 1, not {error}")
+
+    # The normalized rank error of a KLL sketch is about 1.7 / k with high probability
+    return max(8, math.ceil(1.7 / error))
+
+
+class KLLSketch:
+    """
+    A KLL quantile sketch (Karnin, Lang, and Liberty, 2016).
+
+    Values are kept in a stack of compactors. Whenever a compactor fills up, its values are sorted and every other
+    one is promoted to the next level, which counts each of its values twice as much. Memory use only grows with the
+    logarithm of the number of values seen, sketches for separate chunks of data may be merged, and the result stays
+    exact until the first compaction
+    """
+    def __init__(self, error: float = None, exact: bool = False, seed: int = None):
+        """
+        Args:
+            error: The acceptable rank error as a fraction of the number of values. Defaults to 1%
+            exact: Whether to keep every value so that quantiles are exact. Memory use grows with every value added
+            seed: A seed for the random choices made while compacting, for reproducible results
+        """
+        self.__error: float = error or DEFAULT_QUANTILE_ERROR
+        self.__exact: bool = exact
+        self.__size: int = get_sketch_size(self.__error)
+        self.__levels: typing.List[typing.List[numpy.ndarray]] = [[]]
+        self.__level_counts: typing.List[int] = [0]
+        self.__count: int = 0
+        self.__random: numpy.random.Generator = numpy.random.default_rng(seed)
+
+    @property
+    def error(self) -> float:
+        return self.__error
+
+    @property
+    def exact(self) -> bool:
+        return self.__exact
+
+    @property
+    def count(self) -> int:
+        """
+        The number of values that have been added to the sketch
+        """
+        return self.__count
+
+    @property
+    def retained(self) -> int:
+        """
+        The number of values that are actually held by the sketch
+        """
+        return sum(self.__level_counts)
+
+    @property
+    def is_exact(self) -> bool:
+        """
+        Whether every value added to the sketch is still held, meaning quantiles are exact
+        """
+        return self.retained == self.__count
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.__levels) - level - 1
+        return max(_MINIMUM_CAPACITY, math.ceil(self.__size * _CAPACITY_DECAY ** depth))
+
+    def _get_level(self, level: int) -> numpy.ndarray:
+        arrays = self.__levels[level]
+
+        if len(arrays) > 1:
+            arrays[:] = [numpy.concatenate(arrays)]
+
+        return arrays[0] if arrays else numpy.empty(0, dtype="float64")
+
+    def _compress(self):
+        if self.__exact:
+            return
+
+        level = 0
+        while level < len(self.__levels):
+            if self.__level_counts[level] > self._capacity(level):
+                if level + 1 == len(self.__levels):
+                    self.__levels.append([])
+                    self.__level_counts.append(0)
+
+                values = numpy.sort(self._get_level(level))
+
+                # An odd value out stays behind so that the total weight of the sketch is preserved
+                leftover = values[-1:] if values.size % 2 else values[:0]
+                paired = values[:values.size - leftover.size]
+                promoted = paired[self.__random.integers(0, 2)::2]
+
+                self.__levels[level] = [leftover] if leftover.size else []
+                self.__level_counts[level] = leftover.size
+                self.__levels[level + 1].append(promoted)
+                self.__level_counts[level + 1] += promoted.size
+            level += 1
+
+    def update(self, values: numpy.ndarray) -> KLLSketch:
+        """
+        Add values to the sketch. NaN values should already have been removed
+
+        Args:
+            values: The values to add
+
+        Returns:
+            The updated sketch
+        """
+        values = numpy.ravel(numpy.asarray(values, dtype="float64"))
+
+        if values.size == 0:
+            return self
+
+        self.__levels[0].append(values)
+        self.__level_counts[0] += values.size
+        self.__count += values.size
+        self._compress()
+        return self
+
+    def merge(self, other: KLLSketch) -> KLLSketch:
+        """
+        Combine another sketch into this one
+
+        Args:
+            other: A sketch of other values
+
+        Returns:
+            The combined sketch
+        """
+        while len(self.__levels) < len(other.__levels):
+            self.__levels.append([])
+            self.__level_counts.append(0)
+
+        for level, arrays in enumerate(other.__levels):
+            self.__levels[level].extend(arrays)
+            self.__level_counts[level] += other.__level_counts[level]
+
+        self.__count += other.__count
+        self._compress()
+        return self
+
+    def _get_weighted_values(self) -> typing.Tuple[numpy.ndarray, numpy.ndarray]:
+        values = list()
+        weights = list()
+
+        for level in range(len(self.__levels)):
+            level_values = self._get_level(level)
+            values.append(level_values)
+            weights.append(numpy.full(level_values.size, 2 ** level, dtype="int64"))
+
+        values = numpy.concatenate(values)
+        weights = numpy.concatenate(weights)
+        order = numpy.argsort(values, kind="stable")
+        return values[order], weights[order]
+
+    def quantiles(self, fractions: typing.Sequence[float]) -> typing.List[float]:
+        """
+        Estimate the values at the given quantiles
+
+        Args:
+            fractions: The quantiles to estimate, between 0 and 1
+
+        Returns:
+            The estimated value at each quantile. NaN if the sketch is empty
+        """
+        if self.__count == 0:
+            return [math.nan for _ in fractions]
+
+        values, weights = self._get_weighted_values()
+
+        if self.is_exact:
+            return numpy.quantile(values, fractions).tolist()
+
+        cumulative_weights = numpy.cumsum(weights)
+        total_weight = cumulative_weights[-1]
+
+        estimates = list()
+        for fraction in fractions:
+            position = numpy.searchsorted(cumulative_weights, fraction * total_weight, side="left")
+            estimates.append(float(values[min(position, values.size - 1)]))
+
+        return estimates
+
+    def quantile(self, fraction: float) -> float:
+        """
+        Estimate the value at the given quantile
+
+        Args:
+            fraction: The quantile to estimate, between 0 and 1
+
+        Returns:
+            The estimated value at the quantile. NaN if the sketch is empty
+        """
+        return self.quantiles([fraction])[0]
+
+    def __len__(self) -> int:
+        return self.__count
+
+    def __str__(self):
+        return f"{self.__class__.__name__}(count={self.__count}, retained={self.retained}, error={self.__error})"
+
+    def __repr__(self):
+        return self.__str__()
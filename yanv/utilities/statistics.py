@@ -0,0 +1,388 @@
+"""
+Summary statistics that are calculated in a single, chunked pass over a variable
+"""
+from __future__ import annotations
+
+import math
+import typing
+import dataclasses
+
+import numpy
+import xarray
+
+from yanv.utilities.cancellation import CancellationToken
+from yanv.utilities.cancellation import NEVER_CANCELLED
+from yanv.utilities.sketches import KLLSketch
+
+CHUNK_SIZE: typing.Final[int] = 2 ** 22
+"""The number of values to read into memory at a time when calculating statistics"""
+
+_UNSUMMARIZABLE_KINDS: typing.Final[str] = "OSUV"
+"""numpy dtype kinds (objects, bytes, unicode, and void) that statistics cannot be calculated for"""
+
+
+def is_summarizable(dtype: numpy.dtype) -> bool:
+    """
+    Whether summary statistics may be calculated for data of the given type
+    """
+    return dtype.kind not in _UNSUMMARIZABLE_KINDS
+
+
+def get_valid_limits(attributes: typing.Mapping[str, typing.Any]) -> typing.Tuple[typing.Any, typing.Any]:
+    """
+    Get the smallest and largest valid values described by a variable's CF attributes
+
+    Args:
+        attributes: The attributes of the variable
+
+    Returns:
+        The lower and upper limits. Either may be None if there is no limit
+    """
+    lower_limit = attributes.get("valid_min")
+    upper_limit = attributes.get("valid_max")
+    valid_range = attributes.get("valid_range")
+
+    if valid_range is not None and numpy.size(valid_range) == 2:
+        lower_limit = numpy.min(valid_range)
+        upper_limit = numpy.max(valid_range)
+
+    return lower_limit, upper_limit
+
+
+def get_fill_values(attributes: typing.Mapping[str, typing.Any]) -> typing.Sequence[typing.Any]:
+    """
+    Get values that stand in for missing data in a variable that was not decoded
+
+    Args:
+        attributes: The attributes of the variable
+
+    Returns:
+        Every value that marks missing data
+    """
+    fill_values = list()
+
+    for key in ("_FillValue", "missing_value"):
+        if key in attributes:
+            fill_values.extend(numpy.ravel(attributes[key]).tolist())
+
+    return fill_values
+
+
+def get_valid_mask(
+    values: numpy.ndarray,
+    lower_limit: typing.Any = None,
+    upper_limit: typing.Any = None,
+    fill_values: typing.Sequence[typing.Any] = None,
+) -> numpy.ndarray:
+    """
+    Determine which values are valid without copying them
+
+    Args:
+        values: The values to check
+        lower_limit: The smallest valid value
+        upper_limit: The largest valid value
+        fill_values: Values that mark missing data
+
+    Returns:
+        A boolean array that is True wherever a value is valid
+    """
+    if values.dtype.kind in "Mm":
+        mask = ~numpy.isnat(values)
+    elif values.dtype.kind in "fc":
+        mask = ~numpy.isnan(values)
+    else:
+        mask = numpy.ones(values.shape, dtype=bool)
+
+    if lower_limit is not None:
+        mask &= values >= lower_limit
+
+    if upper_limit is not None:
+        mask &= values <= upper_limit
+
+    for fill_value in fill_values or []:
+        mask &= values != fill_value
+
+    return mask
+
+
+@dataclasses.dataclass
+class SummaryStatistics:
+    """
+    Running statistics for a set of values that may be updated one chunk at a time and merged with other
+    running statistics, such as those calculated for other parts of the same variable
+
+    Variance is tracked through the sum of squared differences from the mean (M2) so that it may be merged without
+    losing precision
+    """
+    dtype: numpy.dtype = dataclasses.field(default_factory=lambda: numpy.dtype("float64"))
+    count: int = 0
+    missing_count: int = 0
+    minimum: typing.Optional[typing.Union[int, float]] = None
+    maximum: typing.Optional[typing.Union[int, float]] = None
+    mean: float = math.nan
+    m2: float = 0.0
+    sketch: typing.Optional[KLLSketch] = None
+    """A sketch used to estimate quantiles. Quantiles aren't calculated if there isn't one"""
+
+    @property
+    def total_count(self) -> int:
+        return self.count + self.missing_count
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / self.count if self.count > 0 else math.nan
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance) if self.count > 0 else math.nan
+
+    def _as_numbers(self, values: numpy.ndarray) -> numpy.ndarray:
+        """
+        View values as plain numbers so that they may be reduced, without copying them where possible
+        """
+        if values.dtype.kind in "Mm":
+            return values.view("int64")
+        if values.dtype.kind == "b":
+            return values.view("uint8")
+        return values
+
+    def update(self, values: numpy.ndarray, mask: numpy.ndarray = None) -> SummaryStatistics:
+        """
+        Add a chunk of values to the statistics
+
+        Args:
+            values: The values to add
+            mask: Which of the values to consider. All values are considered if not given
+
+        Returns:
+            The updated statistics
+        """
+        values = numpy.atleast_1d(values)
+
+        if mask is None:
+            mask = numpy.ones(values.shape, dtype=bool)
+        else:
+            mask = numpy.atleast_1d(mask)
+
+        chunk_count = int(numpy.count_nonzero(mask))
+        self.missing_count += values.size - chunk_count
+
+        if chunk_count == 0:
+            return self
+
+        numbers = self._as_numbers(values)
+        is_integer = numbers.dtype.kind in "iub"
+
+        limits = numpy.iinfo(numbers.dtype) if is_integer else None
+        chunk_minimum = numpy.min(numbers, where=mask, initial=limits.max if is_integer else math.inf)
+        chunk_maximum = numpy.max(numbers, where=mask, initial=limits.min if is_integer else -math.inf)
+        chunk_mean = float(numpy.sum(numbers, where=mask, dtype="float64")) / chunk_count
+
+        if self.sketch is not None:
+            self.sketch.update(numbers[mask])
+
+        deviations = numpy.subtract(numbers, chunk_mean, dtype="float64")
+        chunk_m2 = float(numpy.sum(numpy.square(deviations, out=deviations), where=mask))
+
+        return self.merge(
+            SummaryStatistics(
+                dtype=values.dtype,
+                count=chunk_count,
+                minimum=chunk_minimum.item(),
+                maximum=chunk_maximum.item(),
+                mean=chunk_mean,
+                m2=chunk_m2,
+            )
+        )
+
+    def merge(self, other: SummaryStatistics) -> SummaryStatistics:
+        """
+        Combine another set of statistics into this one
+
+        Args:
+            other: Statistics calculated for other values
+
+        Returns:
+            The combined statistics
+        """
+        self.missing_count += other.missing_count
+
+        if other.sketch is not None:
+            if self.sketch is None:
+                self.sketch = KLLSketch(error=other.sketch.error, exact=other.sketch.exact)
+            self.sketch.merge(other.sketch)
+
+        if other.count == 0:
+            return self
+
+        if self.count == 0:
+            self.dtype = other.dtype
+            self.count = other.count
+            self.minimum = other.minimum
+            self.maximum = other.maximum
+            self.mean = other.mean
+            self.m2 = other.m2
+            return self
+
+        combined_count = self.count + other.count
+        delta = other.mean - self.mean
+
+        self.mean += delta * other.count / combined_count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / combined_count
+        self.count = combined_count
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+
+        return self
+
+    def _restore(self, value: typing.Union[int, float]) -> typing.Any:
+        """
+        Convert a number back into the type of the data it describes
+        """
+        if self.dtype.kind in "Mm":
+            return numpy.array(round(value), dtype="int64").view(self.dtype)[()]
+        if self.dtype.kind == "b":
+            return bool(round(value))
+        return value
+
+    def format(self, value: typing.Union[int, float, None], keep_type: bool = True) -> str:
+        """
+        Format a statistic for display
+
+        Args:
+            value: The statistic to format
+            keep_type: Whether to display the value as the same type as the data it describes
+
+        Returns:
+            The value as a string. 'NaN' if the value could not be calculated
+        """
+        if value is None or (isinstance(value, float) and math.isnan(value)):
+            return "NaN"
+
+        if keep_type:
+            value = self._restore(value)
+
+        if isinstance(value, (float, numpy.floating)):
+            return f"{value:.2f}"
+
+        return str(value)
+
+    def quantiles(self, fractions: typing.Sequence[float]) -> typing.List[typing.Any]:
+        """
+        Estimate the values at the given quantiles
+
+        Args:
+            fractions: The quantiles to estimate, between 0 and 1
+
+        Returns:
+            The value at each quantile. NaN if quantiles weren't tracked or there are no values
+        """
+        if self.sketch is None or self.count == 0:
+            return [math.nan for _ in fractions]
+
+        return self.sketch.quantiles(fractions)
+
+    def to_dict(self, percentiles: typing.Sequence[float] = None) -> typing.Dict[str, typing.Any]:
+        """
+        Format every statistic for display
+
+        Args:
+            percentiles: Percentiles, between 0 and 100, to include alongside the median
+
+        Returns:
+            Every statistic as a string. Requested percentiles are listed under 'percentiles'
+        """
+        is_temporal = self.dtype.kind in "Mm"
+        percentiles = list(percentiles or [])
+        median, *percentile_values = self.quantiles([0.5] + [percentile / 100 for percentile in percentiles])
+
+        return {
+            "minimum": self.format(self.minimum),
+            "maximum": self.format(self.maximum),
+            "mean": self.format(self.mean, keep_type=is_temporal),
+            "median": self.format(median, keep_type=is_temporal),
+            "percentiles": [
+                {"percentile": f"{percentile:g}", "value": self.format(value, keep_type=is_temporal)}
+                for percentile, value in zip(percentiles, percentile_values)
+            ],
+            "quantiles_are_exact": self.sketch is not None and self.sketch.is_exact,
+            "std": "NaN" if is_temporal else self.format(self.std, keep_type=False),
+            "count": str(self.total_count),
+            "missing_count": str(self.missing_count),
+        }
+
+
+def iterate_chunks(
+    variable: xarray.Variable,
+    chunk_size: int = None,
+) -> typing.Iterator[numpy.ndarray]:
+    """
+    Read a variable one slab at a time along its first dimension so that no more than roughly `chunk_size` values
+    are held in memory at once
+
+    Args:
+        variable: The variable to read
+        chunk_size: The approximate number of values to read at a time
+
+    Returns:
+        Each slab of values
+    """
+    if chunk_size is None:
+        chunk_size = CHUNK_SIZE
+
+    if variable.ndim == 0:
+        yield numpy.asarray(variable.values)
+        return
+
+    row_size = max(1, variable.size // max(1, variable.shape[0]))
+    rows_per_chunk = max(1, chunk_size // row_size)
+
+    for start in range(0, variable.shape[0], rows_per_chunk):
+        yield numpy.asarray(variable[start:start + rows_per_chunk].values)
+
+
+def summarize(
+    variable: typing.Union[xarray.Variable, xarray.DataArray],
+    cancellation_token: CancellationToken = None,
+    chunk_size: int = None,
+    sketch: KLLSketch = None,
+) -> SummaryStatistics:
+    """
+    Calculate the count, missing count, minimum, maximum, mean, and variance of a variable in a single pass
+
+    Values outside the variable's valid range and values marking missing data are skipped without copying the data
+
+    Args:
+        variable: The variable to summarize
+        cancellation_token: A token to check between chunks in case the work should stop early
+        chunk_size: The approximate number of values to read at a time
+        sketch: A sketch to fill in the same pass so that quantiles may be estimated
+
+    Returns:
+        The statistics for the variable
+    """
+    if isinstance(variable, xarray.DataArray):
+        variable = variable.variable
+
+    if cancellation_token is None:
+        cancellation_token = NEVER_CANCELLED
+
+    statistics = SummaryStatistics(dtype=variable.dtype, sketch=sketch)
+
+    if not is_summarizable(variable.dtype):
+        statistics.missing_count = variable.size
+        return statistics
+
+    # Limits and fill values are stored as raw numbers, so they can't be compared to decoded dates
+    if variable.dtype.kind in "Mm":
+        lower_limit, upper_limit, fill_values = None, None, []
+    else:
+        lower_limit, upper_limit = get_valid_limits(variable.attrs)
+        fill_values = get_fill_values(variable.attrs)
+
+    for chunk in iterate_chunks(variable, chunk_size=chunk_size):
+        cancellation_token.raise_if_cancelled()
+        mask = get_valid_mask(chunk, lower_limit=lower_limit, upper_limit=upper_limit, fill_values=fill_values)
+        statistics.update(chunk, mask=mask)
+
+    return statistics
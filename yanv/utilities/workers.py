@@ -0,0 +1,163 @@
+"""
+Pools of workers used to keep long-running work off of the event loop
+"""
+from __future__ import annotations
+
+import asyncio
+import typing
+import logging
+import pathlib
+import functools
+import multiprocessing
+import collections.abc as generic
+
+from concurrent.futures import Executor
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ProcessPoolExecutor
+
+from yanv.application_details import THREAD_COUNT
+from yanv.application_details import PROCESS_COUNT
+
+_RESULT = typing.TypeVar("_RESULT")
+
+LOGGER: logging.Logger = logging.getLogger(pathlib.Path(__file__).stem)
+
+
+class WorkerPool:
+    """
+    A thread pool for work that needs access to in-memory state, such as message handling, along with an optional
+    process pool for CPU bound work whose arguments and results may be pickled
+    """
+    def __init__(self, thread_count: int = None, process_count: int = None):
+        if thread_count is None or thread_count <= 0:
+            thread_count = THREAD_COUNT
+
+        if process_count is None:
+            process_count = PROCESS_COUNT
+
+        self.__thread_count: int = thread_count
+        self.__process_count: int = max(process_count, 0)
+        self.__threads: typing.Optional[ThreadPoolExecutor] = None
+        self.__processes: typing.Optional[ProcessPoolExecutor] = None
+
+    @property
+    def thread_count(self) -> int:
+        return self.__thread_count
+
+    @property
+    def process_count(self) -> int:
+        return self.__process_count
+
+    @property
+    def threads(self) -> ThreadPoolExecutor:
+        if self.__threads is None:
+            self.__threads = ThreadPoolExecutor(max_workers=self.__thread_count, thread_name_prefix="yanv")
+        return self.__threads
+
+    @property
+    def processes(self) -> typing.Optional[ProcessPoolExecutor]:
+        """
+        The process pool, if one was configured. Processes are spawned rather than forked since forking a process
+        that is running threads may copy held locks into the child
+        """
+        if self.__processes is None and self.__process_count > 0:
+            self.__processes = ProcessPoolExecutor(
+                max_workers=self.__process_count,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self.__processes
+
+    async def run(self, function: generic.Callable[..., _RESULT], *args, **kwargs) -> _RESULT:
+        """
+        Run a function on the thread pool without blocking the event loop
+
+        Args:
+            function: The function to call
+            *args: Positional arguments for the function
+            **kwargs: Keyword arguments for the function
+
+        Returns:
+            The result of the function
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.threads, functools.partial(function, *args, **kwargs))
+
+    async def run_in_process(self, function: generic.Callable[..., _RESULT], *args, **kwargs) -> _RESULT:
+        """
+        Run a function on the process pool without blocking the event loop. The thread pool is used instead if
+        there is no process pool
+
+        Args:
+            function: The picklable function to call
+            *args: Picklable positional arguments for the function
+            **kwargs: Picklable keyword arguments for the function
+
+        Returns:
+            The result of the function
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.cpu_executor, functools.partial(function, *args, **kwargs))
+
+    @property
+    def cpu_executor(self) -> Executor:
+        """
+        The best executor for CPU bound work - the process pool if there is one, the thread pool otherwise
+        """
+        return self.processes or self.threads
+
+    def shutdown(self, wait: bool = True):
+        if self.__threads is not None:
+            self.__threads.shutdown(wait=wait, cancel_futures=True)
+            self.__threads = None
+
+        if self.__processes is not None:
+            self.__processes.shutdown(wait=wait, cancel_futures=True)
+            self.__processes = None
+
+    def __enter__(self) -> WorkerPool:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
+
+    def __str__(self):
+        return f"{self.__class__.__name__}(threads={self.__thread_count}, processes={self.__process_count})"
+
+    def __repr__(self):
+        return self.__str__()
+
+
+_WORKERS: typing.Optional[WorkerPool] = None
+
+
+def configure_workers(thread_count: int = None, process_count: int = None) -> WorkerPool:
+    """
+    Replace the application's worker pool with one of the given size
+
+    Args:
+        thread_count: The number of threads to handle work with
+        process_count: The number of processes to perform CPU bound work with
+
+    Returns:
+        The newly configured pool
+    """
+    global _WORKERS
+
+    if _WORKERS is not None:
+        _WORKERS.shutdown(wait=False)
+
+    _WORKERS = WorkerPool(thread_count=thread_count, process_count=process_count)
+    LOGGER.debug(f"Configured workers: {_WORKERS}")
+    return _WORKERS
+
+
+def get_workers() -> WorkerPool:
+    """
+    Get the application's worker pool, creating one with default sizes if one was not configured
+    """
+    global _WORKERS
+
+    if _WORKERS is None:
+        _WORKERS = WorkerPool()
+
+    return _WORKERS